@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+A PyAX-12 benchmark.
+
+Compare the per-transaction overhead of the pyserial transport and of the
+`pyax12.transport.TermiosSerial` transport.
+
+No Dynamixel unit is needed: transactions are made on a pseudo-terminal
+whose other end is served by a thread which answers PING instruction packets
+at once. The measured times are thus the host-side cost of a transaction
+(system calls, Python wrappers and scheduling), not bus times.
+"""
+
+from pyax12.connection import Connection
+from pyax12.packet import Packet
+from pyax12.transport import TermiosSerial
+
+import argparse
+import os
+import pty
+import statistics
+import threading
+import time
+
+import serial
+
+def serve_pings(master_fd, stop_event):
+    """Answer PING instruction packets on the master side of a
+    pseudo-terminal until `stop_event` is set."""
+
+    buffer = b''
+
+    while not stop_event.is_set():
+        try:
+            buffer += os.read(master_fd, 64)
+        except OSError:
+            break       # the pseudo-terminal has been closed
+        while len(buffer) >= 6:
+            status_packet = Packet(buffer[2], (0, ))
+            buffer = buffer[6:]
+            os.write(master_fd, status_packet.to_bytes())
+
+
+def benchmark(connection, num_transactions):
+    """Return the durations (in seconds) of `num_transactions` PING
+    transactions."""
+
+    durations = []
+
+    for _ in range(num_transactions):
+        start = time.perf_counter()
+        if not connection.ping(1):
+            raise RuntimeError("Missing status packet.")
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def main():
+    """
+    A PyAX-12 benchmark.
+
+    Compare the per-transaction overhead of pyserial and TermiosSerial.
+    """
+
+    # Parse options
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--transactions", "-n", type=int, default=2000,
+                        metavar="INT",
+                        help="the number of transactions per transport")
+    args = parser.parse_args()
+
+    baudrate = 1000000
+
+    master_fd, slave_fd = pty.openpty()
+    port = os.ttyname(slave_fd)
+
+    stop_event = threading.Event()
+    server = threading.Thread(target=serve_pings,
+                              args=(master_fd, stop_event))
+    server.daemon = True
+    server.start()
+
+    transports = (("pyserial", serial.Serial(port=port, baudrate=baudrate,
+                                             timeout=0.1)),
+                  ("termios", TermiosSerial(port, baudrate=baudrate,
+                                            timeout=0.1)))
+
+    for name, transport in transports:
+        connection = Connection(transport=transport, baudrate=baudrate)
+        connection.timing.default_return_delay_time = 0.
+        connection.timing.latency = 0.1
+
+        benchmark(connection, 100)     # warm up
+        durations = benchmark(connection, args.transactions)
+
+        msg = "{:10} mean: {:7.1f}us  median: {:7.1f}us  max: {:8.1f}us"
+        print(msg.format(name,
+                         statistics.mean(durations) * 1e6,
+                         statistics.median(durations) * 1e6,
+                         max(durations) * 1e6))
+
+        connection.close()
+
+    stop_event.set()
+    os.close(slave_fd)
+
+
+if __name__ == '__main__':
+    main()
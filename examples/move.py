@@ -36,9 +36,26 @@ and finally goes back to 0°.
 
 from pyax12.connection import Connection
 from pyax12.argparse_default import common_argument_parser
+import pyax12.packet as pk
 
 import time
 
+def goto(serial_connection, dynamixel_id, angle):
+    """Move the specified Dynamixel unit to `angle` (in degrees) and wait
+    until it stops.
+
+    The units don't reply to the broadcast ID, thus their motion can't be
+    polled: 1 second is waited instead.
+    """
+
+    if dynamixel_id == pk.BROADCAST_ID:
+        serial_connection.goto(dynamixel_id, angle, speed=512, degrees=True)
+        time.sleep(1)    # Wait 1 second
+    else:
+        serial_connection.goto(dynamixel_id, angle, speed=512, degrees=True,
+                               wait=True)
+
+
 def main():
     """
     A PyAX-12 demo.
@@ -62,40 +79,31 @@ def main():
     dynamixel_id = args.dynamixel_id
 
     # Go to 0°
-    serial_connection.goto(dynamixel_id, 0, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, 0)
 
     # Go to -45° (45° CW)
-    serial_connection.goto(dynamixel_id, -45, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, -45)
 
     # Go to -90° (90° CW)
-    serial_connection.goto(dynamixel_id, -90, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, -90)
 
     # Go to -135° (135° CW)
-    serial_connection.goto(dynamixel_id, -135, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, -135)
 
     # Go to -150° (150° CW)
-    serial_connection.goto(dynamixel_id, -150, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, -150)
 
     # Go to +150° (150° CCW)
-    serial_connection.goto(dynamixel_id, 150, speed=512, degrees=True)
-    time.sleep(2)    # Wait 2 seconds
+    goto(serial_connection, dynamixel_id, 150)
 
     # Go to +135° (135° CCW)
-    serial_connection.goto(dynamixel_id, 135, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, 135)
 
     # Go to +90° (90° CCW)
-    serial_connection.goto(dynamixel_id, 90, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, 90)
 
     # Go to +45° (45° CCW)
-    serial_connection.goto(dynamixel_id, 45, speed=512, degrees=True)
-    time.sleep(1)    # Wait 1 second
+    goto(serial_connection, dynamixel_id, 45)
 
     # Go back to 0°
     serial_connection.goto(dynamixel_id, 0, speed=512, degrees=True)
@@ -40,8 +40,24 @@
 #
 __version__ = '0.5.dev3'
 
-__all__ = ['connection',
+__all__ = ['backup',
+           'bandwidth',
+           'calibration',
+           'capture',
+           'cli',
+           'connection',
+           'daemon',
+           'health',
            'instruction_packet',
+           'inventory',
            'packet',
+           'protocol2',
+           'realtime',
+           'retry',
+           'shared_state',
+           'state',
            'status_packet',
+           'timing',
+           'trajectory',
+           'tuning',
            'utils']
@@ -49,7 +49,8 @@ PORT_HELP_STR = ("The serial device to connect with "
 RPI_HELP_STR = "Use Raspberry Pi GPIO to connect Dynamixels"
 
 
-def common_argument_parser(desc, id_arg=True, id_arg_mandatory=False):
+def common_argument_parser(desc, id_arg=True, id_arg_mandatory=False,
+                           add_help=True):
     """Return a preconfigured `argparse` parser instance.
 
     :param str desc: the global description of the program (printed with -h or
@@ -60,10 +61,12 @@ def common_argument_parser(desc, id_arg=True, id_arg_mandatory=False):
     :param bool id_arg_mandatory: the `dynamixel_id` option is mandatory if
         this parameter is ``True``. This parameter is ignored if `id_arg` is
         ``False``.
+    :param bool add_help: add the -h/--help option (set it to ``False`` to use
+        the returned parser as a parent of another parser).
     """
 
     # Parse options
-    parser = argparse.ArgumentParser(description=desc)
+    parser = argparse.ArgumentParser(description=desc, add_help=add_help)
 
     if id_arg:
         if id_arg_mandatory:
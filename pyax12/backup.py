@@ -0,0 +1,295 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+This module contains functions to back up the configuration of all the
+Dynamixel units of a robot and to restore it (e.g. after a unit has been
+swapped).
+
+`backup_fleet` saves the control table of each unit in a JSON file.
+`restore_fleet` reads the EEPROM settings of the units, compares them to the
+backup and only writes the byte ranges which differ: contiguous changes are
+merged, units sharing the same range are written with a single SYNC_WRITE
+instruction packet and all the units are read back to verify the result.
+
+Example::
+
+    connection = Connection(port='/dev/ttyUSB0', baudrate=1000000)
+    backup_fleet(connection, 'robot.json')
+    ...
+    for servo in restore_fleet(connection, 'robot.json'):
+        if not servo.verified:
+            print("Unit {} not restored".format(servo.dynamixel_id))
+
+The ID and the baud rate of units are never restored (the unit would no
+longer be reachable). RAM settings (e.g. the compliance margins) are saved
+but not restored, since units reset them at power-up.
+"""
+
+__all__ = ['RestoredServo',
+           'BackupError',
+           'backup_fleet',
+           'restore_fleet',
+           'save_backup',
+           'load_backup',
+           'changed_ranges']
+
+import collections
+import json
+import os
+
+import pyax12.packet as pk
+import pyax12.state as st
+
+# GENERAL CONSTANTS
+
+BACKUP_VERSION = 1
+
+# The restored EEPROM area: from RETURN_DELAY_TIME to ALARM_SHUTDOWN
+RESTORE_START = pk.RETURN_DELAY_TIME
+RESTORE_LENGTH = pk.ALARM_SHUTDOWN + 1 - RESTORE_START
+
+# The writable segments of the restored area (address 0x0a is reserved)
+RESTORE_SEGMENTS = ((pk.RETURN_DELAY_TIME, pk.CCW_ANGLE_LIMIT + 2),
+                    (pk.HIGHEST_LIMIT_TEMPERATURE, pk.ALARM_SHUTDOWN + 1))
+
+# Two-byte registers of the restored area (always written as a whole)
+WORD_REGISTERS = (pk.CW_ANGLE_LIMIT, pk.CCW_ANGLE_LIMIT, pk.MAX_TORQUE)
+
+# Unchanged bytes between two changed ranges are rewritten (with their
+# current value) rather than starting a new instruction packet when the gap
+# is at most this long
+MAX_MERGED_GAP = 4
+
+# EXCEPTION CLASSES ###########################################################
+
+class BackupError(Exception):
+    """Exception raised if a backup file cannot be read."""
+    pass
+
+# BACKUP FILES ################################################################
+
+def save_backup(path, baudrate, control_tables):
+    """Save control tables in a JSON file.
+
+    :param str path: the path of the backup file.
+    :param int baudrate: the baud rate of the bus.
+    :param control_tables: a dictionary mapping the unique ID of each
+        Dynamixel unit to its control table (bytes).
+    """
+
+    backup = {'version': BACKUP_VERSION,
+              'baudrate': baudrate,
+              'servos': [{'dynamixel_id': dynamixel_id,
+                          'control_table': bytes(control_table).hex()}
+                         for dynamixel_id, control_table
+                         in sorted(control_tables.items())]}
+
+    # Write the whole file or nothing
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as backup_file:
+        json.dump(backup, backup_file, indent=4)
+    os.replace(temporary_path, path)
+
+
+def load_backup(path):
+    """Load a backup saved by `save_backup`.
+
+    :param str path: the path of the backup file.
+    :return: a ``(baudrate, control_tables)`` tuple.
+    """
+
+    try:
+        with open(path) as backup_file:
+            backup = json.load(backup_file)
+
+        if backup['version'] != BACKUP_VERSION:
+            raise BackupError("Unsupported backup version.")
+
+        control_tables = {}
+        for servo in backup['servos']:
+            control_table = bytes.fromhex(servo['control_table'])
+            if len(control_table) != st.CONTROL_TABLE_LENGTH:
+                raise ValueError("wrong control table length")
+            control_tables[int(servo['dynamixel_id'])] = control_table
+
+        baudrate = backup['baudrate']
+    except (ValueError, KeyError, TypeError) as error:
+        raise BackupError("Invalid backup file: {}".format(error))
+
+    return baudrate, control_tables
+
+# BACKUP ######################################################################
+
+def backup_fleet(connection, path, dynamixel_ids=None):
+    """Save the control table of Dynamixel units in a backup file.
+
+    :param connection: the `Connection` instance of the bus.
+    :param str path: the path of the backup file.
+    :param dynamixel_ids: the sequence of unique ID of the Dynamixel units to
+        back up. If ``None``, the bus is scanned.
+    :return: a dictionary mapping the unique ID of each saved Dynamixel unit
+        to its control table (units which don't reply are not saved).
+    """
+
+    if dynamixel_ids is None:
+        dynamixel_ids = connection.scan()
+
+    control_tables = connection.sync_read(dynamixel_ids, 0,
+                                          st.CONTROL_TABLE_LENGTH)
+    control_tables = {dynamixel_id: control_table
+                      for dynamixel_id, control_table
+                      in control_tables.items()
+                      if control_table is not None}
+
+    save_backup(path, connection.baudrate, control_tables)
+
+    return control_tables
+
+# RESTORE #####################################################################
+
+RestoredServo = collections.namedtuple('RestoredServo',
+                                       ('dynamixel_id',
+                                        'written_ranges',
+                                        'verified'))
+RestoredServo.__doc__ = """The result of the restoration of a Dynamixel unit.
+
+`written_ranges` is the list of ``(address, length)`` ranges written to the
+unit and `verified` is ``True`` if the restored area read back matches the
+backup (``False`` if it doesn't or if the unit doesn't reply).
+"""
+
+
+def changed_ranges(current_bytes, backup_bytes, start=RESTORE_START):
+    """Return the ranges of the restored EEPROM area which differ.
+
+    Two-byte registers are always included as a whole, and ranges separated
+    by at most `MAX_MERGED_GAP` unchanged bytes are merged (ranges never
+    cross the reserved address 0x0a).
+
+    :param bytes current_bytes: the current bytes of the unit (from address
+        `start`).
+    :param bytes backup_bytes: the saved bytes (from address `start`).
+    :param int start: the address of the first byte.
+    :return: a list of ``(address, length)`` tuples.
+    """
+
+    ranges = []
+
+    for segment_start, segment_end in RESTORE_SEGMENTS:
+        changed = set()
+        for address in range(segment_start, segment_end):
+            if current_bytes[address - start] != backup_bytes[address - start]:
+                changed.add(address)
+
+        for address in WORD_REGISTERS:
+            if address in changed or address + 1 in changed:
+                changed.update((address, address + 1))
+
+        range_start = range_end = None
+        for address in sorted(changed):
+            if range_end is not None and address - range_end <= MAX_MERGED_GAP:
+                range_end = address + 1
+                continue
+            if range_end is not None:
+                ranges.append((range_start, range_end - range_start))
+            range_start, range_end = address, address + 1
+
+        if range_end is not None:
+            ranges.append((range_start, range_end - range_start))
+
+    return ranges
+
+
+def restore_fleet(connection, path, dynamixel_ids=None):
+    """Restore the EEPROM settings of Dynamixel units from a backup file.
+
+    Only the byte ranges which differ from the backup are written (see
+    `changed_ranges`); units sharing the same range are written with a
+    single SYNC_WRITE instruction packet. The restored area of all units is
+    then read back to verify the result.
+
+    The backup is assumed to be made with AX-12 compatible units (Protocol
+    1.0 control table).
+
+    :param connection: the `Connection` instance of the bus.
+    :param str path: the path of the backup file.
+    :param dynamixel_ids: the sequence of unique ID of the Dynamixel units to
+        restore. If ``None``, all the units of the backup are restored.
+    :return: a list of `RestoredServo` sorted by ID.
+    """
+
+    _, control_tables = load_backup(path)
+
+    if dynamixel_ids is None:
+        dynamixel_ids = sorted(control_tables)
+    else:
+        dynamixel_ids = [dynamixel_id for dynamixel_id in dynamixel_ids
+                         if dynamixel_id in control_tables]
+
+    def backup_bytes(dynamixel_id):
+        control_table = control_tables[dynamixel_id]
+        return control_table[RESTORE_START:RESTORE_START + RESTORE_LENGTH]
+
+    current = connection.sync_read(dynamixel_ids, RESTORE_START,
+                                   RESTORE_LENGTH)
+
+    # Group the writes by range: (address, length) -> {id: bytes}
+    writes = collections.OrderedDict()
+    written_ranges = {dynamixel_id: [] for dynamixel_id in dynamixel_ids}
+
+    for dynamixel_id in dynamixel_ids:
+        if current.get(dynamixel_id) is None:
+            continue
+
+        saved_bytes = backup_bytes(dynamixel_id)
+        for address, length in changed_ranges(current[dynamixel_id],
+                                              saved_bytes):
+            offset = address - RESTORE_START
+            data = saved_bytes[offset:offset + length]
+            writes.setdefault((address, length), {})[dynamixel_id] = data
+            written_ranges[dynamixel_id].append((address, length))
+
+    for (address, length), data in writes.items():
+        connection.sync_write(address, data)
+
+    # Verify
+    if len(writes) > 0:
+        restored = connection.sync_read(dynamixel_ids, RESTORE_START,
+                                        RESTORE_LENGTH)
+    else:
+        restored = current
+
+    results = []
+    for dynamixel_id in dynamixel_ids:
+        restored_bytes = restored.get(dynamixel_id)
+        verified = (restored_bytes is not None
+                    and changed_ranges(restored_bytes,
+                                       backup_bytes(dynamixel_id)) == [])
+        results.append(RestoredServo(dynamixel_id,
+                                     written_ranges[dynamixel_id],
+                                     verified))
+
+    return results
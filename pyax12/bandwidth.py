@@ -0,0 +1,198 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `BandwidthBudget` class which shares the time of a
+Dynamixel bus between several clients (e.g. motion, telemetry and
+diagnostics).
+
+Each transaction is charged its wire time (computed by the timing model of
+the connection from the baud rate and the instruction and status packet
+lengths) to the current client. A client which would exceed its share of the
+bus time over the sliding window is either deferred until enough time is
+available or rejected with `BandwidthExceededError`.
+
+Example::
+
+    budget = BandwidthBudget({'motion': 0.7,
+                              'telemetry': 0.25,
+                              'diagnostics': 0.05})
+    connection = Connection(port='/dev/ttyUSB0', bandwidth_budget=budget)
+
+    with budget.client('telemetry'):
+        connection.get_present_temperature(1)
+
+    print(budget.utilization())
+"""
+
+__all__ = ['BandwidthBudget',
+           'BandwidthExceededError']
+
+import collections
+import contextlib
+import threading
+import time
+
+# GENERAL CONSTANTS
+
+DEFAULT_WINDOW = 1.   # seconds
+DEFAULT_CLIENT = 'default'
+
+# EXCEPTION CLASSES ###########################################################
+
+class BandwidthExceededError(Exception):
+    """Exception raised if a transaction is rejected because its client has
+    exhausted its share of the bus time."""
+    pass
+
+# BANDWIDTH BUDGET ############################################################
+
+class BandwidthBudget(object):
+    """Share the bus time between clients.
+
+    The client of a transaction is the one selected with the `client` context
+    manager in the current thread, or `default_client` if there is none.
+    Clients which are not in `shares` are not limited (but their transactions
+    are accounted for in the utilization).
+
+    :param dict shares: a dictionary mapping client names to the fraction of
+        the bus time they may use (e.g. ``{'motion': 0.7, 'telemetry':
+        0.25}``).
+    :param float window: the length (in seconds) of the sliding window over
+        which the bus time is accounted.
+    :param bool block: if ``True``, a transaction which would exceed the share
+        of its client is deferred until enough bus time is available;
+        otherwise `BandwidthExceededError` is raised.
+    :param str default_client: the client charged for transactions made
+        outside any `client` context.
+    """
+
+    def __init__(self, shares, window=DEFAULT_WINDOW, block=True,
+                 default_client=DEFAULT_CLIENT):
+
+        if sum(shares.values()) > 1. + 1e-9:
+            raise ValueError("The sum of shares cannot exceed 1.")
+
+        self.shares = dict(shares)
+        self.window = window
+        self.block = block
+        self.default_client = default_client
+
+        self._usage = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+
+    @contextlib.contextmanager
+    def client(self, name):
+        """Charge the transactions made by the current thread (in the `with`
+        block) to the client `name`.
+
+        :param str name: the client name.
+        """
+
+        previous_client = getattr(self._local, 'client', None)
+        self._local.client = name
+
+        try:
+            yield self
+        finally:
+            self._local.client = previous_client
+
+
+    @property
+    def current_client(self):
+        """The client charged for the transactions of the current thread.
+
+        This member is a read-only property.
+        """
+        client = getattr(self._local, 'client', None)
+        return self.default_client if client is None else client
+
+
+    def _expire(self, now):
+        for usage in self._usage.values():
+            while len(usage) > 0 and usage[0][0] + self.window <= now:
+                usage.popleft()
+
+
+    def _used_time(self, client):
+        return sum(duration for _, duration in self._usage[client])
+
+
+    def admit(self, wire_time, client=None):
+        """Charge `wire_time` seconds of bus time to `client`.
+
+        :param float wire_time: the bus time (in seconds) of the transaction.
+        :param str client: the client to charge. If ``None``, the current
+            client is charged.
+        """
+
+        if client is None:
+            client = self.current_client
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+
+                usage = self._usage[client]
+                share = self.shares.get(client)
+
+                # A client which has no recent usage is always admitted (even
+                # for a transaction longer than its share)
+                if (share is None or len(usage) == 0
+                        or self._used_time(client) + wire_time
+                        <= share * self.window):
+                    usage.append((now, wire_time))
+                    return
+
+                if not self.block:
+                    msg = "The bus time share of client '{}' is exhausted."
+                    raise BandwidthExceededError(msg.format(client))
+
+                # Wait until the oldest transaction leaves the window
+                delay = usage[0][0] + self.window - now
+
+            time.sleep(delay)
+
+
+    def utilization(self, client=None):
+        """Return the fraction of the bus time used over the sliding window.
+
+        :param str client: if given, return the fraction of the bus time used
+            by this client only.
+        """
+
+        with self._lock:
+            self._expire(time.monotonic())
+
+            if client is None:
+                used_time = sum(self._used_time(name) for name in self._usage)
+            else:
+                used_time = self._used_time(client)
+
+        return used_time / self.window
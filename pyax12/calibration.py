@@ -0,0 +1,459 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+This module contains a latency profiler which measures how long each
+Dynamixel unit actually takes to reply, and tunes the timing model of a
+`Connection` accordingly.
+
+Without calibration, a missing status packet costs the (pessimistic) global
+`pyax12.timing.TimingModel.latency` and every unit keeps its factory return
+delay time (500 µs). `calibrate`:
+
+1. optionally lowers the RETURN_DELAY_TIME register of each unit to the
+   smallest value which still gives reliable replies (see
+   `calibrate_return_delay_time`);
+2. measures the round trip time of PING and READ_DATA transactions of
+   several sizes (see `profile_servo`);
+3. derives the tightest safe reply latency of each unit (see
+   `reply_latency`) and gives it to the timing model of the connection.
+
+Results are saved in a JSON file that `Connection` loads at startup (see its
+`calibration` argument)::
+
+    connection = Connection(port='/dev/ttyUSB0', baudrate=1000000)
+    calibrate(connection, [1, 2, 3], path='calibration.json')
+    ...
+    connection = Connection(port='/dev/ttyUSB0', baudrate=1000000,
+                            calibration='calibration.json')
+
+Timestamps are only as precise as the transport: use a
+`pyax12.transport.TermiosSerial` transport (which wakes up as soon as bytes
+are received) for sub-millisecond measures.
+"""
+
+__all__ = ['LatencyProfile',
+           'ServoCalibration',
+           'CalibrationError',
+           'measure_round_trips',
+           'profile_servo',
+           'reply_latency',
+           'calibrate_return_delay_time',
+           'calibrate',
+           'save_calibration',
+           'load_calibration',
+           'apply_calibration']
+
+import collections
+import contextlib
+import json
+import math
+import os
+import statistics
+import time
+
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+import pyax12.status_packet as sp
+import pyax12.timing as tm
+
+# GENERAL CONSTANTS
+
+CALIBRATION_VERSION = 1
+
+DEFAULT_NUM_SAMPLES = 100
+DEFAULT_READ_LENGTHS = (2, 8)     # bytes read from PRESENT_POSITION
+DEFAULT_SAFETY_FACTOR = 1.5
+DEFAULT_MARGIN = 0.0005           # seconds
+
+# The reply latency allowed while measuring (larger than any sane value)
+MEASUREMENT_LATENCY = 0.05        # seconds
+
+# The return delay times (register values, in units of 2 µs) tried by
+# calibrate_return_delay_time(), in decreasing order
+RETURN_DELAY_TIME_CANDIDATES = (250, 100, 50, 25, 10, 5, 2, 1, 0)
+
+# EXCEPTION CLASSES ###########################################################
+
+class CalibrationError(Exception):
+    """Exception raised if a calibration file cannot be read."""
+    pass
+
+# LATENCY PROFILES ############################################################
+
+LatencyProfile = collections.namedtuple('LatencyProfile',
+                                        ('dynamixel_id',
+                                         'baudrate',
+                                         'status_length',
+                                         'num_samples',
+                                         'num_lost',
+                                         'minimum',
+                                         'median',
+                                         'p99',
+                                         'maximum'))
+LatencyProfile.__doc__ = """The distribution of the response latency of a
+Dynamixel unit for a given status packet length.
+
+The response latency is the measured round trip time minus the wire time of
+the instruction and status packets, i.e. the return delay time of the unit
+plus the latency of the host and of the USB adapter. Times are in seconds
+(``None`` if no status packet has been received); `num_lost` is the number
+of missing status packets.
+"""
+
+ServoCalibration = collections.namedtuple('ServoCalibration',
+                                          ('dynamixel_id',
+                                           'baudrate',
+                                           'return_delay_time',
+                                           'reply_latency',
+                                           'profiles'))
+ServoCalibration.__doc__ = """The calibration of a Dynamixel unit.
+
+`return_delay_time` is the value (in microseconds) of the RETURN_DELAY_TIME
+register of the unit, `reply_latency` the extra time (in seconds) allowed for
+its status packets to arrive (see `pyax12.timing.TimingModel.reply_latency`)
+and `profiles` the list of `LatencyProfile` it was derived from.
+"""
+
+
+@contextlib.contextmanager
+def _measurement_setup(connection, dynamixel_id):
+    """Make the transactions with the specified Dynamixel unit suitable for
+    measures: the unit is polled as soon as the wire time has elapsed,
+    missing status packets are not retried and units are never skipped."""
+
+    timing = connection.timing
+    return_delay_times = dict(timing.return_delay_times)
+    reply_latencies = dict(timing.reply_latencies)
+    retry_policy = connection.retry_policy
+    circuit_breaker = connection.circuit_breaker
+
+    timing.return_delay_times[dynamixel_id] = 0.
+    timing.reply_latencies[dynamixel_id] = MEASUREMENT_LATENCY
+    connection.retry_policy = None
+    connection.circuit_breaker = None
+
+    try:
+        yield
+    finally:
+        timing.return_delay_times.clear()
+        timing.return_delay_times.update(return_delay_times)
+        timing.reply_latencies.clear()
+        timing.reply_latencies.update(reply_latencies)
+        connection.retry_policy = retry_policy
+        connection.circuit_breaker = circuit_breaker
+
+
+def measure_round_trips(connection, instruction_packet, num_samples):
+    """Send an instruction packet `num_samples` times and return the measured
+    round trip times.
+
+    :param connection: the `Connection` of the bus.
+    :param instruction_packet: the `InstructionPacket` to send (it must
+        expect a status packet).
+    :param int num_samples: the number of transactions.
+    :return: a ``(round_trip_times, num_lost)`` tuple where
+        `round_trip_times` is the list of round trip times (in seconds) of
+        the transactions which got a status packet.
+    """
+
+    dynamixel_id = instruction_packet.dynamixel_id
+    round_trip_times = []
+    num_lost = 0
+
+    with _measurement_setup(connection, dynamixel_id):
+        for _ in range(num_samples):
+            start = time.perf_counter()
+            try:
+                is_received = connection.send(instruction_packet) is not None
+            except (sp.StatusChecksumError, sp.InstructionChecksumError,
+                    sp.MalformedPacketError):
+                is_received = False       # corrupted packet
+            except sp.StatusPacketError:
+                is_received = True        # error flags (e.g. overheating)
+            round_trip_time = time.perf_counter() - start
+
+            if is_received:
+                round_trip_times.append(round_trip_time)
+            else:
+                num_lost += 1
+
+    return round_trip_times, num_lost
+
+
+def _percentile(sorted_values, fraction):
+    index = max(int(math.ceil(fraction * len(sorted_values))) - 1, 0)
+    return sorted_values[index]
+
+
+def profile_servo(connection, dynamixel_id, num_samples=DEFAULT_NUM_SAMPLES,
+                  read_lengths=DEFAULT_READ_LENGTHS):
+    """Measure the response latency of a Dynamixel unit with PING
+    transactions and READ_DATA transactions of several sizes.
+
+    :param connection: the `Connection` of the bus.
+    :param int dynamixel_id: the unique ID of a Dynamixel unit.
+    :param int num_samples: the number of transactions of each kind.
+    :param read_lengths: the number of bytes read by the READ_DATA
+        transactions (from PRESENT_POSITION, 8 bytes at most).
+    :return: a list of `LatencyProfile` (the PING profile first).
+    """
+
+    packets = [ip.InstructionPacket(dynamixel_id, ip.PING)]
+    for length in read_lengths:
+        packets.append(ip.InstructionPacket(dynamixel_id, ip.READ_DATA,
+                                            (pk.PRESENT_POSITION, length)))
+
+    profiles = []
+
+    for packet in packets:
+        status_length = tm.status_packet_length(packet)
+        wire_time = connection.timing.transmission_time(
+            len(packet.to_bytes()) + status_length)
+
+        round_trip_times, num_lost = measure_round_trips(connection, packet,
+                                                         num_samples)
+        latencies = sorted(max(round_trip_time - wire_time, 0.)
+                           for round_trip_time in round_trip_times)
+
+        if len(latencies) > 0:
+            summary = (latencies[0], statistics.median(latencies),
+                       _percentile(latencies, 0.99), latencies[-1])
+        else:
+            summary = (None, None, None, None)
+
+        profiles.append(LatencyProfile(dynamixel_id, connection.baudrate,
+                                       status_length, len(latencies),
+                                       num_lost, *summary))
+
+    return profiles
+
+
+def reply_latency(profiles, return_delay_time,
+                  safety_factor=DEFAULT_SAFETY_FACTOR, margin=DEFAULT_MARGIN):
+    """Return the tightest safe reply latency (in seconds) of a Dynamixel
+    unit, i.e. the extra time allowed after the expected reply time (which
+    already includes the return delay time) for its status packets to
+    arrive.
+
+    :param profiles: the `LatencyProfile` list of the unit.
+    :param float return_delay_time: the return delay time (in seconds) of
+        the unit.
+    :param float safety_factor: the factor applied to the longest measured
+        response latency.
+    :param float margin: a fixed margin (in seconds) added to the result.
+    :return: the reply latency or ``None`` if no status packet has been
+        received.
+    """
+
+    maxima = [profile.maximum for profile in profiles
+              if profile.maximum is not None]
+
+    if len(maxima) == 0:
+        return None
+
+    return max(safety_factor * max(maxima) - return_delay_time, 0.) + margin
+
+# RETURN DELAY TIME ###########################################################
+
+def _replies_reliably(connection, dynamixel_id, num_samples):
+    packet = ip.InstructionPacket(dynamixel_id, ip.PING)
+    _, num_lost = measure_round_trips(connection, packet, num_samples)
+    return num_lost == 0
+
+
+def calibrate_return_delay_time(connection, dynamixel_id, num_samples=20,
+                                apply=True):
+    """Find the smallest return delay time which gives reliable replies.
+
+    The RETURN_DELAY_TIME register of the unit is lowered step by step (see
+    `RETURN_DELAY_TIME_CANDIDATES`, values higher than the current one are
+    not tried) until a status packet is lost.
+
+    :param connection: the `Connection` of the bus.
+    :param int dynamixel_id: the unique ID of a Dynamixel unit.
+    :param int num_samples: the number of PING transactions made with each
+        return delay time.
+    :param bool apply: if ``True``, the smallest reliable value is kept in
+        the register (it is written in EEPROM); otherwise the initial value
+        is restored.
+    :return: the smallest reliable return delay time (in microseconds) or
+        ``None`` if the unit doesn't reply.
+    """
+
+    byte_seq = connection.read_data(dynamixel_id, pk.RETURN_DELAY_TIME, 1)
+    if byte_seq is None:
+        return None
+
+    initial_value = byte_seq[0]
+    best_value = initial_value
+
+    for value in RETURN_DELAY_TIME_CANDIDATES:
+        if value >= initial_value:
+            continue
+
+        connection.write_data(dynamixel_id, pk.RETURN_DELAY_TIME, value)
+
+        if not _replies_reliably(connection, dynamixel_id, num_samples):
+            break
+
+        best_value = value
+
+    final_value = best_value if apply else initial_value
+    connection.write_data(dynamixel_id, pk.RETURN_DELAY_TIME, final_value)
+
+    return best_value * 2
+
+# CALIBRATION #################################################################
+
+def calibrate(connection, dynamixel_ids, path=None,
+              num_samples=DEFAULT_NUM_SAMPLES,
+              read_lengths=DEFAULT_READ_LENGTHS,
+              tune_return_delay_time=False):
+    """Calibrate the specified Dynamixel units.
+
+    The timing model of the connection is updated with the results.
+
+    :param connection: the `Connection` of the bus.
+    :param dynamixel_ids: the sequence of unique ID of the Dynamixel units to
+        calibrate.
+    :param str path: the path of the calibration file to write (``None`` to
+        write no file).
+    :param int num_samples: the number of transactions of each kind.
+    :param read_lengths: the number of bytes read by the READ_DATA
+        transactions.
+    :param bool tune_return_delay_time: if ``True``, the RETURN_DELAY_TIME
+        register of each unit is lowered to the smallest reliable value
+        first (see `calibrate_return_delay_time`).
+    :return: the list of `ServoCalibration` of the units which replied.
+    """
+
+    calibrations = []
+
+    for dynamixel_id in dynamixel_ids:
+        if tune_return_delay_time:
+            return_delay_time = calibrate_return_delay_time(connection,
+                                                            dynamixel_id)
+        else:
+            byte_seq = connection.read_data(dynamixel_id,
+                                            pk.RETURN_DELAY_TIME, 1)
+            return_delay_time = None if byte_seq is None else byte_seq[0] * 2
+
+        if return_delay_time is None:
+            continue
+
+        profiles = profile_servo(connection, dynamixel_id, num_samples,
+                                 read_lengths)
+        latency = reply_latency(profiles, return_delay_time * 1e-6)
+
+        if latency is not None:
+            calibrations.append(ServoCalibration(dynamixel_id,
+                                                 connection.baudrate,
+                                                 return_delay_time, latency,
+                                                 profiles))
+
+    apply_calibration(connection.timing, calibrations, connection.baudrate)
+
+    if path is not None:
+        save_calibration(path, calibrations)
+
+    return calibrations
+
+# CALIBRATION FILES ###########################################################
+
+def save_calibration(path, calibrations):
+    """Save calibrations in a JSON file.
+
+    :param str path: the path of the calibration file.
+    :param calibrations: a sequence of `ServoCalibration`.
+    """
+
+    servos = []
+    for calibration in calibrations:
+        servo = calibration._asdict()
+        servo['profiles'] = [profile._asdict()
+                             for profile in calibration.profiles]
+        servos.append(servo)
+
+    document = {'version': CALIBRATION_VERSION, 'servos': servos}
+
+    # Write the whole file or nothing (the calibration is read at startup)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as calibration_file:
+        json.dump(document, calibration_file, indent=4)
+    os.replace(temporary_path, path)
+
+
+def load_calibration(path):
+    """Load calibrations saved by `save_calibration`.
+
+    :param str path: the path of the calibration file.
+    :return: a list of `ServoCalibration`.
+    """
+
+    try:
+        with open(path) as calibration_file:
+            document = json.load(calibration_file)
+
+        if document['version'] != CALIBRATION_VERSION:
+            raise CalibrationError("Unsupported calibration version.")
+
+        calibrations = []
+        for servo in document['servos']:
+            servo = dict(servo)
+            servo['profiles'] = [LatencyProfile(**profile)
+                                 for profile in servo['profiles']]
+            calibrations.append(ServoCalibration(**servo))
+    except (ValueError, KeyError, TypeError) as error:
+        raise CalibrationError("Invalid calibration file: {}".format(error))
+
+    return calibrations
+
+
+def apply_calibration(timing_model, calibrations, baudrate):
+    """Give the return delay time and the reply latency of calibrated units
+    to a timing model.
+
+    Calibrations made at another baud rate are ignored.
+
+    :param timing_model: the `pyax12.timing.TimingModel` to update.
+    :param calibrations: a sequence of `ServoCalibration`.
+    :param int baudrate: the baud rate of the bus.
+    :return: the number of calibrations applied.
+    """
+
+    num_applied = 0
+
+    for calibration in calibrations:
+        if calibration.baudrate != baudrate:
+            continue
+
+        timing_model.set_return_delay_time(
+            calibration.dynamixel_id, calibration.return_delay_time * 1e-6)
+        timing_model.set_reply_latency(calibration.dynamixel_id,
+                                       calibration.reply_latency)
+        num_applied += 1
+
+    return num_applied
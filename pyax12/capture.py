@@ -0,0 +1,421 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains tools to capture and replay the raw traffic of a
+`Connection`.
+
+A *capture file* is a small "pcap-like" binary file which records every
+instruction packet written on the serial line and every chunk of bytes
+received from Dynamixel units, each with a monotonic timestamp.
+
+The `CaptureSerial` class wraps the serial connection of a `Connection` to
+record its traffic; the `ReplaySerial` class is a serial-like transport which
+feeds a recorded session back into a `Connection` (either with its original
+timing or as fast as possible), e.g. to reproduce bus issues off-robot or to
+write offline regression tests.
+
+The structure of a capture file is as the following::
+
+    +-------+-------+--------+--------+------------+------------+---
+    | MAGIC | VERS. | RESERV.|BAUDRATE|  RECORD 1  |  RECORD 2  |...
+    +-------+-------+--------+--------+------------+------------+---
+       8 B     2 B     2 B      4 B
+
+where each record is::
+
+    +--------------+-----------+--------+-------+
+    | TIMESTAMP_NS | DIRECTION | LENGTH | DATA  |
+    +--------------+-----------+--------+-------+
+         8 B           1 B        4 B    LENGTH
+
+All integers are little-endian. Timestamps are given in nanoseconds since the
+beginning of the capture.
+"""
+
+__all__ = ['TX',
+           'RX',
+           'CaptureError',
+           'ReplayError',
+           'CaptureRecord',
+           'CaptureWriter',
+           'CaptureSerial',
+           'ReplaySerial',
+           'read_capture']
+
+import collections
+import struct
+import time
+
+# GENERAL CONSTANTS
+
+CAPTURE_MAGIC = b'PYAX12CP'
+CAPTURE_VERSION = 1
+
+TX = 0  # Bytes sent by the host (instruction packets)
+RX = 1  # Bytes received from Dynamixel units (status packets)
+
+_FILE_HEADER = struct.Struct('<8sHHI')
+_RECORD_HEADER = struct.Struct('<QBI')
+
+# EXCEPTION CLASSES ###########################################################
+
+class CaptureError(Exception):
+    """Base class for exceptions in the `capture` module."""
+    pass
+
+class ReplayError(CaptureError):
+    """Exception raised if the traffic of a replayed session diverges from the
+    recorded one."""
+    pass
+
+# CAPTURE RECORDS #############################################################
+
+CaptureRecord = collections.namedtuple('CaptureRecord',
+                                       ('timestamp', 'direction', 'data'))
+CaptureRecord.__doc__ = """A chunk of bytes which crossed the serial line.
+
+`timestamp` is the time (in seconds) since the beginning of the capture,
+`direction` is either `TX` or `RX` and `data` is a bytes string.
+"""
+
+
+def read_capture(capture_file):
+    """Read a capture file.
+
+    :param capture_file: the path of the capture file to read or a binary file
+        object opened for reading.
+    :return: a ``(baudrate, records)`` tuple where `records` is the list of
+        `CaptureRecord` contained in the capture file.
+    """
+
+    if isinstance(capture_file, str):
+        with open(capture_file, 'rb') as fd:
+            return read_capture(fd)
+
+    header = capture_file.read(_FILE_HEADER.size)
+
+    if len(header) != _FILE_HEADER.size:
+        raise CaptureError("Incomplete capture file header.")
+
+    magic, version, _, baudrate = _FILE_HEADER.unpack(header)
+
+    if magic != CAPTURE_MAGIC:
+        raise CaptureError("Wrong capture file magic number.")
+
+    if version != CAPTURE_VERSION:
+        msg = "Unsupported capture file version: {}."
+        raise CaptureError(msg.format(version))
+
+    records = []
+
+    while True:
+        record_header = capture_file.read(_RECORD_HEADER.size)
+
+        if len(record_header) == 0:
+            break
+        elif len(record_header) != _RECORD_HEADER.size:
+            raise CaptureError("Truncated capture record.")
+
+        timestamp_ns, direction, length = _RECORD_HEADER.unpack(record_header)
+        data = capture_file.read(length)
+
+        if len(data) != length:
+            raise CaptureError("Truncated capture record.")
+
+        records.append(CaptureRecord(timestamp_ns * 1e-9, direction, data))
+
+    return baudrate, records
+
+
+class CaptureWriter(object):
+    """Write `CaptureRecord` items into a capture file.
+
+    :param capture_file: the path of the capture file to create or a binary
+        file object opened for writing.
+    :param int baudrate: the baud rate of the captured serial line (it is
+        stored in the file header for timing analysis).
+    """
+
+    def __init__(self, capture_file, baudrate=0):
+
+        if isinstance(capture_file, str):
+            self._fd = open(capture_file, 'wb')
+            self._owns_fd = True
+        else:
+            self._fd = capture_file
+            self._owns_fd = False
+
+        self._start_time = time.monotonic()
+
+        header = _FILE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, 0,
+                                   int(baudrate))
+        self._fd.write(header)
+
+
+    def write_record(self, direction, data, timestamp=None):
+        """Append a record to the capture file.
+
+        :param int direction: either `TX` or `RX`.
+        :param bytes data: the bytes which crossed the serial line.
+        :param float timestamp: the time (in seconds) since the beginning of
+            the capture. If `timestamp` is ``None``, the current monotonic time
+            is used.
+        """
+
+        if timestamp is None:
+            timestamp = time.monotonic() - self._start_time
+
+        data = bytes(data)
+        timestamp_ns = int(round(timestamp * 1e9))
+
+        self._fd.write(_RECORD_HEADER.pack(timestamp_ns, direction, len(data)))
+        self._fd.write(data)
+
+
+    def close(self):
+        """Flush the capture file (and close it if it has been opened by this
+        writer)."""
+
+        self._fd.flush()
+
+        if self._owns_fd:
+            self._fd.close()
+
+
+# CAPTURE TRANSPORT ###########################################################
+
+class CaptureSerial(object):
+    """Record the traffic of a serial connection into a capture file.
+
+    This class wraps a serial connection (e.g. a `serial.Serial` instance) and
+    can be used anywhere the wrapped object is used. Every chunk of bytes
+    written or read is recorded with a monotonic timestamp.
+
+    :param serial_connection: the serial-like object to wrap.
+    :param capture_file: the path of the capture file to create or a binary
+        file object opened for writing.
+    :param int baudrate: the baud rate of the serial line (stored in the
+        capture file header).
+    """
+
+    def __init__(self, serial_connection, capture_file, baudrate=0):
+        self.serial_connection = serial_connection
+        self.writer = CaptureWriter(capture_file, baudrate)
+
+
+    def __getattr__(self, name):
+        # Delegate everything else to the wrapped serial connection
+        return getattr(self.serial_connection, name)
+
+
+    @property
+    def baudrate(self):
+        """The baud rate of the wrapped serial connection."""
+        return self.serial_connection.baudrate
+
+    @baudrate.setter
+    def baudrate(self, value):
+        self.serial_connection.baudrate = value
+
+
+    def write(self, data):
+        """Write `data` on the serial line and record it."""
+        self.writer.write_record(TX, data)
+        return self.serial_connection.write(data)
+
+
+    def read(self, size=1):
+        """Read at most `size` bytes from the serial line and record them."""
+        data = self.serial_connection.read(size)
+
+        if len(data) > 0:
+            self.writer.write_record(RX, data)
+
+        return data
+
+
+    def inWaiting(self):
+        """Return the number of bytes in the input buffer."""
+        return self.serial_connection.inWaiting()
+
+
+    def flushInput(self):
+        """Discard the input buffer.
+
+        Pending bytes are recorded before being discarded so that the capture
+        contains everything that crossed the serial line.
+        """
+        num_bytes_available = self.serial_connection.inWaiting()
+
+        if num_bytes_available > 0:
+            self.read(num_bytes_available)
+
+        self.serial_connection.flushInput()
+
+
+    def flushOutput(self):
+        """Discard the output buffer."""
+        self.serial_connection.flushOutput()
+
+
+    def close(self):
+        """Close the serial connection and the capture file."""
+        self.serial_connection.close()
+        self.writer.close()
+
+
+# REPLAY TRANSPORT ############################################################
+
+class ReplaySerial(object):
+    """A serial-like transport which replays a recorded session.
+
+    Every written chunk of bytes must match the next recorded `TX` record
+    (otherwise `ReplayError` is raised); the `RX` records that follow it are
+    then made available to `read()`.
+
+    If `realtime` is ``True``, received bytes become available with their
+    original delay (relative to the write which preceded them); otherwise,
+    they are available as soon as the corresponding write is done.
+
+    ``Connection(transport=ReplaySerial(...))`` replays a session without any
+    serial device.
+
+    :param records: a sequence of `CaptureRecord` items (e.g. the second item
+        returned by `read_capture()`).
+    :param int baudrate: the baud rate of the replayed serial line.
+    :param bool realtime: replay the session with its original timing if
+        ``True``, as fast as possible otherwise.
+    """
+
+    def __init__(self, records, baudrate=57600, realtime=False):
+        self.records = list(records)
+        self.baudrate = baudrate
+        self.realtime = realtime
+
+        self._index = 0
+        self._pending = collections.deque()   # (availability_time, bytes)
+        self._input_buffer = bytearray()
+
+        # Skip RX records which precede the first TX record
+        self._skip_rx_records()
+
+
+    @classmethod
+    def from_file(cls, capture_file, realtime=False):
+        """Make a `ReplaySerial` instance from a capture file.
+
+        :param capture_file: the path of the capture file to replay or a
+            binary file object opened for reading.
+        :param bool realtime: replay the session with its original timing if
+            ``True``, as fast as possible otherwise.
+        """
+        baudrate, records = read_capture(capture_file)
+        return cls(records, baudrate, realtime)
+
+
+    def _skip_rx_records(self):
+        while (self._index < len(self.records)
+               and self.records[self._index].direction != TX):
+            self._index += 1
+
+
+    def _update_input_buffer(self):
+        now = time.monotonic()
+        while len(self._pending) > 0 and self._pending[0][0] <= now:
+            self._input_buffer.extend(self._pending.popleft()[1])
+
+
+    @property
+    def is_exhausted(self):
+        """``True`` if every recorded write has been replayed."""
+        return self._index >= len(self.records)
+
+
+    def write(self, data):
+        """Check `data` against the next recorded write and schedule the
+        replies which follow it."""
+
+        data = bytes(data)
+
+        if self.is_exhausted:
+            raise ReplayError("Unexpected write (end of capture reached).")
+
+        tx_record = self.records[self._index]
+
+        if tx_record.data != data:
+            msg = "Unexpected write: got {!r}, expected {!r} (record {})."
+            raise ReplayError(msg.format(data, tx_record.data, self._index))
+
+        write_time = time.monotonic()
+        self._index += 1
+
+        while (self._index < len(self.records)
+               and self.records[self._index].direction == RX):
+            rx_record = self.records[self._index]
+
+            if self.realtime:
+                delay = rx_record.timestamp - tx_record.timestamp
+                availability_time = write_time + delay
+            else:
+                availability_time = write_time
+
+            self._pending.append((availability_time, rx_record.data))
+            self._index += 1
+
+        return len(data)
+
+
+    def read(self, size=1):
+        """Return at most `size` bytes among the available replayed bytes."""
+        self._update_input_buffer()
+
+        data = bytes(self._input_buffer[:size])
+        del self._input_buffer[:size]
+
+        return data
+
+
+    def inWaiting(self):
+        """Return the number of replayed bytes currently available."""
+        self._update_input_buffer()
+        return len(self._input_buffer)
+
+
+    def flushInput(self):
+        """Discard the replayed bytes currently available."""
+        self._update_input_buffer()
+        del self._input_buffer[:]
+
+
+    def flushOutput(self):
+        """Do nothing (there is no output buffer)."""
+        pass
+
+
+    def close(self):
+        """Do nothing (there is no device to close)."""
+        pass
@@ -0,0 +1,275 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the ``pyax12`` command line tool.
+
+It gathers the example programs as subcommands::
+
+    pyax12 ping --dynamixel_id 3
+    pyax12 scan --baudrate 1000000
+    pyax12 temperature --dynamixel_id 3
+
+The tool is often started in shell loops: heavy modules (pyserial, RPi.GPIO,
+the `Connection` class) are only imported by the subcommands which connect to
+the bus. With the ``--daemon`` option, commands are sent to a running
+``pyax12d`` daemon (see `pyax12.daemon`) instead of opening the serial port.
+"""
+
+__all__ = ['main',
+           'make_argument_parser']
+
+import argparse
+
+from pyax12.argparse_default import common_argument_parser
+
+# The time budget (in seconds) to import this module (checked by the tests)
+IMPORT_TIME_BUDGET = 0.1
+
+# SUBCOMMANDS #################################################################
+
+def ping(connection, args):
+    """Print True if the specified Dynamixel unit is available, False
+    otherwise."""
+    print(connection.ping(args.dynamixel_id))
+
+
+def scan(connection, args):
+    """Print the ID list of available Dynamixel units."""
+    for dynamixel_id in connection.scan():
+        print(dynamixel_id)
+
+
+def temperature(connection, args):
+    """Print the internal temperature (in degrees celsius) of the specified
+    Dynamixel unit."""
+    print(connection.get_present_temperature(args.dynamixel_id))
+
+
+def led(connection, args):
+    """Switch the LED of the specified Dynamixel unit on or off."""
+    import pyax12.packet as pk
+    connection.write_data(args.dynamixel_id, pk.LED, int(args.state == 'on'))
+
+
+def move(connection, args):
+    """Move the specified Dynamixel unit to the given position (in degrees)
+    and wait until it is reached."""
+    connection.goto(args.dynamixel_id, args.position, speed=args.speed,
+                    degrees=True, wait=True)
+
+
+def dump(connection, args):
+    """Print the control table of the specified Dynamixel unit."""
+    connection.pretty_print_control_table(args.dynamixel_id)
+
+
+def set_id(connection, args):
+    """Set the ID of the specified Dynamixel unit."""
+    connection.set_id(args.dynamixel_id, args.new_id)
+
+
+def set_baudrate(connection, args):
+    """Set the baud rate (in kbps) of the specified Dynamixel unit."""
+    connection.set_baud_rate(args.dynamixel_id, args.new_baudrate)
+
+
+def set_return_delay_time(connection, args):
+    """Set the return delay time (in microseconds) of the specified Dynamixel
+    unit."""
+    connection.set_return_delay_time(args.dynamixel_id, args.return_delay_time)
+
+
+def adapter(connection, args):
+    """Print the USB-serial adapter of the serial port, its latency timer and
+    the shortest round trip time measured with the specified Dynamixel
+    unit."""
+    import pyax12.instruction_packet as ip
+    import pyax12.timing as tm
+    import pyax12.transport as tr
+
+    print("Adapter: {}".format(tr.usb_serial_adapter(args.port)))
+
+    latency_timer = tr.get_latency_timer(args.port)
+    if latency_timer is not None:
+        print("Latency timer: {} ms".format(latency_timer))
+
+    round_trip_floor = tr.measure_round_trip_floor(connection,
+                                                   args.dynamixel_id)
+    if round_trip_floor is None:
+        print("Dynamixel unit {} not available".format(args.dynamixel_id))
+    else:
+        ping_packet = ip.InstructionPacket(args.dynamixel_id, ip.PING)
+        timing = tm.TimingModel(args.baudrate).transaction(ping_packet)
+        print("Round trip: {:.2f} ms (wire time: {:.2f} ms)".format(
+            round_trip_floor * 1000., timing.reply_time * 1000.))
+
+
+def calibrate(connection, args):
+    """Measure the response latency of the specified Dynamixel unit (or of
+    all units) and write the calibration file."""
+    import pyax12.calibration as cb
+    import pyax12.packet as pk
+
+    if args.dynamixel_id == pk.BROADCAST_ID:
+        dynamixel_ids = connection.scan()
+    else:
+        dynamixel_ids = [args.dynamixel_id]
+
+    calibrations = cb.calibrate(
+        connection, dynamixel_ids, path=args.output,
+        tune_return_delay_time=args.tune_return_delay_time)
+
+    for calibration in calibrations:
+        msg = "{}: return delay time {} us, reply latency {:.2f} ms"
+        print(msg.format(calibration.dynamixel_id,
+                         calibration.return_delay_time,
+                         calibration.reply_latency * 1000.))
+
+
+# ARGUMENT PARSER #############################################################
+
+# (name, function, id_arg, id_arg_mandatory) tuples: the help text of each
+# subcommand is the docstring of its function
+SUBCOMMANDS = (('ping', ping, True, False),
+               ('scan', scan, False, False),
+               ('temperature', temperature, True, False),
+               ('led', led, True, False),
+               ('move', move, True, False),
+               ('dump', dump, True, True),
+               ('set-id', set_id, True, False),
+               ('set-baudrate', set_baudrate, True, False),
+               ('set-return-delay-time', set_return_delay_time, True, False),
+               ('adapter', adapter, True, True),
+               ('calibrate', calibrate, True, False))
+
+def make_argument_parser():
+    """Return the `argparse` parser of the ``pyax12`` command."""
+
+    parser = argparse.ArgumentParser(prog='pyax12',
+                                     description="Control Dynamixel AX-12 "
+                                                 "actuators.")
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+
+    subcommand_parsers = {}
+    for name, function, id_arg, id_arg_mandatory in SUBCOMMANDS:
+        description = " ".join(function.__doc__.split())
+        common_parser = common_argument_parser(
+            description,
+            id_arg=id_arg,
+            id_arg_mandatory=id_arg_mandatory,
+            add_help=False)
+        subparser = subparsers.add_parser(name,
+                                          parents=[common_parser],
+                                          help=description,
+                                          description=description)
+        subparser.add_argument("--daemon",
+                               help="Send the command through the pyax12d "
+                                    "daemon listening on this socket.",
+                               metavar="STRING")
+        subparser.set_defaults(function=function)
+        subcommand_parsers[name] = subparser
+
+    subcommand_parsers['led'].add_argument("state",
+                                           choices=('on', 'off'),
+                                           help="The new state of the LED.")
+
+    subcommand_parsers['move'].add_argument("position",
+                                            type=float,
+                                            metavar="FLOAT",
+                                            help="The goal position (in "
+                                                 "degrees, from -150 to 150).")
+    subcommand_parsers['move'].add_argument("--speed",
+                                            "-s",
+                                            type=int,
+                                            metavar="INT",
+                                            default=512,
+                                            help="The moving speed (from 1 "
+                                                 "to 1023).")
+
+    subcommand_parsers['set-id'].add_argument("new_id",
+                                              type=int,
+                                              metavar="INT",
+                                              help="The new unique ID "
+                                                   "(in range (0, 0xFD)).")
+
+    subcommand_parsers['set-baudrate'].add_argument("new_baudrate",
+                                                    type=float,
+                                                    metavar="FLOAT",
+                                                    help="The new baud rate "
+                                                         "(in kbps).")
+
+    subcommand_parsers['set-return-delay-time'].add_argument(
+        "return_delay_time",
+        type=int,
+        metavar="INT",
+        help="The new return delay time (in microseconds, from 0 to 508).")
+
+    subcommand_parsers['calibrate'].add_argument(
+        "--output",
+        "-o",
+        default="pyax12_calibration.json",
+        metavar="STRING",
+        help="The calibration file to write (to be given to Connection).")
+    subcommand_parsers['calibrate'].add_argument(
+        "--tune-return-delay-time",
+        action="store_true",
+        help="Lower the return delay time of each unit to the smallest "
+             "reliable value (written in EEPROM).")
+
+    return parser
+
+
+# MAIN FUNCTION ###############################################################
+
+def main(argv=None):
+    """The entry point of the ``pyax12`` command.
+
+    :param list argv: the command line arguments (``sys.argv[1:]`` by
+        default).
+    """
+
+    args = make_argument_parser().parse_args(argv)
+
+    if args.daemon is not None:
+        from pyax12.daemon import DaemonClient
+        connection = DaemonClient(args.daemon)
+    else:
+        from pyax12.connection import Connection
+        connection = Connection(port=args.port,
+                                baudrate=args.baudrate,
+                                timeout=args.timeout,
+                                rpi_gpio=args.rpi)
+
+    try:
+        args.function(connection, args)
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
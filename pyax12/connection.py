@@ -28,22 +28,105 @@
 This module contain the `Connection` class communicate with Dynamixel units.
 """
 
-__all__ = ['Connection']
+__all__ = ['Connection',
+           'DeferredError',
+           'MissingStatusPacketError',
+           'CircuitOpenError']
 
-import serial
-import sys
+import collections
+import threading
 import time
 
 import pyax12.packet as pk
 import pyax12.status_packet as sp
 import pyax12.instruction_packet as ip
+import pyax12.capture as cp
+import pyax12.timing as tm
+import pyax12.calibration as cb
+import pyax12.protocol2 as p2
+import pyax12.state as st
 
-try:
-    import RPi.GPIO as gpio
-except:
+from pyax12 import utils
+
+# pyserial and RPi.GPIO are imported when a connection is opened (command line
+# tools are often started in loops and only need them once they connect)
+
+# The minimal time (in seconds) between two polls of the input buffer
+MIN_POLLING_PERIOD = 0.0002
+
+# The timing of a write which expects no status packet (see flush_batch())
+EMPTY_TIMING = tm.TransactionTiming(0., 0., 0, 0., 0.)
+
+# The angular velocity (in position units per second) of one moving speed
+# unit: 0.111 rpm = 0.666°/s and one position unit = 300°/1023
+POSITION_UNITS_PER_SPEED_UNIT = 0.111 * 6. * 1023. / 300.
+
+# The polling periods (in seconds) of the MOVING register (see
+# wait_until_stopped())
+MIN_MOVING_POLLING_PERIOD = 0.005
+MAX_MOVING_POLLING_PERIOD = 0.05
+MOVING_POLLING_BACKOFF = 1.5
+
+# The fraction of the estimated travel time slept before polling
+ARRIVAL_TIME_RATIO = 0.9
+
+# The bound of wait_until_stopped(): a multiple of the estimated travel time
+# (units may be slowed down by their load) but at least MIN_TRAVEL_TIMEOUT
+# seconds (units need some time to settle)
+TRAVEL_TIME_FACTOR = 3.
+MIN_TRAVEL_TIMEOUT = 1.
+
+# The number of consecutive polls of the MOVING register a Dynamixel unit can
+# miss before wait_until_stopped() gives up
+MAX_MISSING_MOVING_REPLIES = 3
+
+# The model numbers of the Dynamixel units which support the Protocol 1.0
+# BULK_READ instruction (MX-28, MX-64, MX-106 and MX-12W)
+BULK_READ_MODEL_NUMBERS = (29, 310, 320, 360)
+
+# The errors which denote a corrupted transmission (the transaction can be
+# retried)
+RETRIABLE_ERRORS = (sp.StatusChecksumError,
+                    sp.InstructionChecksumError,
+                    sp.MalformedPacketError)
+PROTOCOL2_RETRIABLE_ERRORS = (p2.StatusCRCError,
+                              p2.MalformedStatusError)
+
+# The maximum number of errors of posted instruction packets kept until
+# collect_errors() is called (the oldest ones are dropped)
+MAX_DEFERRED_ERRORS = 1024
+
+# EXCEPTION CLASSES ###########################################################
+
+class MissingStatusPacketError(Exception):
+    """Exception reported if an expected status packet has not been received
+    in time."""
     pass
 
-from pyax12 import utils
+class CircuitOpenError(MissingStatusPacketError):
+    """Exception raised if a Dynamixel unit is not addressed because its
+    circuit is open (see `pyax12.retry.CircuitBreaker`)."""
+    pass
+
+# DEFERRED ERRORS #############################################################
+
+PendingReply = collections.namedtuple('PendingReply',
+                                      ('dynamixel_id',
+                                       'instruction_packet',
+                                       'deadline'))
+
+DeferredError = collections.namedtuple('DeferredError',
+                                       ('dynamixel_id',
+                                        'instruction_packet',
+                                        'error'))
+DeferredError.__doc__ = """An error reported for a posted instruction packet.
+
+`instruction_packet` is the bytes string of the posted packet and `error` is
+the exception instance (e.g. a `pyax12.status_packet.StatusPacketError` or a
+`MissingStatusPacketError`).
+"""
+
+# CONNECTION CLASS ############################################################
 
 class Connection(object):
     """Create a serial connection with dynamixel actuators.
@@ -53,19 +136,68 @@ class Connection(object):
     :param int baudrate: the baud rate speed (e.g. 57600).
     :param float timeout: the timeout value for the connection.
     :param float waiting_time: the waiting time (in seconds) between sending
-        the instruction packet and the receiving the status packet.
+        the instruction packet and the receiving the status packet. If
+        `waiting_time` is ``None`` (the default), the waiting time of each
+        transaction is computed from the baud rate, the packet lengths and the
+        return delay time of the addressed unit (see `timing`).
+    :param bool rpi_gpio: use Raspberry Pi GPIO to connect Dynamixel units.
+    :param transport: a serial-like object (e.g. a
+        `pyax12.transport.TermiosSerial` or a `pyax12.capture.ReplaySerial`
+        instance) to use instead of opening `port` with pyserial.
+    :param capture: the path of a capture file (or a binary file object) where
+        all the traffic of this connection is recorded (see the
+        `pyax12.capture` module). No capture is made if `capture` is ``None``.
+    :param int status_return_level: the status return level of all Dynamixel
+        units of the bus (see `get_status_return_level`). If ``None``, the
+        status return level of each unit is read (once) the first time an
+        instruction other than PING or READ_DATA is sent to it.
+    :param error_callback: a function called with a `DeferredError` each time
+        an error is reported for a posted instruction packet (see `post`) or
+        for a unit of a multi-unit read (see `sync_read` and `bulk_read`).
+    :param bandwidth_budget: a `pyax12.bandwidth.BandwidthBudget` instance
+        charged for the wire time of each transaction. If ``None``, the bus
+        time is not accounted.
+    :param retry_policy: a `pyax12.retry.RetryPolicy` instance defining how
+        single-unit transactions (with both protocols) whose status packet is
+        missing or corrupted are retried. If ``None``, transactions are not
+        retried.
+    :param circuit_breaker: a `pyax12.retry.CircuitBreaker` instance used to
+        stop addressing Dynamixel units which keep failing. If ``None``, all
+        units are always addressed.
+    :param int protocol: the version of the Dynamixel protocol used on the
+        bus (1 or 2, see `pyax12.protocol2`). With Protocol 2.0, `ping`,
+        `read_data`, `write_data`, `sync_write`, `sync_read` and `bulk_read`
+        use Protocol 2.0 packets (the other functions assume the control
+        table of AX-12 units).
+    :param bool batch_output: if ``True``, instruction packets which expect
+        no status packet (e.g. broadcasted or SYNC_WRITE packets) are not
+        written at once: they are kept in an output batch which is written
+        (with a single write) together with the next instruction packet which
+        expects a status packet, or by `flush_batch`. This saves a USB frame
+        per packet with USB-serial adapters.
+    :param str calibration: the path of a calibration file written by
+        `pyax12.calibration.calibrate`: the measured return delay time and
+        reply latency of each unit are given to the timing model (if the file
+        was made at the same baud rate). Nothing is loaded if the file
+        doesn't exist yet.
     """
 
     def __init__(self, port='/dev/ttyUSB0', baudrate=57600, timeout=0.1,
-                 waiting_time=0.02, rpi_gpio=False):
+                 waiting_time=None, rpi_gpio=False, transport=None,
+                 capture=None, status_return_level=None, error_callback=None,
+                 bandwidth_budget=None, retry_policy=None,
+                 circuit_breaker=None, protocol=1, batch_output=False,
+                 calibration=None):
 
         self.rpi_gpio = False
 
         if rpi_gpio:
-            if "RPi" in sys.modules:
-                self.rpi_gpio = True
-            else:
+            try:
+                import RPi.GPIO as gpio
+            except ImportError:
                 raise Exception("RPi.GPIO cannot be imported")   # TODO: improve this ?
+            self.rpi_gpio = True
+            self._gpio = gpio
 
         self.waiting_time = waiting_time
 
@@ -73,20 +205,96 @@ class Connection(object):
         self.baudrate = baudrate
         self.timeout = timeout
 
+        # The timing model used to compute waiting times
+        self.timing = tm.TimingModel(baudrate)
+
+        if calibration is not None:
+            try:
+                calibrations = cb.load_calibration(calibration)
+            except FileNotFoundError:
+                calibrations = []           # not calibrated yet
+            cb.apply_calibration(self.timing, calibrations, baudrate)
+
+        # The bus time accounting (see the pyax12.bandwidth module)
+        self.bandwidth_budget = bandwidth_budget
+
+        # The handling of failing transactions (see the pyax12.retry module)
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+
+        if protocol not in (1, 2):
+            raise ValueError("Unsupported protocol: {}.".format(protocol))
+        self.protocol = protocol
+
+        # The (cached) status return level of each Dynamixel unit
+        self.status_return_level = status_return_level
+        self.status_return_levels = {}
+
+        # The (cached) model number of each Dynamixel unit
+        self.model_numbers = {}
+
+        # The units whose model number couldn't be read (see bulk_read())
+        self._unknown_model_ids = set()
+
+        # The units read in staggered slots (see configure_staggered_read())
+        self.staggered_read_ids = ()
+        self.staggered_read_length = 0
+
+        # Posted instruction packets (see the post() method)
+        self.error_callback = error_callback
+        self.deferred_errors = collections.deque(maxlen=MAX_DEFERRED_ERRORS)
+        self._pending_replies = collections.deque()
+        self._input_buffer = bytearray()
+        self._bus_free_time = 0.
+
+        # Output batching (see the flush_batch() method)
+        self.batch_output = batch_output
+        self._output_batch = bytearray()
+        self._num_batched_packets = 0
+        self.num_writes = 0
+        self.num_written_packets = 0
+
+        # Transactions may be made from several threads (e.g. by a
+        # pyax12.health.HealthMonitor)
+        self._lock = threading.RLock()
+
         if self.rpi_gpio:
-            gpio.setmode(gpio.BCM)
-            gpio.setup(18, gpio.OUT)  # Set the direction to output (send data)
+            self._gpio.setmode(self._gpio.BCM)
+            self._gpio.setup(18, self._gpio.OUT)  # Set the direction to output (send data)
+
+        if transport is None:
+            import serial
+            self.serial_connection = serial.Serial(port=self.port,
+                                                   baudrate=self.baudrate,
+                                                   timeout=self.timeout,
+                                                   bytesize=serial.EIGHTBITS,
+                                                   parity=serial.PARITY_NONE,
+                                                   stopbits=serial.STOPBITS_ONE)
+        else:
+            self.serial_connection = transport
 
-        self.serial_connection = serial.Serial(port=self.port,
-                                               baudrate=self.baudrate,
-                                               timeout=self.timeout,
-                                               bytesize=serial.EIGHTBITS,
-                                               parity=serial.PARITY_NONE,
-                                               stopbits=serial.STOPBITS_ONE)
+        if capture is not None:
+            self.serial_connection = cp.CaptureSerial(self.serial_connection,
+                                                      capture,
+                                                      self.baudrate)
 
     def send(self, instruction_packet):
         """Send an instruction packet.
 
+        The status packet is awaited as long as the timing model says it can
+        still arrive (see `pyax12.timing`), unless a fixed `waiting_time` has
+        been given to the connection.
+
+        If the connection has a `retry_policy`, the packet is sent again when
+        its status packet is missing or corrupted. If it has a
+        `circuit_breaker`, ``None`` is returned at once for Dynamixel units
+        which keep failing. (The high level accessors, e.g.
+        `get_present_position`, raise `MissingStatusPacketError` or
+        `CircuitOpenError` instead of returning ``None``.)
+
+        With `batch_output`, instruction packets which expect no status
+        packet are only added to the output batch (see `flush_batch`).
+
         :param instruction_packet: can be either a `Packet` instance or a
             "bytes" string containing the full instruction packet to be sent to
             Dynamixel units.
@@ -99,52 +307,746 @@ class Connection(object):
             # instruction_packet is a Packet instance
             instruction_packet_bytes = instruction_packet.to_bytes()
 
-        self.flush()      # TODO: make a (synchronous) flush_in() and flush_out() instead
+        status_length = self._status_packet_length(instruction_packet_bytes)
+        timing = self.timing.transaction(instruction_packet_bytes,
+                                         status_length)
+
+        if self.batch_output and status_length == 0:
+            self._add_to_batch(instruction_packet_bytes, timing)
+            return None
+
+        def transaction():
+            if self.bandwidth_budget is not None:
+                self.bandwidth_budget.admit(timing.reply_time)
+            return self._transaction(instruction_packet_bytes, timing)
+
+        return self._with_retries(instruction_packet_bytes[2],
+                                  status_length > 0, transaction,
+                                  RETRIABLE_ERRORS, sp.StatusPacketError)
+
+
+    def _with_retries(self, dynamixel_id, expects_reply, transaction,
+                      retriable_errors, status_errors):
+        """Make a transaction with the `retry_policy` and the
+        `circuit_breaker` of the connection (with both protocols).
+
+        :param int dynamixel_id: the ID of the addressed Dynamixel unit.
+        :param bool expects_reply: ``True`` if a status packet is expected
+            (otherwise the transaction is neither retried nor accounted by
+            the circuit breaker).
+        :param transaction: a function which makes one attempt and returns
+            the status packet (or ``None`` if it hasn't been received).
+        :param retriable_errors: the exception classes which denote a
+            corrupted transmission.
+        :param status_errors: the exception classes raised when the unit
+            replied with an error flag.
+        :return: the status packet or ``None``.
+        """
+
+        breaker = self.circuit_breaker if expects_reply else None
+
+        if breaker is not None and not breaker.allow(dynamixel_id):
+            return None   # the unit keeps failing: don't wait for it
+
+        if self.retry_policy is not None and expects_reply:
+            retry_delays = iter(self.retry_policy.delays())
+        else:
+            retry_delays = iter(())
+
+        while True:
+            error = None
+            try:
+                status_packet = transaction()
+            except retriable_errors as retriable_error:
+                status_packet = None
+                error = retriable_error
+            except status_errors:
+                # The unit replied (with an error flag)
+                if breaker is not None:
+                    breaker.record_success(dynamixel_id)
+                raise
+
+            if status_packet is not None or not expects_reply:
+                if breaker is not None:
+                    breaker.record_success(dynamixel_id)
+                return status_packet
+
+            delay = next(retry_delays, None)
+
+            if delay is None:
+                if breaker is not None:
+                    breaker.record_failure(dynamixel_id)
+                if error is not None:
+                    raise error
+                return None
+
+            time.sleep(delay)
+
+
+    def _transaction(self, instruction_packet_bytes, timing):
+        """Send an instruction packet and return its status packet (or
+        ``None`` if no status packet has been received).
+
+        :param bytes instruction_packet_bytes: the full instruction packet.
+        :param timing: the `pyax12.timing.TransactionTiming` of the packet.
+        """
+
+        with self._lock:
+            # Status packets of posted instructions must be received before the
+            # input buffer is flushed
+            if len(self._pending_replies) > 0:
+                self._collect_replies(wait=True)
+
+            self.flush()      # TODO: make a (synchronous) flush_in() and flush_out() instead
+
+            # Send the packet #################################
+
+            write_time = self._write(instruction_packet_bytes, timing)
+
+            # Receive the reply (status packet) ###############
+
+            # WARNING:
+            # If you use the USB2Dynamixel device, make sure its switch is set
+            # on "TTL" (otherwise status packets won't be readable).
+
+            if timing.status_packet_length == 0:
+                # No reply expected: don't wait at all
+                status_packet_bytes = b''
+            elif self.waiting_time is not None:
+                time.sleep(self.waiting_time)
+                num_bytes_available = self.serial_connection.inWaiting()
+                status_packet_bytes = self.serial_connection.read(
+                    num_bytes_available)
+            else:
+                status_packet_bytes = self._receive(
+                    timing.status_packet_length,
+                    write_time + timing.reply_time,
+                    write_time + timing.deadline)
+
+        # TODO: make the reading status more robust?
+        status_packet = None
+        if len(status_packet_bytes) > 0:
+            status_packet = sp.StatusPacket(status_packet_bytes)
+
+        return status_packet
+
+
+    def post(self, instruction_packet):
+        """Send an instruction packet without waiting for its status packet.
+
+        Posted instruction packets are sent back-to-back: the next packet is
+        written as soon as the bus is free (i.e. once the expected status
+        packet has been transmitted), without waiting for the host to receive
+        it. Status packets are matched to their instruction packets later, at
+        the next call to `post`, `send` or `collect_errors`; errors are then
+        reported to the `error_callback` function and kept until
+        `collect_errors` is called (only the last `MAX_DEFERRED_ERRORS`
+        errors are kept).
+
+        :param instruction_packet: can be either a `Packet` instance or a
+            "bytes" string containing the full instruction packet to be sent to
+            Dynamixel units.
+        """
+
+        if isinstance(instruction_packet, bytes):
+            instruction_packet_bytes = instruction_packet
+        else:
+            instruction_packet_bytes = instruction_packet.to_bytes()
+
+        status_length = self._status_packet_length(instruction_packet_bytes)
+        timing = self.timing.transaction(instruction_packet_bytes,
+                                         status_length)
+
+        if self.batch_output and status_length == 0:
+            self._add_to_batch(instruction_packet_bytes, timing)
+            return
+
+        if self.bandwidth_budget is not None:
+            self.bandwidth_budget.admit(timing.reply_time)
+
+        with self._lock:
+
+            self._collect_replies(wait=False)
+
+            # Wait until the previous status packet has been transmitted
+            delay = self._bus_free_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            write_time = self._write(instruction_packet_bytes, timing)
+            self._bus_free_time = write_time + timing.reply_time
+
+            if status_length > 0:
+                pending_reply = PendingReply(instruction_packet_bytes[2],
+                                             instruction_packet_bytes,
+                                             write_time + timing.deadline)
+                self._pending_replies.append(pending_reply)
+
+
+    def collect_errors(self):
+        """Wait for the status packets of all posted instruction packets and
+        return the errors reported since the last call.
+
+        :return: a list of `DeferredError`.
+        """
+
+        with self._lock:
+            self._collect_replies(wait=True)
+
+            errors = list(self.deferred_errors)
+            self.deferred_errors.clear()
+
+            return errors
+
+
+    def _add_to_batch(self, instruction_packet_bytes, timing):
+        """Add an instruction packet which expects no status packet to the
+        output batch."""
+
+        if self.bandwidth_budget is not None:
+            self.bandwidth_budget.admit(timing.reply_time)
+
+        with self._lock:
+            self._output_batch += instruction_packet_bytes
+            self._num_batched_packets += 1
+
+
+    def flush_batch(self):
+        """Write the instruction packets of the output batch (see the
+        `batch_output` argument) with a single write."""
+
+        with self._lock:
+            if len(self._output_batch) > 0:
+                write_time = self._write(b'', EMPTY_TIMING)
+                self._bus_free_time = max(self._bus_free_time, write_time)
 
-        # Send the packet #################################
+
+    @property
+    def packets_per_write(self):
+        """The average number of instruction packets written per write on the
+        serial line (i.e. per USB frame with USB-serial adapters), or
+        ``None`` if nothing has been written yet.
+
+        This member is a read-only property.
+        """
+        if self.num_writes == 0:
+            return None
+        return self.num_written_packets / float(self.num_writes)
+
+
+    def _write(self, instruction_packet_bytes, timing):
+        """Write an instruction packet on the serial line and return the
+        (monotonic) time when the transmission started.
+
+        The instruction packets of the output batch (if any) are written
+        first, in the same write; the returned time is then the time when the
+        transmission of `instruction_packet_bytes` is expected to start.
+
+        :param bytes instruction_packet_bytes: the full instruction packet.
+        :param timing: the `pyax12.timing.TransactionTiming` of the packet.
+        """
+
+        num_packets = 1 if len(instruction_packet_bytes) > 0 else 0
+        batch_time = 0.
+
+        if len(self._output_batch) > 0:
+            batch_time = self.timing.transmission_time(len(self._output_batch))
+            instruction_packet_bytes = (bytes(self._output_batch)
+                                        + instruction_packet_bytes)
+            num_packets += self._num_batched_packets
+            del self._output_batch[:]
+            self._num_batched_packets = 0
+
+        self.num_writes += 1
+        self.num_written_packets += num_packets
 
         if self.rpi_gpio:
             # Pin 18 = +3V (DATA status = send data to Dynamixel)
-            gpio.output(18, gpio.HIGH)
+            self._gpio.output(18, self._gpio.HIGH)
             time.sleep(0.01)          # TODO
 
+        write_time = time.monotonic()
         self.serial_connection.write(instruction_packet_bytes)
 
-        # Sleep a little bit ##############################
-
         if self.rpi_gpio:
             self.serial_connection.flushOutput()
-            time.sleep(0.00017 * len(instruction_packet_bytes))  # TODO: check instead if the output buffer is empty or make the previous flushOutput synchronous
+            time.sleep(batch_time + timing.transmission_time)  # TODO: check instead if the output buffer is empty or make the previous flushOutput synchronous
+
+            # Pin 18 = 0V (DATA status = receive data from Dynamixel)
+            self._gpio.output(18, self._gpio.LOW)
+
+        return write_time + batch_time
+
+
+    def _collect_replies(self, wait):
+        """Match the received status packets to posted instruction packets.
+
+        :param bool wait: if ``True``, wait until every expected status packet
+            is received or lost; otherwise only process the bytes already
+            received.
+        """
+
+        while len(self._pending_replies) > 0:
+            num_bytes_available = self.serial_connection.inWaiting()
+            if num_bytes_available > 0:
+                self._input_buffer += self.serial_connection.read(num_bytes_available)
+
+            packets, remaining_bytes = sp.split_status_packets(self._input_buffer)
+            self._input_buffer = bytearray(remaining_bytes)
+
+            for status_packet_bytes in packets:
+                self._match_reply(status_packet_bytes)
+
+            now = time.monotonic()
+            while (len(self._pending_replies) > 0
+                   and self._pending_replies[0].deadline <= now):
+                pending_reply = self._pending_replies.popleft()
+                self._report_error(pending_reply, MissingStatusPacketError())
+
+            if not wait or len(self._pending_replies) == 0:
+                break
+
+            delay = self._pending_replies[0].deadline - now
+            time.sleep(min(delay, MIN_POLLING_PERIOD))
 
-            if self.rpi_gpio:
-                # Pin 18 = 0V (DATA status = receive data from Dynamixel)
-                gpio.output(18, gpio.LOW)
+        if len(self._pending_replies) == 0:
+            del self._input_buffer[:]
 
-            time.sleep(0.004)              # TODO: make a while loop with a timeout instead ?
+
+    def _match_reply(self, status_packet_bytes):
+        """Match a received status packet to the oldest posted instruction
+        packet sent to the same Dynamixel unit.
+
+        Posted packets which were sent before it and which are still pending
+        are considered lost.
+
+        :param bytes status_packet_bytes: the full status packet.
+        """
+
+        dynamixel_id = status_packet_bytes[2]
+
+        for index, pending_reply in enumerate(self._pending_replies):
+            if pending_reply.dynamixel_id == dynamixel_id:
+                break
         else:
-            time.sleep(self.waiting_time)  # TODO: make a while loop with a timeout instead ?
+            return  # unexpected status packet
 
-        # Receive the reply (status packet) ###############
+        for _ in range(index):
+            lost_reply = self._pending_replies.popleft()
+            self._report_error(lost_reply, MissingStatusPacketError())
 
-        # WARNING:
-        # If you use the USB2Dynamixel device, make sure its switch is set on
-        # "TTL" (otherwise status packets won't be readable).
+        pending_reply = self._pending_replies.popleft()
 
-        num_bytes_available = self.serial_connection.inWaiting()
+        try:
+            sp.StatusPacket(status_packet_bytes)
+        except sp.StatusPacketError as error:
+            self._report_error(pending_reply, error)
 
-        # TODO: not robust...
-        status_packet_bytes = self.serial_connection.read(num_bytes_available)
 
-        # TODO: make the reading status more robust?
-        status_packet = None
-        if len(status_packet_bytes) > 0:
-            status_packet = sp.StatusPacket(status_packet_bytes)
+    def _report_error(self, pending_reply, error):
+        """Keep an error of a posted instruction packet and forward it to the
+        error callback function (if any).
 
-        return status_packet
+        :param pending_reply: the `PendingReply` of the posted packet.
+        :param Exception error: the error to report.
+        """
+
+        deferred_error = DeferredError(pending_reply.dynamixel_id,
+                                       pending_reply.instruction_packet,
+                                       error)
+        self.deferred_errors.append(deferred_error)
+
+        if self.error_callback is not None:
+            self.error_callback(deferred_error)
+
+
+    def _report_read_error(self, dynamixel_id, instruction_packet_bytes,
+                           error):
+        """Forward an error of a multi-unit read to the error callback
+        function (if any).
+
+        Unlike the errors of posted instruction packets, these errors are not
+        kept: the read returns ``None`` for the unit.
+
+        :param int dynamixel_id: the ID of the unit which failed.
+        :param bytes instruction_packet_bytes: the instruction packet sent.
+        :param Exception error: the error to report.
+        """
+
+        if self.error_callback is not None:
+            self.error_callback(DeferredError(dynamixel_id,
+                                              instruction_packet_bytes,
+                                              error))
+
+
+    def _status_packet_length(self, instruction_packet_bytes):
+        """Return the length of the status packet expected in reply to the
+        given instruction packet, taking into account the status return level
+        of the addressed Dynamixel unit.
+
+        :param bytes instruction_packet_bytes: the full instruction packet.
+        """
+
+        dynamixel_id = instruction_packet_bytes[2]
+        instruction = instruction_packet_bytes[4]
+
+        if dynamixel_id == pk.BROADCAST_ID or instruction in (ip.PING,
+                                                              ip.READ_DATA):
+            # PING and READ_DATA are answered with any status return level
+            # greater than 0 (reading the level itself uses READ_DATA)
+            default_level = self.status_return_level
+            if default_level is None:
+                default_level = 2
+            status_return_level = self.status_return_levels.get(dynamixel_id,
+                                                                default_level)
+        else:
+            status_return_level = self.get_cached_status_return_level(dynamixel_id)
+
+        return tm.status_packet_length(instruction_packet_bytes,
+                                       status_return_level)
+
+
+    def get_cached_status_return_level(self, dynamixel_id):
+        """Return the status return level of the specified Dynamixel unit
+        without querying it, unless it is unknown.
+
+        The status return level is read from the Dynamixel unit the first time
+        this function is called (unless it has been declared, see
+        `declare_status_return_level`). If the Dynamixel unit doesn't reply,
+        level 2 (respond to all instructions) is assumed.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
+            in range (0, 0xFD).
+        """
+
+        if dynamixel_id not in self.status_return_levels:
+            if self.status_return_level is not None:
+                return self.status_return_level
+
+            byte_seq = self.read_data(dynamixel_id, pk.STATUS_RETURN_LEVEL, 1)
+            if byte_seq is None:
+                self.status_return_levels[dynamixel_id] = 2
+
+        return self.status_return_levels[dynamixel_id]
+
+
+    def get_cached_model_number(self, dynamixel_id):
+        """Return the model number of the specified Dynamixel unit without
+        querying it, unless it is unknown (the model number is read the first
+        time this function is called).
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
+            in range (0, 0xFD).
+        :return: the model number or ``None`` if the unit doesn't reply.
+        """
+
+        if dynamixel_id not in self.model_numbers:
+            byte_seq = self.read_data(dynamixel_id, pk.MODEL_NUMBER, 2)
+            if byte_seq is None or len(byte_seq) != 2:
+                return None
+            self.model_numbers[dynamixel_id] = \
+                utils.little_endian_bytes_to_int(byte_seq)
+
+        return self.model_numbers[dynamixel_id]
+
+
+    def declare_status_return_level(self, dynamixel_id, status_return_level):
+        """Declare the status return level of the specified Dynamixel unit
+        (without writing it to the unit), so that it never has to be read.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit. If it is
+            the broadcast ID (0xFE), the level is declared for all units.
+        :param int status_return_level: the status return level (0, 1 or 2).
+        """
+
+        if dynamixel_id == pk.BROADCAST_ID:
+            self.status_return_level = status_return_level
+            self.status_return_levels.clear()
+        else:
+            self.status_return_levels[dynamixel_id] = status_return_level
+
+
+    def _receive(self, num_bytes, reply_time, deadline):
+        """Read `num_bytes` bytes or return what has been received when the
+        `deadline` is reached.
+
+        :param int num_bytes: the number of bytes to read.
+        :param float reply_time: the (monotonic) time when the bytes are
+            expected to be fully received.
+        :param float deadline: the (monotonic) time when waiting is stopped.
+        """
+
+        # Don't poll the serial connection before the expected reply time
+        delay = reply_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        received_bytes = bytearray()
+
+        while True:
+            num_bytes_available = self.serial_connection.inWaiting()
+            if num_bytes_available > 0:
+                received_bytes += self.serial_connection.read(num_bytes_available)
+
+            now = time.monotonic()
+            if len(received_bytes) >= num_bytes or now >= deadline:
+                break
+
+            # Wait the time needed to receive the missing bytes
+            num_missing_bytes = num_bytes - len(received_bytes)
+            delay = max(self.timing.transmission_time(num_missing_bytes),
+                        MIN_POLLING_PERIOD)
+            self._wait_for_input(min(delay, deadline - now))
+
+        return bytes(received_bytes)
+
+
+    def _wait_for_input(self, timeout):
+        """Wait `timeout` seconds, or less if the transport can tell when
+        bytes are received (see `pyax12.transport.TermiosSerial`)."""
+
+        wait_readable = getattr(self.serial_connection, 'wait_readable', None)
+
+        if wait_readable is None:
+            time.sleep(timeout)
+        else:
+            wait_readable(timeout)
+
+
+    def _receive_packets(self, split_packets, num_packets, reply_time,
+                         deadline):
+        """Receive `num_packets` status packets or return those which have
+        been received when the `deadline` is reached.
+
+        :param split_packets: the function used to split the received bytes
+            into packets (e.g. `pyax12.status_packet.split_status_packets`).
+        :param int num_packets: the number of status packets to receive.
+        :param float reply_time: the (monotonic) time when the status packets
+            are expected to be fully received.
+        :param float deadline: the (monotonic) time when waiting is stopped.
+        :return: the list of received packets (as bytes strings).
+        """
+
+        delay = reply_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        polling_period = max(
+            self.timing.transmission_time(tm.STATUS_PACKET_OVERHEAD),
+            MIN_POLLING_PERIOD)
+
+        packets = []
+        received_bytes = b''
+
+        while True:
+            num_bytes_available = self.serial_connection.inWaiting()
+            if num_bytes_available > 0:
+                received_bytes += self.serial_connection.read(
+                    num_bytes_available)
+                new_packets, received_bytes = split_packets(received_bytes)
+                packets.extend(new_packets)
+
+            now = time.monotonic()
+            if len(packets) >= num_packets or now >= deadline:
+                break
+
+            self._wait_for_input(min(polling_period, deadline - now))
+
+        return packets
+
+
+    def _exchange(self, instruction_packet_bytes, expected_replies,
+                  split_packets, reply_time=None):
+        """Send an instruction packet and receive the status packets sent
+        back-to-back by one or several Dynamixel units.
+
+        :param bytes instruction_packet_bytes: the full instruction packet.
+        :param expected_replies: a sequence of ``(dynamixel_id,
+            status_packet_length)`` pairs, in the order status packets are
+            sent.
+        :param split_packets: the function used to split the received bytes
+            into packets.
+        :param float reply_time: the expected time (relative to the
+            beginning of the transmission) when the last status packet is
+            fully received. If ``None``, units are assumed to reply one after
+            the other once the instruction packet has been sent.
+        :return: the list of received status packets (as bytes strings).
+        """
+
+        transmission_time = self.timing.transmission_time(
+            len(instruction_packet_bytes))
+
+        if reply_time is None:
+            reply_time = transmission_time
+            for dynamixel_id, status_length in expected_replies:
+                reply_time += (self.timing.return_delay_time(dynamixel_id)
+                               + self.timing.transmission_time(status_length))
+
+        if len(expected_replies) > 0:
+            deadline = reply_time + max(self.timing.reply_latency(dxl_id)
+                                        for dxl_id, _ in expected_replies)
+        else:
+            deadline = reply_time
+
+        status_length = sum(length for _, length in expected_replies)
+        timing = tm.TransactionTiming(transmission_time, 0., status_length,
+                                      reply_time, deadline)
+
+        if self.bandwidth_budget is not None:
+            self.bandwidth_budget.admit(timing.reply_time)
+
+        with self._lock:
+            if len(self._pending_replies) > 0:
+                self._collect_replies(wait=True)
+
+            self.flush()
+
+            write_time = self._write(instruction_packet_bytes, timing)
+
+            if len(expected_replies) == 0:
+                self._bus_free_time = write_time + reply_time
+                return []
+
+            return self._receive_packets(split_packets,
+                                         len(expected_replies),
+                                         write_time + reply_time,
+                                         write_time + deadline)
+
+
+    def _read_results(self, instruction_packet_bytes, requests,
+                      status_packets, status_packet_class, errors, id_index):
+        """Match the status packets of a multi-unit read to its requests.
+
+        Errors (including missing status packets) are forwarded to the error
+        callback function (see `_report_read_error`).
+
+        :param bytes instruction_packet_bytes: the full instruction packet.
+        :param requests: the ``(dynamixel_id, address, length)`` requests.
+        :param status_packets: the received status packets (as bytes).
+        :param status_packet_class: the class used to check status packets.
+        :param errors: the exception classes caught when status packets are
+            checked.
+        :param int id_index: the index of the ID byte in status packets.
+        :return: the list of bytes read for each request (``None`` for units
+            which didn't reply or reported an error).
+        """
+
+        data = {}
+        failed_ids = set()
+
+        for status_packet_bytes in status_packets:
+            try:
+                status_packet = status_packet_class(status_packet_bytes)
+            except errors as error:
+                dynamixel_id = status_packet_bytes[id_index]
+                failed_ids.add(dynamixel_id)
+                self._report_read_error(dynamixel_id, instruction_packet_bytes,
+                                        error)
+            else:
+                data[status_packet.dynamixel_id] = bytes(
+                    status_packet.parameters)
+
+        results = []
+        for dynamixel_id, address, length in requests:
+            byte_seq = data.get(dynamixel_id)
+            if byte_seq is not None and len(byte_seq) != length:
+                byte_seq = None
+            if byte_seq is None and dynamixel_id not in failed_ids:
+                self._report_read_error(dynamixel_id, instruction_packet_bytes,
+                                        MissingStatusPacketError())
+            results.append(byte_seq)
+
+        return results
+
+
+    def _protocol2_reply_expected(self, dynamixel_id, instruction):
+        """Return ``True`` if a Protocol 2.0 status packet is expected in reply
+        to the given instruction.
+
+        :param int dynamixel_id: the ID of the addressed Dynamixel unit.
+        :param int instruction: the Protocol 2.0 instruction.
+        """
+
+        if dynamixel_id == p2.BROADCAST_ID:
+            return False
+
+        if instruction == p2.PING:
+            return True
+
+        default_level = self.status_return_level
+        if default_level is None:
+            default_level = 2
+        status_return_level = self.status_return_levels.get(dynamixel_id,
+                                                            default_level)
+
+        if instruction == p2.READ:
+            return status_return_level >= 1
+        return status_return_level >= 2
+
+
+    def _send_protocol2(self, instruction_packet, num_params):
+        """Send a Protocol 2.0 instruction packet to one Dynamixel unit and
+        return its status packet (or ``None`` if it hasn't been received).
+
+        :param instruction_packet: a `pyax12.protocol2.InstructionPacket2`.
+        :param int num_params: the number of parameters expected in the status
+            packet.
+        """
+
+        dynamixel_id = instruction_packet.dynamixel_id
+        instruction_packet_bytes = instruction_packet.to_bytes()
+        expected_replies = []
+        if self._protocol2_reply_expected(dynamixel_id,
+                                          instruction_packet.instruction):
+            expected_replies.append((dynamixel_id,
+                                     p2.status_packet_length(num_params)))
+
+        def transaction():
+            status_packets = self._exchange(instruction_packet_bytes,
+                                            expected_replies,
+                                            p2.split_status_packets)
+
+            for status_packet_bytes in status_packets:
+                status_packet = p2.StatusPacket2(status_packet_bytes)
+                if status_packet.dynamixel_id == dynamixel_id:
+                    return status_packet
+
+            return None
+
+        return self._with_retries(dynamixel_id, len(expected_replies) > 0,
+                                  transaction, PROTOCOL2_RETRIABLE_ERRORS,
+                                  p2.StatusError)
+
+
+    def _observe_registers(self, dynamixel_id, address, data):
+        """Keep the connection caches up to date with the control table bytes
+        read from or written to the specified Dynamixel unit.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        :param int address: the address of the first byte of `data`.
+        :param bytes data: the bytes read or written.
+        """
+
+        offset = pk.RETURN_DELAY_TIME - address
+        if 0 <= offset < len(data):
+            return_delay_time = 2e-6 * data[offset]
+            self.timing.set_return_delay_time(dynamixel_id, return_delay_time)
+
+        offset = pk.STATUS_RETURN_LEVEL - address
+        if 0 <= offset < len(data):
+            self.declare_status_return_level(dynamixel_id, data[offset])
+
+        offset = pk.MODEL_NUMBER - address
+        if 0 <= offset and offset + 2 <= len(data):
+            self.model_numbers[dynamixel_id] = \
+                utils.little_endian_bytes_to_int(data[offset:offset + 2])
 
 
     def close(self):
-        """Close the serial connection."""
+        """Close the serial connection (the output batch is written
+        first)."""
+
+        self.flush_batch()
 
         # TODO: flush ?
         self.serial_connection.close()
@@ -155,6 +1057,23 @@ class Connection(object):
             #gpio.setup(18, gpio.OUT)  # Set the direction to output (send data)
 
 
+    def change_baudrate(self, baudrate):
+        """Change the baud rate of the serial connection.
+
+        This doesn't change the baud rate of Dynamixel units (see
+        `set_baud_rate`); it should be called once Dynamixel units have been
+        set to the new baud rate.
+
+        :param int baudrate: the new baud rate speed (e.g. 1000000).
+        """
+
+        self.flush()
+        self.serial_connection.baudrate = baudrate
+
+        self.baudrate = baudrate
+        self.timing.baudrate = baudrate
+
+
     def flush(self):
         """Flush the connection buffers."""
 
@@ -174,6 +1093,14 @@ class Connection(object):
         :param int length: the length of the data to be read.
         """
 
+        if self.protocol == 2:
+            inst_packet = p2.InstructionPacket2.read(dynamixel_id, address,
+                                                     length)
+            status_packet = self._send_protocol2(inst_packet, length)
+            if status_packet is None:
+                return None
+            return status_packet.parameters
+
         instruction = ip.READ_DATA
         params = (address, length)
         inst_packet = ip.InstructionPacket(dynamixel_id, instruction, params)
@@ -184,6 +1111,7 @@ class Connection(object):
         if status_packet is not None:
             if status_packet.dynamixel_id == dynamixel_id:
                 data_bytes = status_packet.parameters
+                self._observe_registers(dynamixel_id, address, data_bytes)
             else:
                 pass # TODO: exception ?
         # TODO: exception if dxl_id = 0xFE
@@ -191,7 +1119,7 @@ class Connection(object):
         return data_bytes
 
 
-    def write_data(self, dynamixel_id, address, data):
+    def write_data(self, dynamixel_id, address, data, blocking=True):
         """Write bytes to the control table of the specified Dynamixel unit.
 
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
@@ -200,6 +1128,9 @@ class Connection(object):
             is to be written.
         :param bytes data: the bytes of the data to be written (it can be an
             integer, a sequence of integer, a bytes or a bytearray).
+        :param bool blocking: if ``False``, the instruction packet is posted
+            i.e. sent without waiting for the status packet (see `post`). This
+            parameter is ignored with Protocol 2.0.
         """
 
         bytes_address = bytes((address, ))
@@ -209,12 +1140,79 @@ class Connection(object):
         else:
             bytes_to_write = bytes(data)
 
+        if self.protocol == 2:
+            # Protocol 2.0 packets are never posted
+            inst_packet = p2.InstructionPacket2.write(dynamixel_id, address,
+                                                      bytes_to_write)
+            self._send_protocol2(inst_packet, 0)
+            return
+
         instruction = ip.WRITE_DATA
         params = bytes_address + bytes_to_write
         inst_packet = ip.InstructionPacket(dynamixel_id, instruction, params)
 
+        if blocking:
+            self.send(inst_packet)
+        else:
+            self.post(inst_packet)
+
+        self._observe_registers(dynamixel_id, address, bytes_to_write)
+
+
+    def sync_write(self, address, data):
+        """Write bytes to the control table of several Dynamixel units with a
+        single SYNC_WRITE instruction packet.
+
+        SYNC_WRITE packets are broadcasted thus Dynamixel units don't reply to
+        them.
+
+        :param int address: the starting address of the location where the
+            data is to be written.
+        :param data: a dictionary (or a sequence of pairs) mapping the unique
+            ID of each Dynamixel unit to the bytes to be written to it (it can
+            be an integer, a sequence of integer, a bytes or a bytearray). The
+            same number of bytes must be given to each Dynamixel unit.
+        """
+
+        if isinstance(data, dict):
+            data = data.items()
+
+        bytes_to_write = []
+        for dynamixel_id, unit_data in data:
+            if isinstance(unit_data, int):
+                unit_data = bytes((unit_data, ))
+            else:
+                unit_data = bytes(unit_data)
+            bytes_to_write.append((dynamixel_id, unit_data))
+
+        if len(bytes_to_write) == 0:
+            return
+
+        length = len(bytes_to_write[0][1])
+        if any(len(unit_data) != length for _, unit_data in bytes_to_write):
+            raise ValueError("The same number of bytes must be written to "
+                             "each Dynamixel unit.")
+
+        if self.protocol == 2:
+            inst_packet = p2.InstructionPacket2.sync_write(address, length,
+                                                           bytes_to_write)
+            self._exchange(inst_packet.to_bytes(), [],
+                           p2.split_status_packets)
+            return
+
+        params = bytearray((address, length))
+        for dynamixel_id, unit_data in bytes_to_write:
+            params.append(dynamixel_id)
+            params.extend(unit_data)
+
+        instruction = ip.SYNC_WRITE
+        inst_packet = ip.InstructionPacket(pk.BROADCAST_ID, instruction, params)
+
         self.send(inst_packet)
 
+        for dynamixel_id, unit_data in bytes_to_write:
+            self._observe_registers(dynamixel_id, address, unit_data)
+
 
     def ping(self, dynamixel_id):
         """Ping the specified Dynamixel unit.
@@ -225,6 +1223,10 @@ class Connection(object):
             otherwise.
         """
 
+        if self.protocol == 2:
+            inst_packet = p2.InstructionPacket2.ping(dynamixel_id)
+            return self._send_protocol2(inst_packet, 3) is not None
+
         instruction = ip.PING
         inst_packet = ip.InstructionPacket(dynamixel_id, instruction)
 
@@ -241,6 +1243,256 @@ class Connection(object):
         return is_available
 
 
+    def sync_read(self, dynamixel_ids, address, length):
+        """Read the same bytes from the control table of several Dynamixel
+        units.
+
+        With Protocol 2.0, a single SYNC_READ instruction packet is sent and
+        the units reply back-to-back. With Protocol 1.0, the READ_DATA
+        instruction packets are sent back-to-back if the units have been
+        given staggered return delay times (see `configure_staggered_read`);
+        otherwise, each unit is read with a READ_DATA transaction.
+
+        Units which don't reply or which report an error get ``None``; their
+        errors are forwarded to the `error_callback` function but they are
+        not kept (see `collect_errors`).
+
+        :param dynamixel_ids: a sequence of unique ID of Dynamixel units.
+        :param int address: the starting address of the location where the
+            data is to be read.
+        :param int length: the length of the data to be read.
+        :return: a dictionary mapping each ID to the bytes read.
+        """
+
+        dynamixel_ids = list(dynamixel_ids)
+        requests = [(dynamixel_id, address, length)
+                    for dynamixel_id in dynamixel_ids]
+
+        if self.protocol == 2 and len(dynamixel_ids) > 0:
+            inst_packet = p2.InstructionPacket2.sync_read(address, length,
+                                                          dynamixel_ids)
+            results = self._read_protocol2(inst_packet, requests)
+        elif (len(dynamixel_ids) > 0
+              and tuple(dynamixel_ids) == self.staggered_read_ids
+              and length <= self.staggered_read_length):
+            results = self._staggered_read(requests)
+        else:
+            results = self._read_each(requests)
+
+        return dict(zip(dynamixel_ids, results))
+
+
+    def bulk_read(self, requests):
+        """Read bytes from the control table of several Dynamixel units (a
+        different location can be read on each unit).
+
+        With Protocol 2.0, a single BULK_READ instruction packet is sent and
+        the units reply back-to-back. With Protocol 1.0, the units which
+        support it (MX series, see `BULK_READ_MODEL_NUMBERS`) are read with a
+        single BULK_READ instruction packet and the other ones (e.g. AX-12)
+        with a READ_DATA instruction packet each. The model number of each
+        unit is read once (see `get_cached_model_number`); units whose model
+        number can't be read are read with READ_DATA.
+
+        Units which don't reply or which report an error get ``None``; their
+        errors are forwarded to the `error_callback` function but they are
+        not kept (see `collect_errors`).
+
+        :param requests: a sequence of ``(dynamixel_id, address, length)``
+            tuples (each Dynamixel unit can appear only once).
+        :return: the list of bytes read for each request.
+        """
+
+        requests = [tuple(request) for request in requests]
+
+        if self.protocol == 2 and len(requests) > 0:
+            inst_packet = p2.InstructionPacket2.bulk_read(requests)
+            return self._read_protocol2(inst_packet, requests)
+
+        bulk_requests = []
+        other_requests = []
+        for request in requests:
+            if self._supports_bulk_read(request[0]):
+                bulk_requests.append(request)
+            else:
+                other_requests.append(request)
+
+        if len(bulk_requests) < 2:
+            return self._read_each(requests)
+
+        results = dict(zip(bulk_requests, self._bulk_read(bulk_requests)))
+        results.update(zip(other_requests, self._read_each(other_requests)))
+
+        return [results[request] for request in requests]
+
+
+    def _supports_bulk_read(self, dynamixel_id):
+        """Return ``True`` if the specified Dynamixel unit supports the
+        Protocol 1.0 BULK_READ instruction.
+
+        The model number of the unit is read once. If the unit doesn't reply
+        or reports an error, this failure is cached too: the unit is read
+        with READ_DATA instruction packets until its model number is known
+        (e.g. from a read of its MODEL_NUMBER register).
+        """
+
+        if (dynamixel_id not in self.model_numbers
+                and dynamixel_id in self._unknown_model_ids):
+            return False
+
+        try:
+            model_number = self.get_cached_model_number(dynamixel_id)
+        except sp.StatusPacketError:
+            model_number = None
+
+        if model_number is None:
+            self._unknown_model_ids.add(dynamixel_id)
+            return False
+
+        return model_number in BULK_READ_MODEL_NUMBERS
+
+
+    def configure_staggered_read(self, dynamixel_ids, length,
+                                 guard_time=tm.DEFAULT_GUARD_TIME):
+        """Give the specified Dynamixel units staggered return delay times so
+        that `sync_read` can read them in a single round trip.
+
+        Each unit gets a distinct reply slot (see
+        `pyax12.timing.staggered_return_delay_times`): the READ_DATA
+        instruction packets are then sent back-to-back, without waiting for
+        status packets, and all status packets are collected in one receive
+        window. This works with any Protocol 1.0 unit (e.g. AX-12, which
+        doesn't support BULK_READ) but requires a high baud rate: at 1 Mbps,
+        about 6 units reading 2 bytes can share a round trip.
+
+        The RETURN_DELAY_TIME register of each unit is written (in RAM and
+        EEPROM): other software using these units should be aware of it.
+
+        :param dynamixel_ids: the sequence of unique ID of the Dynamixel units
+            (in the order `sync_read` will be called with).
+        :param int length: the maximum number of bytes read from each unit.
+        :param float guard_time: the idle time (in seconds) left between two
+            status packets.
+        :raise ValueError: if the units cannot be staggered at the current
+            baud rate.
+        """
+
+        dynamixel_ids = tuple(dynamixel_ids)
+        status_length = tm.STATUS_PACKET_OVERHEAD + length
+        return_delay_times = tm.staggered_return_delay_times(
+            self.timing, len(dynamixel_ids), status_length, guard_time)
+
+        for dynamixel_id, return_delay_time in zip(dynamixel_ids,
+                                                   return_delay_times):
+            raw_value = int(round(return_delay_time
+                                  / tm.RETURN_DELAY_TIME_UNIT))
+            self.write_data(dynamixel_id, pk.RETURN_DELAY_TIME, raw_value)
+
+        self.staggered_read_ids = dynamixel_ids
+        self.staggered_read_length = length
+
+
+    def _staggered_read(self, requests):
+        """Send the READ_DATA instruction packets of `requests` back-to-back
+        and return the bytes read for each request (the units must have been
+        configured by `configure_staggered_read`)."""
+
+        instruction_packet_bytes = b''.join(
+            ip.InstructionPacket(dynamixel_id, ip.READ_DATA,
+                                 (address, length)).to_bytes()
+            for dynamixel_id, address, length in requests)
+
+        expected_replies = [(dynamixel_id,
+                             tm.STATUS_PACKET_OVERHEAD + length)
+                            for dynamixel_id, address, length in requests]
+
+        # The last unit replies in the last slot
+        last_id, last_status_length = expected_replies[-1]
+        reply_time = (self.timing.transmission_time(
+                          len(instruction_packet_bytes))
+                      + self.timing.return_delay_time(last_id)
+                      + self.timing.transmission_time(last_status_length))
+
+        status_packets = self._exchange(instruction_packet_bytes,
+                                        expected_replies,
+                                        sp.split_status_packets,
+                                        reply_time)
+
+        return self._read_results(instruction_packet_bytes, requests,
+                                  status_packets, sp.StatusPacket,
+                                  sp.StatusPacketError, 2)
+
+
+    def _bulk_read(self, requests):
+        """Send a Protocol 1.0 BULK_READ instruction packet and return the
+        bytes read for each request."""
+
+        params = bytearray((0x00, ))
+        for dynamixel_id, address, length in requests:
+            params.extend((length, dynamixel_id, address))
+
+        inst_packet = ip.InstructionPacket(pk.BROADCAST_ID, ip.BULK_READ,
+                                           params)
+        instruction_packet_bytes = inst_packet.to_bytes()
+
+        expected_replies = [(dynamixel_id,
+                             tm.STATUS_PACKET_OVERHEAD + length)
+                            for dynamixel_id, address, length in requests]
+
+        status_packets = self._exchange(instruction_packet_bytes,
+                                        expected_replies,
+                                        sp.split_status_packets)
+
+        return self._read_results(instruction_packet_bytes, requests,
+                                  status_packets, sp.StatusPacket,
+                                  sp.StatusPacketError, 2)
+
+
+    def _read_protocol2(self, instruction_packet, requests):
+        """Send a Protocol 2.0 SYNC_READ or BULK_READ instruction packet and
+        return the bytes read for each request."""
+
+        expected_replies = [(dynamixel_id, p2.status_packet_length(length))
+                            for dynamixel_id, address, length in requests]
+        instruction_packet_bytes = instruction_packet.to_bytes()
+
+        status_packets = self._exchange(instruction_packet_bytes,
+                                        expected_replies,
+                                        p2.split_status_packets)
+
+        return self._read_results(instruction_packet_bytes, requests,
+                                  status_packets, p2.StatusPacket2,
+                                  p2.Protocol2Error, 4)
+
+
+    def _read_each(self, requests):
+        """Read each request with a READ_DATA instruction packet and return
+        the bytes read for each request."""
+
+        results = []
+
+        for dynamixel_id, address, length in requests:
+            error = None
+            try:
+                byte_seq = self.read_data(dynamixel_id, address, length)
+            except sp.StatusPacketError as read_error:
+                byte_seq = None
+                error = read_error
+            else:
+                if byte_seq is None:
+                    error = MissingStatusPacketError()
+
+            if error is not None:
+                inst_packet = ip.InstructionPacket(dynamixel_id, ip.READ_DATA,
+                                                   (address, length))
+                self._report_read_error(dynamixel_id, inst_packet.to_bytes(),
+                                        error)
+
+            results.append(byte_seq)
+
+        return results
+
+
     #def reset(self, dynamixel_id):
     #
     #    status_packet = self.send(instruction_packet)
@@ -263,7 +1515,7 @@ class Connection(object):
         :return: the sequence of all bytes in currently the *control table*.
         """
 
-        byte_seq = self.read_data(dynamixel_id, 0, 50)
+        byte_seq = self.read_data(dynamixel_id, 0, st.CONTROL_TABLE_LENGTH)
         return byte_seq
 
 
@@ -284,177 +1536,45 @@ class Connection(object):
         print(control_table_str)
 
 
-    def get_control_table_tuple(self, dynamixel_id):
-        """Return the *control table* of the specified Dynamixel unit in an
-        easily human readable tuple.
+    def get_servo_state(self, dynamixel_id):
+        """Return the raw register values of the specified Dynamixel unit as a
+        `pyax12.state.ServoState` (the whole *control table* is read in one
+        transaction).
 
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
+        :return: a `pyax12.state.ServoState` or ``None`` if the unit doesn't
+            reply.
         """
 
-        dxl_id = dynamixel_id   # use a shorter alias...
+        byte_seq = self.dump_control_table(dynamixel_id)
 
-        ####
+        if byte_seq is None or len(byte_seq) != st.CONTROL_TABLE_LENGTH:
+            return None
 
-        def angle_to_str(dxl_angle):
-            angle_degrees = utils.dxl_angle_to_degrees(dxl_angle)
-            angle_str = "{}° ({})".format(angle_degrees, dxl_angle)
-            return angle_str
+        return st.ServoState.from_bytes(byte_seq)
 
-        def abs_angle_to_str(dxl_angle):
-            angle_degrees = round(dxl_angle / 1023. * 300., 1)
-            angle_str = "{}° ({})".format(angle_degrees, dxl_angle)
-            return angle_str
 
-        ####
+    def get_control_table_tuple(self, dynamixel_id):
+        """Return the *control table* of the specified Dynamixel unit in an
+        easily human readable tuple.
 
-        model_number = self.get_model_number(dxl_id)
-        if model_number == 12:
-            model_number_str = "AX-12+"
-        elif model_number == 13:
-            model_number_str = "AX-S1"
-        else:
-            model_number_str = "Unknown (%i)" % model_number
+        The whole *control table* is read in one transaction (see
+        `get_servo_state`) and formatted by
+        `pyax12.state.format_control_table`.
 
-        baud_rate_str = "%s bps" % self.get_baud_rate(dxl_id)
-        return_delay_time_str = "%s µs" % self.get_return_delay_time(dxl_id)
+        :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
+            in range (0, 0xFD).
+        :return: a tuple of ``(name, value)`` pairs or ``None`` if the unit
+            doesn't reply.
+        """
 
-        cw_angle_limit_str = angle_to_str(self.get_cw_angle_limit(dxl_id))
-        ccw_angle_limit_str = angle_to_str(self.get_ccw_angle_limit(dxl_id))
+        servo_state = self.get_servo_state(dynamixel_id)
 
-        max_temperature_str = "%s°C" % self.get_max_temperature(dxl_id)
-        min_voltage_str = "%sV" % self.get_min_voltage(dxl_id)
-        max_voltage_str = "%sV" % self.get_max_voltage(dxl_id)
+        if servo_state is None:
+            return None
 
-        max_torque = self.get_max_torque(dxl_id)
-        if max_torque == 0:
-            max_torque_str = "0 (free run mode)"
-        else:
-            max_torque_str = max_torque
-
-        status_return_level = self.get_status_return_level(dxl_id)
-        if status_return_level == 0:
-            status_return_level_str = "0 (do not respond to any instructions)"
-        elif status_return_level == 1:
-            status_return_level_str = ("1 (respond only to READ_DATA"
-                                       " instructions)")
-        elif status_return_level == 2:
-            status_return_level_str = "2 (respond to all instructions)"
-        else:
-            status_return_level_str = "%i (unknown)" % status_return_level
-
-        voltage_alarm_led = self.has_input_voltage_alarm_led(dxl_id)
-        angle_limit_alarm_led = self.has_angle_limit_alarm_led(dxl_id)
-        overheating_alarm_led = self.has_overheating_alarm_led(dxl_id)
-        range_alarm_led = self.has_range_alarm_led(dxl_id)
-        checksum_alarm_led = self.has_checksum_alarm_led(dxl_id)
-        overload_alarm_led = self.has_overload_alarm_led(dxl_id)
-        instruction_alarm_led = self.has_instruction_alarm_led(dxl_id)
-
-        voltage_alarm_led_str = "on" if voltage_alarm_led else "off"
-        angle_limit_alarm_led_str = "on" if angle_limit_alarm_led else "off"
-        overheating_alarm_led_str = "on" if overheating_alarm_led else "off"
-        range_alarm_led_str = "on" if range_alarm_led else "off"
-        checksum_alarm_led_str = "on" if checksum_alarm_led else "off"
-        overload_alarm_led_str = "on" if overload_alarm_led else "off"
-        instruction_alarm_led_str = "on" if instruction_alarm_led else "off"
-
-        voltage_alarm_off = self.has_input_voltage_alarm_shutdown(dxl_id)
-        angle_limit_alarm_off = self.has_angle_limit_alarm_shutdown(dxl_id)
-        overheating_alarm_off = self.has_overheating_alarm_shutdown(dxl_id)
-        range_alarm_off = self.has_range_alarm_shutdown(dxl_id)
-        checksum_alarm_off = self.has_checksum_alarm_shutdown(dxl_id)
-        overload_alarm_off = self.has_overload_alarm_shutdown(dxl_id)
-        instruction_alarm_off = self.has_instruction_alarm_shutdown(dxl_id)
-
-        voltage_alarm_off_str = "on" if voltage_alarm_off else "off"
-        angle_limit_alarm_off_str = "on" if angle_limit_alarm_off else "off"
-        overheating_alarm_off_str = "on" if overheating_alarm_off else "off"
-        range_alarm_off_str = "on" if range_alarm_off else "off"
-        checksum_alarm_off_str = "on" if checksum_alarm_off else "off"
-        overload_alarm_off_str = "on" if overload_alarm_off else "off"
-        instruction_alarm_off_str = "on" if instruction_alarm_off else "off"
-
-        torque_enable_str = "yes" if self.is_torque_enable(dxl_id) else "no"
-        led_str = "on" if self.is_led_enabled(dxl_id) else "off"
-
-        cw_compliance_margin = self.get_cw_compliance_margin(dxl_id)
-        ccw_compliance_margin = self.get_ccw_compliance_margin(dxl_id)
-        cw_compliance_slope = self.get_cw_compliance_slope(dxl_id)
-        ccw_compliance_slope = self.get_ccw_compliance_slope(dxl_id)
-
-        cw_compliance_margin_str = abs_angle_to_str(cw_compliance_margin)
-        ccw_compliance_margin_str = abs_angle_to_str(ccw_compliance_margin)
-        cw_compliance_slope_str = abs_angle_to_str(cw_compliance_slope)
-        ccw_compliance_slope_str = abs_angle_to_str(ccw_compliance_slope)
-
-        goal_position_str = angle_to_str(self.get_goal_position(dxl_id))
-        position_str = angle_to_str(self.get_present_position(dxl_id))
-
-        voltage_str = "%sV" % self.get_present_voltage(dxl_id)
-        temperature_str = "%s°C" % self.get_present_temperature(dxl_id)
-
-        if self.has_registred_instruction(dxl_id):
-            registred_inst_str = "yes"
-        else:
-            registred_inst_str = "no"
-
-        moving_str = "yes" if self.is_moving(dxl_id) else "no"
-        locked_str = "yes" if self.is_locked(dxl_id) else "no"
-
-        ####
-
-        ctrl_table_tuple = (
-            ("model_number", model_number_str),
-            ("firmware_version", self.get_firmware_version(dxl_id)),
-            #("id", self.get_id(dxl_id)), # TODO: stupide...
-            ("id", dxl_id),
-            ("baud_rate", baud_rate_str),
-            ("return_delay_time", return_delay_time_str),
-            ("cw_angle_limit", cw_angle_limit_str),
-            ("ccw_angle_limit", ccw_angle_limit_str),
-            ("max_temperature", max_temperature_str),
-            ("min_voltage", min_voltage_str),
-            ("max_voltage", max_voltage_str),
-            ("max_torque", max_torque_str),
-            ("status_return_level", status_return_level_str),
-            ("input_voltage_alarm_led", voltage_alarm_led_str),
-            ("angle_limit_alarm_led", angle_limit_alarm_led_str),
-            ("overheating_alarm_led", overheating_alarm_led_str),
-            ("range_alarm_led", range_alarm_led_str),
-            ("checksum_alarm_led", checksum_alarm_led_str),
-            ("overload_alarm_led", overload_alarm_led_str),
-            ("instruction_alarm_led", instruction_alarm_led_str),
-            ("input_voltage_alarm_shutdown", voltage_alarm_off_str),
-            ("angle_limit_alarm_shutdown", angle_limit_alarm_off_str),
-            ("overheating_alarm_shutdown", overheating_alarm_off_str),
-            ("range_alarm_shutdown", range_alarm_off_str),
-            ("checksum_alarm_shutdown", checksum_alarm_off_str),
-            ("overload_alarm_shutdown", overload_alarm_off_str),
-            ("instruction_alarm_shutdown", instruction_alarm_off_str),
-            ("down_calibration", self.get_down_calibration(dxl_id)),
-            ("up_calibration", self.get_up_calibration(dxl_id)),
-            ("torque_enabled", torque_enable_str),
-            ("led", led_str),
-            ("cw_compliance_margin", cw_compliance_margin_str),
-            ("ccw_compliance_margin", ccw_compliance_margin_str),
-            ("cw_compliance_slope", cw_compliance_slope_str),
-            ("ccw_compliance_slope", ccw_compliance_slope_str),
-            ("goal_position", goal_position_str),
-            ("moving_speed", self.get_moving_speed(dxl_id)),
-            ("torque_limit", self.get_torque_limit(dxl_id)),
-            ("present_position", position_str),
-            ("present_speed", self.get_present_speed(dxl_id)),
-            ("present_load", self.get_present_load(dxl_id)),
-            ("present_voltage", voltage_str),
-            ("present_temperature", temperature_str),
-            ("registred_instruction", registred_inst_str),
-            ("moving", moving_str),
-            ("locked", locked_str),
-            ("punch", self.get_punch(dxl_id)),
-        )
-
-        return ctrl_table_tuple
+        return st.format_control_table(servo_state)
 
 
     def pretty_print_control_table(self, dynamixel_id):
@@ -493,8 +1613,147 @@ class Connection(object):
         return available_ids
 
 
+    def estimate_travel_time(self, dynamixel_ids):
+        """Return the estimated time (in seconds) needed by the specified
+        Dynamixel units to reach their goal position.
+
+        The estimation is based on the distance between the present and the
+        goal positions of each unit and on its moving speed (a null moving
+        speed means the maximum speed). Units which don't reply are ignored.
+
+        :param dynamixel_ids: a sequence of unique ID of Dynamixel units.
+        """
+
+        travel_time = 0.
+
+        # Read GOAL_POSITION to PRESENT_POSITION of all units at once
+        byte_seqs = self.sync_read(dynamixel_ids, pk.GOAL_POSITION, 8)
+
+        for byte_seq in byte_seqs.values():
+            if byte_seq is None or len(byte_seq) != 8:
+                continue
+
+            goal_position = utils.little_endian_bytes_to_int(byte_seq[0:2])
+            speed = utils.little_endian_bytes_to_int(byte_seq[2:4]) & 0x3ff
+            present_position = utils.little_endian_bytes_to_int(byte_seq[6:8])
+
+            if speed == 0:
+                speed = 0x3ff
+
+            distance = abs(goal_position - present_position)
+            unit_travel_time = distance / (speed * POSITION_UNITS_PER_SPEED_UNIT)
+            travel_time = max(travel_time, unit_travel_time)
+
+        return travel_time
+
+
+    def wait_until_stopped(self, dynamixel_ids, timeout=None):
+        """Wait until the specified Dynamixel units are not moving anymore.
+
+        The travel time is first estimated (see `estimate_travel_time`) and
+        slept; then the MOVING register of the units which are still moving
+        is polled (with a single `sync_read` per poll) with an increasing
+        polling period to spare the bus.
+
+        The wait never lasts longer than `TRAVEL_TIME_FACTOR` times the
+        estimated travel time (or `MIN_TRAVEL_TIMEOUT`), and it is given up if
+        a unit misses `MAX_MISSING_MOVING_REPLIES` polls in a row (e.g. if it
+        has been unplugged).
+
+        The broadcast ID can't be used here as the units don't reply to it.
+
+        :param dynamixel_ids: a sequence of unique ID of Dynamixel units (or
+            a single ID).
+        :param float timeout: the maximum waiting time (in seconds). If
+            ``None``, the wait is only bounded by the estimated travel time.
+        :return: ``True`` if all units stopped, ``False`` if the timeout
+            expired or if a unit doesn't reply anymore.
+        :raise ValueError: if `dynamixel_ids` contains the broadcast ID.
+        """
+
+        if isinstance(dynamixel_ids, int):
+            dynamixel_ids = (dynamixel_ids, )
+
+        if pk.BROADCAST_ID in dynamixel_ids:
+            msg = ("The units don't reply to the broadcast ID: their motion "
+                   "can't be waited for.")
+            raise ValueError(msg)
+
+        start_time = time.monotonic()
+
+        travel_time = self.estimate_travel_time(dynamixel_ids)
+
+        deadline = start_time + max(TRAVEL_TIME_FACTOR * travel_time,
+                                    MIN_TRAVEL_TIMEOUT)
+        if timeout is not None:
+            deadline = min(deadline, start_time + timeout)
+
+        arrival_time = start_time + ARRIVAL_TIME_RATIO * travel_time
+        delay = min(arrival_time, deadline) - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        moving_ids = list(dynamixel_ids)
+        num_missing_replies = {dynamixel_id: 0 for dynamixel_id in moving_ids}
+        polling_period = MIN_MOVING_POLLING_PERIOD
+
+        while True:
+            byte_seqs = self.sync_read(moving_ids, pk.MOVING, 1)
+
+            still_moving_ids = []
+            for dynamixel_id in moving_ids:
+                byte_seq = byte_seqs[dynamixel_id]
+                if byte_seq is None:
+                    num_missing_replies[dynamixel_id] += 1
+                    if (num_missing_replies[dynamixel_id]
+                            >= MAX_MISSING_MOVING_REPLIES):
+                        return False
+                    still_moving_ids.append(dynamixel_id)
+                else:
+                    num_missing_replies[dynamixel_id] = 0
+                    if byte_seq[0] != 0:
+                        still_moving_ids.append(dynamixel_id)
+            moving_ids = still_moving_ids
+
+            now = time.monotonic()
+            if len(moving_ids) == 0:
+                return True
+            if now >= deadline:
+                return False
+
+            time.sleep(min(polling_period, deadline - now))
+            polling_period = min(polling_period * MOVING_POLLING_BACKOFF,
+                                 MAX_MOVING_POLLING_PERIOD)
+
+
     # HIGH LEVEL ACCESSORS ####################################################
 
+    def _read_register(self, dynamixel_id, address, length):
+        """Read bytes from the control table of the specified Dynamixel unit
+        (as `read_data`) or raise an exception if no status packet is
+        received.
+
+        :raise CircuitOpenError: if the circuit of the unit is open (see
+            `pyax12.retry.CircuitBreaker`).
+        :raise MissingStatusPacketError: if the unit doesn't reply.
+        """
+
+        was_open = (self.circuit_breaker is not None
+                    and self.circuit_breaker.is_open(dynamixel_id))
+
+        byte_seq = self.read_data(dynamixel_id, address, length)
+
+        if byte_seq is None:
+            if was_open and self.circuit_breaker.is_open(dynamixel_id):
+                msg = "The circuit of Dynamixel unit {} is open."
+                raise CircuitOpenError(msg.format(dynamixel_id))
+
+            msg = "Dynamixel unit {} doesn't reply."
+            raise MissingStatusPacketError(msg.format(dynamixel_id))
+
+        return byte_seq
+
+
 
     def get_model_number(self, dynamixel_id):
         """Return the model number of the specified Dynamixel unit.
@@ -504,7 +1763,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.MODEL_NUMBER, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.MODEL_NUMBER, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -514,7 +1773,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.VERSION_OF_FIRMWARE, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.VERSION_OF_FIRMWARE, 1)
         return byte_seq[0]
 
 
@@ -525,7 +1784,7 @@ class Connection(object):
 #        :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
 #            in range (0, 0xFD).
 #        """
-#        byte_seq = self.read_data(dynamixel_id, pk.ID, 1)
+#        byte_seq = self._read_register(dynamixel_id, pk.ID, 1)
 #        return byte_seq[0]
 
 
@@ -538,7 +1797,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.BAUD_RATE, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.BAUD_RATE, 1)
         raw_value = byte_seq[0]
 
         baud_rate = 2000000 / (raw_value + 1)
@@ -555,7 +1814,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.RETURN_DELAY_TIME, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.RETURN_DELAY_TIME, 1)
         raw_value = byte_seq[0]
 
         delay_time = 2 * raw_value
@@ -573,7 +1832,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.CW_ANGLE_LIMIT, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.CW_ANGLE_LIMIT, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -588,7 +1847,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.CCW_ANGLE_LIMIT, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.CCW_ANGLE_LIMIT, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -604,7 +1863,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.HIGHEST_LIMIT_TEMPERATURE, 1)
+        byte_seq = self._read_register(dynamixel_id,
+                                       pk.HIGHEST_LIMIT_TEMPERATURE, 1)
         return byte_seq[0]
 
 
@@ -620,7 +1880,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.LOWEST_LIMIT_VOLTAGE, 1)
+        byte_seq = self._read_register(dynamixel_id,
+                                       pk.LOWEST_LIMIT_VOLTAGE, 1)
         raw_value = byte_seq[0]
 
         min_voltage = raw_value / 10.
@@ -639,7 +1900,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.HIGHEST_LIMIT_VOLTAGE, 1)
+        byte_seq = self._read_register(dynamixel_id,
+                                       pk.HIGHEST_LIMIT_VOLTAGE, 1)
         raw_value = byte_seq[0]
 
         max_voltage = raw_value / 10.
@@ -660,7 +1922,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.MAX_TORQUE, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.MAX_TORQUE, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -681,7 +1943,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.STATUS_RETURN_LEVEL, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.STATUS_RETURN_LEVEL, 1)
         return byte_seq[0]
 
 
@@ -692,7 +1954,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_LED, 1)
         alarm_led_byte = byte_seq[0]
 
         return bool(alarm_led_byte & (1 << 0))
@@ -705,7 +1967,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_LED, 1)
         alarm_led_byte = byte_seq[0]
 
         return bool(alarm_led_byte & (1 << 1))
@@ -718,7 +1980,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_LED, 1)
         alarm_led_byte = byte_seq[0]
 
         return bool(alarm_led_byte & (1 << 2))
@@ -731,7 +1993,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_LED, 1)
         alarm_led_byte = byte_seq[0]
 
         return bool(alarm_led_byte & (1 << 3))
@@ -744,7 +2006,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_LED, 1)
         alarm_led_byte = byte_seq[0]
 
         return bool(alarm_led_byte & (1 << 4))
@@ -757,7 +2019,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_LED, 1)
         alarm_led_byte = byte_seq[0]
 
         return bool(alarm_led_byte & (1 << 5))
@@ -770,7 +2032,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_LED, 1)
         alarm_led_byte = byte_seq[0]
 
         return bool(alarm_led_byte & (1 << 6))
@@ -783,7 +2045,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
         alarm_shutdown_byte = byte_seq[0]
 
         return bool(alarm_shutdown_byte & (1 << 0))
@@ -796,7 +2058,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
         alarm_shutdown_byte = byte_seq[0]
 
         return bool(alarm_shutdown_byte & (1 << 1))
@@ -809,7 +2071,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
         alarm_shutdown_byte = byte_seq[0]
 
         return bool(alarm_shutdown_byte & (1 << 2))
@@ -822,7 +2084,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
         alarm_shutdown_byte = byte_seq[0]
 
         return bool(alarm_shutdown_byte & (1 << 3))
@@ -835,7 +2097,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
         alarm_shutdown_byte = byte_seq[0]
 
         return bool(alarm_shutdown_byte & (1 << 4))
@@ -848,7 +2110,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
         alarm_shutdown_byte = byte_seq[0]
 
         return bool(alarm_shutdown_byte & (1 << 5))
@@ -861,7 +2123,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.ALARM_SHUTDOWN, 1)
         alarm_shutdown_byte = byte_seq[0]
 
         return bool(alarm_shutdown_byte & (1 << 6))
@@ -876,7 +2138,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.DOWN_CALIBRATION, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.DOWN_CALIBRATION, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -889,7 +2151,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.UP_CALIBRATION, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.UP_CALIBRATION, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -900,7 +2162,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.TORQUE_ENABLE, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.TORQUE_ENABLE, 1)
         return byte_seq[0] == 1
 
 
@@ -911,7 +2173,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.LED, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.LED, 1)
         return byte_seq[0] == 1
 
 
@@ -957,7 +2219,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.CW_COMPLIENCE_MARGIN, 1)
+        byte_seq = self._read_register(dynamixel_id,
+                                       pk.CW_COMPLIENCE_MARGIN, 1)
         return byte_seq[0]
 
 
@@ -1003,7 +2266,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.CCW_COMPLIENCE_MARGIN, 1)
+        byte_seq = self._read_register(dynamixel_id,
+                                       pk.CCW_COMPLIENCE_MARGIN, 1)
         return byte_seq[0]
 
 
@@ -1049,7 +2313,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.CW_COMPLIENCE_SLOPE, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.CW_COMPLIENCE_SLOPE, 1)
         return byte_seq[0]
 
 
@@ -1095,7 +2359,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.CCW_COMPLIENCE_SLOPE, 1)
+        byte_seq = self._read_register(dynamixel_id,
+                                       pk.CCW_COMPLIENCE_SLOPE, 1)
         return byte_seq[0]
 
 
@@ -1106,7 +2371,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.GOAL_POSITION, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.GOAL_POSITION, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -1124,7 +2389,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.MOVING_SPEED, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.MOVING_SPEED, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -1134,7 +2399,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.TORQUE_LIMIT, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.TORQUE_LIMIT, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -1150,7 +2415,7 @@ class Connection(object):
             position to the origin, defined in range (0, 1023) i.e. (0, 0x3FF)
             in hexadecimal notation.
         """
-        byte_seq = self.read_data(dynamixel_id, pk.PRESENT_POSITION, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.PRESENT_POSITION, 2)
         position = utils.little_endian_bytes_to_int(byte_seq)
 
         if degrees:
@@ -1165,7 +2430,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.PRESENT_SPEED, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.PRESENT_SPEED, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -1183,7 +2448,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = bytearray(self.read_data(dynamixel_id, pk.PRESENT_LOAD, 2))
+        byte_seq = bytearray(self._read_register(dynamixel_id,
+                                                 pk.PRESENT_LOAD, 2))
 
         load_direction = -1 if (byte_seq[1] & (1 << 2)) == 0 else 1
 
@@ -1202,7 +2468,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.PRESENT_VOLTAGE, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.PRESENT_VOLTAGE, 1)
         raw_value = byte_seq[0]
 
         voltage = raw_value / 10.
@@ -1216,7 +2482,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.PRESENT_TEMPERATURE, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.PRESENT_TEMPERATURE, 1)
         return byte_seq[0]
 
 
@@ -1228,7 +2494,8 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.REGISTRED_INSTRUCTION, 1)
+        byte_seq = self._read_register(dynamixel_id,
+                                       pk.REGISTRED_INSTRUCTION, 1)
         return byte_seq[0] == 1
 
 
@@ -1239,7 +2506,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.MOVING, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.MOVING, 1)
         return byte_seq[0] == 1
 
 
@@ -1254,7 +2521,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.LOCK, 1)
+        byte_seq = self._read_register(dynamixel_id, pk.LOCK, 1)
         return byte_seq[0] == 1
 
 
@@ -1302,7 +2569,7 @@ class Connection(object):
         :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
             in range (0, 0xFD).
         """
-        byte_seq = self.read_data(dynamixel_id, pk.PUNCH, 2)
+        byte_seq = self._read_register(dynamixel_id, pk.PUNCH, 2)
         return utils.little_endian_bytes_to_int(byte_seq)
 
 
@@ -1405,6 +2672,37 @@ class Connection(object):
         self.write_data(dynamixel_id, pk.RETURN_DELAY_TIME, return_delay_time)
 
 
+    def set_status_return_level(self, dynamixel_id, status_return_level):
+        """Set the *status return level* of the specified Dynamixel unit i.e.
+        define which instructions are answered with a *Status Packet*.
+
+        +-------+----------------------------------------+
+        | Value | Meaning                                |
+        +=======+========================================+
+        | 0     | Do not respond to any instructions     |
+        +-------+----------------------------------------+
+        | 1     | Respond only to READ_DATA instructions |
+        +-------+----------------------------------------+
+        | 2     | Respond to all instructions            |
+        +-------+----------------------------------------+
+
+        With a status return level of 0 or 1, writes are sent without waiting
+        for any reply.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit. It must be
+            in range (0, 0xFE).
+        :param int status_return_level: the new status return level. It must
+            be in range (0, 2).
+        """
+
+        if status_return_level not in (0, 1, 2):
+            msg = "Wrong status return level: {} (should be 0, 1 or 2)."
+            raise ValueError(msg.format(status_return_level))
+
+        self.write_data(dynamixel_id, pk.STATUS_RETURN_LEVEL,
+                        status_return_level)
+
+
     def set_cw_angle_limit(self, dynamixel_id, angle_limit, degrees=False):
         """Set the *clockwise angle limit* of the specified Dynamixel unit to
         the specified `angle_limit`.
@@ -1482,7 +2780,8 @@ class Connection(object):
         self.write_data(dynamixel_id, pk.MOVING_SPEED, params)
 
 
-    def goto(self, dynamixel_id, position, speed=None, degrees=False):
+    def goto(self, dynamixel_id, position, speed=None, degrees=False,
+             blocking=True, wait=False, timeout=None):
         """Set the *goal position* and *moving speed* for the specified
         Dynamixel unit.
 
@@ -1503,9 +2802,26 @@ class Connection(object):
             degrees* with respect to the original position and must be in range
             (-150, 150). Otherwise, `position` is a unit free angular position,
             defined in range (0, 1023) i.e. (0, 0x3FF) in hexadecimal notation.
+        :param bool blocking: if ``False``, the instruction packet is sent
+            without waiting for the status packet (see `post`).
+        :param bool wait: if ``True``, wait until the Dynamixel unit reaches
+            its goal position (see `wait_until_stopped`). It can't be used
+            with the broadcast ID.
+        :param float timeout: the maximum waiting time (in seconds) if `wait`
+            is ``True``.
+        :return: if `wait` is ``True``, return ``False`` if the timeout expired
+            before the goal position was reached (or if the unit doesn't reply
+            anymore) and ``True`` otherwise.
+        :raise ValueError: if `wait` is ``True`` and `dynamixel_id` is the
+            broadcast ID.
         """
         # TODO: check ranges
 
+        if wait and dynamixel_id == pk.BROADCAST_ID:
+            msg = ("The units don't reply to the broadcast ID: their motion "
+                   "can't be waited for.")
+            raise ValueError(msg)
+
         if degrees:
             position = utils.degrees_to_dxl_angle(position)
 
@@ -1514,5 +2830,9 @@ class Connection(object):
         if speed is not None:
             params += utils.int_to_little_endian_bytes(speed)
 
-        self.write_data(dynamixel_id, pk.GOAL_POSITION, params)
+        self.write_data(dynamixel_id, pk.GOAL_POSITION, params,
+                        blocking=blocking)
+
+        if wait:
+            return self.wait_until_stopped((dynamixel_id, ), timeout)
 
@@ -0,0 +1,671 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the ``pyax12d`` daemon which owns a serial port and
+exposes the `Connection` API to local clients over a Unix domain socket.
+
+The daemon keeps a warm `Connection` (no port opening or flushing costs for
+each command) and lets several programs share the same bus: requests
+received from all clients during a cycle are executed one after the other,
+and identical read requests of a cycle (e.g. several clients polling the same
+register) are executed only once.
+
+Start the daemon::
+
+    pyax12d --port /dev/ttyUSB0 --baudrate 1000000
+
+and talk to it::
+
+    client = DaemonClient()
+    client.ping(3)
+    client.goto(3, 0, speed=512, degrees=True)
+    client.close()
+
+Messages are framed with a 4 bytes length prefix and encoded with a compact
+tagged binary format (see `encode` and `decode`).
+
+The socket is created in the runtime directory of the user
+(``$XDG_RUNTIME_DIR``, ``/tmp`` if it is not set) and only its owner can
+connect to it (see the `socket_mode` argument of `BusDaemon`). Since requests
+are executed one at a time, operations which could hold the bus for long are
+bounded: `Connection.wait_until_stopped` (and `Connection.goto` with
+``wait=True``) return after at most `max_wait_time` seconds and scans are
+limited to `max_scan_ids` IDs.
+"""
+
+__all__ = ['BusDaemon',
+           'DaemonClient',
+           'DaemonError',
+           'encode',
+           'decode',
+           'main']
+
+import inspect
+import os
+import selectors
+import socket
+import stat
+import struct
+import threading
+import time
+
+import pyax12.status_packet as sp
+
+# GENERAL CONSTANTS
+
+DEFAULT_SOCKET_PATH = os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'),
+                                   'pyax12d.sock')
+DEFAULT_SOCKET_MODE = 0o600
+
+DEFAULT_MAX_WAIT_TIME = 0.2     # seconds
+DEFAULT_MAX_SCAN_IDS = 32
+
+# The maximum size of the replies buffered for a client which doesn't read
+# them (the client is then disconnected)
+MAX_OUTPUT_SIZE = 1 << 24
+
+FRAME_HEADER = struct.Struct('<I')
+RECV_SIZE = 65536
+
+# The Connection methods which don't change the state of Dynamixel units
+# (identical requests of a cycle are executed once)
+READ_METHOD_PREFIXES = ('get_', 'has_', 'is_')
+READ_METHODS = ('ping', 'read_data', 'dump_control_table', 'scan',
+                'estimate_travel_time')
+
+# The other Connection methods exposed by the daemon
+WRITE_METHOD_PREFIXES = ('set_', )
+WRITE_METHODS = ('write_data', 'sync_write', 'goto', 'wait_until_stopped',
+                 'declare_status_return_level')
+
+# The methods which can hold the bus for long (see BusDaemon._bound_request)
+LONG_METHODS = ('scan', 'wait_until_stopped', 'goto')
+
+# EXCEPTION CLASSES ###########################################################
+
+class DaemonError(Exception):
+    """Exception raised by `DaemonClient` if a request failed in the daemon
+    (with an error which is not a `pyax12.status_packet` exception), and by
+    `BusDaemon` if another daemon already serves the socket path."""
+    pass
+
+# ENCODING ####################################################################
+
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+_LENGTH = struct.Struct('<I')
+
+def encode(obj):
+    """Encode an object into bytes.
+
+    Supported types are ``None``, booleans, integers (64 bits), floats, bytes
+    (and bytearrays), strings, lists (and tuples) and dictionaries.
+
+    :param obj: the object to encode.
+    """
+    chunks = []
+    _encode(obj, chunks)
+    return b''.join(chunks)
+
+
+def _encode(obj, chunks):
+    if obj is None:
+        chunks.append(b'N')
+    elif obj is True:
+        chunks.append(b'T')
+    elif obj is False:
+        chunks.append(b'F')
+    elif isinstance(obj, int):
+        chunks.append(b'i' + _INT.pack(obj))
+    elif isinstance(obj, float):
+        chunks.append(b'd' + _FLOAT.pack(obj))
+    elif isinstance(obj, (bytes, bytearray)):
+        chunks.append(b'b' + _LENGTH.pack(len(obj)) + bytes(obj))
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        chunks.append(b's' + _LENGTH.pack(len(data)) + data)
+    elif isinstance(obj, (list, tuple)):
+        chunks.append(b'l' + _LENGTH.pack(len(obj)))
+        for item in obj:
+            _encode(item, chunks)
+    elif isinstance(obj, dict):
+        chunks.append(b'm' + _LENGTH.pack(len(obj)))
+        for key, value in obj.items():
+            _encode(key, chunks)
+            _encode(value, chunks)
+    else:
+        raise TypeError("Cannot encode {} objects.".format(type(obj).__name__))
+
+
+def decode(data):
+    """Decode bytes produced by `encode` (lists and tuples are decoded as
+    lists).
+
+    :param bytes data: the bytes to decode.
+    """
+    obj, offset = _decode(bytes(data), 0)
+    if offset != len(data):
+        raise ValueError("Trailing bytes.")
+    return obj
+
+
+def _decode(data, offset):
+    tag = data[offset:offset + 1]
+    offset += 1
+
+    if tag == b'N':
+        return None, offset
+    elif tag == b'T':
+        return True, offset
+    elif tag == b'F':
+        return False, offset
+    elif tag == b'i':
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    elif tag == b'd':
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    elif tag in (b'b', b's', b'l', b'm'):
+        length = _LENGTH.unpack_from(data, offset)[0]
+        offset += _LENGTH.size
+        if tag == b'b':
+            return data[offset:offset + length], offset + length
+        elif tag == b's':
+            return (data[offset:offset + length].decode('utf-8'),
+                    offset + length)
+        elif tag == b'l':
+            items = []
+            for index in range(length):
+                item, offset = _decode(data, offset)
+                items.append(item)
+            return items, offset
+        else:
+            items = {}
+            for index in range(length):
+                key, offset = _decode(data, offset)
+                items[key], offset = _decode(data, offset)
+            return items, offset
+    else:
+        raise ValueError("Unknown tag: {!r}.".format(tag))
+
+
+def _frame(obj):
+    data = encode(obj)
+    return FRAME_HEADER.pack(len(data)) + data
+
+
+def _split_frames(buffer):
+    """Return the complete frames of `buffer` (a bytearray), which are removed
+    from it."""
+
+    frames = []
+    while len(buffer) >= FRAME_HEADER.size:
+        length = FRAME_HEADER.unpack_from(buffer)[0]
+        end = FRAME_HEADER.size + length
+        if len(buffer) < end:
+            break
+        frames.append(bytes(buffer[FRAME_HEADER.size:end]))
+        del buffer[:end]
+    return frames
+
+# SERVER ######################################################################
+
+def _remove_stale_socket(path):
+    """Remove the socket file left at `path` by a daemon which is not
+    running anymore.
+
+    :raise DaemonError: if another daemon accepts connections on `path`.
+    :raise FileExistsError: if `path` exists and is not a socket.
+    """
+
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        msg = "{} exists and is not a socket."
+        raise FileExistsError(msg.format(path))
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)             # nobody listens: stale socket file
+    else:
+        msg = "Another daemon is already serving {}."
+        raise DaemonError(msg.format(path))
+    finally:
+        probe.close()
+
+
+def is_read_method(name):
+    """Return ``True`` if the specified `Connection` method doesn't change the
+    state of Dynamixel units."""
+    return name.startswith(READ_METHOD_PREFIXES) or name in READ_METHODS
+
+
+def is_exposed_method(name):
+    """Return ``True`` if the specified `Connection` method can be called
+    through the daemon."""
+    return (is_read_method(name)
+            or name.startswith(WRITE_METHOD_PREFIXES)
+            or name in WRITE_METHODS)
+
+
+class BusDaemon(object):
+    """Serve the `Connection` API on a Unix domain socket.
+
+    Requests are ``[request_id, method_name, args, kwargs]`` lists and
+    replies are ``[request_id, True, result]`` or
+    ``[request_id, False, [error_class_name, error_message]]`` lists.
+
+    :param connection: the `Connection` instance of the bus.
+    :param str path: the path of the Unix domain socket.
+    :param float cycle_period: the time (in seconds) spent collecting
+        requests before a cycle is executed (0 to execute requests as soon
+        as they are received).
+    :param int socket_mode: the permissions of the socket file (e.g.
+        ``0o660`` to let the group of the owner connect).
+    :param float max_wait_time: the maximum time (in seconds) a
+        `Connection.wait_until_stopped` request (or a `Connection.goto`
+        request with ``wait=True``) can wait; clients call it again while it
+        returns ``False``.
+    :param int max_scan_ids: the maximum number of IDs of a
+        `Connection.scan` request (the full range of IDs must be scanned in
+        several requests).
+    :raise DaemonError: if another daemon is serving `path`.
+    :raise FileExistsError: if `path` exists and is not a socket (a socket
+        file left by a daemon which is not running anymore is removed).
+    """
+
+    def __init__(self, connection, path=DEFAULT_SOCKET_PATH,
+                 cycle_period=0., socket_mode=DEFAULT_SOCKET_MODE,
+                 max_wait_time=DEFAULT_MAX_WAIT_TIME,
+                 max_scan_ids=DEFAULT_MAX_SCAN_IDS):
+
+        self.connection = connection
+        self.path = path
+        self.cycle_period = cycle_period
+        self.max_wait_time = max_wait_time
+        self.max_scan_ids = max_scan_ids
+
+        self.num_cycles = 0
+        self.num_requests = 0
+        self.num_executed_requests = 0
+
+        _remove_stale_socket(path)
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+        # Nobody else can connect between bind() and chmod()
+        former_umask = os.umask(0o177)
+        try:
+            self._socket.bind(path)
+        finally:
+            os.umask(former_umask)
+        os.chmod(path, socket_mode)
+
+        self._socket.listen()
+        self._socket.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._socket, selectors.EVENT_READ)
+        self._buffers = {}          # client -> received bytes
+        self._outputs = {}          # client -> replies not sent yet
+
+        self._stop_event = threading.Event()
+
+
+    def serve_forever(self):
+        """Serve requests until `stop` is called."""
+
+        try:
+            while not self._stop_event.is_set():
+                requests = self._poll(0.1)
+
+                if len(requests) > 0 and self.cycle_period > 0.:
+                    deadline = time.monotonic() + self.cycle_period
+                    remaining_time = self.cycle_period
+                    while remaining_time > 0.:
+                        requests.extend(self._poll(remaining_time))
+                        remaining_time = deadline - time.monotonic()
+
+                if len(requests) > 0:
+                    self.run_cycle(requests)
+        finally:
+            self.close()
+
+
+    def stop(self):
+        """Stop `serve_forever` (can be called from another thread)."""
+        self._stop_event.set()
+
+
+    def _poll(self, timeout):
+        """Accept new clients and return the ``(client, frame)`` requests
+        received within `timeout` seconds."""
+
+        requests = []
+
+        for key, mask in self._selector.select(timeout):
+            if key.fileobj is self._socket:
+                client, address = self._socket.accept()
+                client.setblocking(False)
+                self._selector.register(client, selectors.EVENT_READ)
+                self._buffers[client] = bytearray()
+                self._outputs[client] = bytearray()
+                continue
+
+            client = key.fileobj
+
+            if mask & selectors.EVENT_WRITE:
+                self._flush(client)
+
+            if not mask & selectors.EVENT_READ or client not in self._buffers:
+                continue
+
+            try:
+                data = client.recv(RECV_SIZE)
+            except ConnectionError:
+                data = b''
+
+            if len(data) == 0:
+                self._disconnect(client)
+                continue
+
+            buffer = self._buffers[client]
+            buffer.extend(data)
+            for frame in _split_frames(buffer):
+                requests.append((client, frame))
+
+        return requests
+
+
+    def run_cycle(self, requests):
+        """Execute a batch of requests and send the replies.
+
+        :param requests: a list of ``(client, frame)`` tuples.
+        """
+
+        # The results of the read requests of this cycle (they are forgotten
+        # after each write request)
+        read_results = {}
+
+        for client, frame in requests:
+            self.num_requests += 1
+            try:
+                request_id, name, args, kwargs = decode(frame)
+            except (ValueError, TypeError, struct.error):
+                self._disconnect(client)
+                continue
+
+            key = encode([name, args, kwargs])
+            if is_read_method(name) and key in read_results:
+                reply = read_results[key]
+            else:
+                reply = self._execute(name, args, kwargs)
+                if is_read_method(name):
+                    read_results[key] = reply
+                else:
+                    read_results.clear()
+
+            if client.fileno() < 0:
+                continue        # disconnected during this cycle
+
+            output = self._outputs.setdefault(client, bytearray())
+            output += _frame([request_id] + reply)
+            self._flush(client)
+
+        self.num_cycles += 1
+
+
+    def _execute(self, name, args, kwargs):
+        self.num_executed_requests += 1
+
+        if not is_exposed_method(name):
+            return [False, ['DaemonError', "Unknown method: " + name]]
+
+        try:
+            args, kwargs = self._bound_request(name, args, kwargs)
+            result = getattr(self.connection, name)(*args, **kwargs)
+            encode(result)    # check the result can be sent
+        except Exception as error:
+            return [False, [type(error).__name__, str(error)]]
+
+        return [True, result]
+
+
+    def _bound_request(self, name, args, kwargs):
+        """Return the arguments of a request, with the waiting time of
+        `LONG_METHODS` bounded by `max_wait_time`.
+
+        :raise DaemonError: if the request would hold the bus too long.
+        """
+
+        if name not in LONG_METHODS:
+            return args, kwargs
+
+        method = getattr(self.connection, name)
+        bound_arguments = inspect.signature(method).bind(*args, **kwargs)
+        bound_arguments.apply_defaults()
+        arguments = bound_arguments.arguments
+
+        if name == 'scan':
+            dynamixel_ids = arguments['dynamixel_id_bytes']
+            if dynamixel_ids is None or len(dynamixel_ids) > self.max_scan_ids:
+                msg = "Scans are limited to {} IDs per request."
+                raise DaemonError(msg.format(self.max_scan_ids))
+        elif name == 'wait_until_stopped' or arguments['wait']:
+            timeout = arguments['timeout']
+            if timeout is None or timeout > self.max_wait_time:
+                arguments['timeout'] = self.max_wait_time
+
+        return bound_arguments.args, bound_arguments.kwargs
+
+
+    def _flush(self, client):
+        """Send the buffered replies of a client (as much as its socket
+        accepts); the socket is watched for writability while replies are
+        left."""
+
+        output = self._outputs[client]
+
+        try:
+            num_bytes = client.send(output)
+        except (BlockingIOError, InterruptedError):
+            num_bytes = 0
+        except OSError:
+            self._disconnect(client)
+            return
+
+        del output[:num_bytes]
+
+        if len(output) > MAX_OUTPUT_SIZE:
+            self._disconnect(client)
+            return
+
+        if client in self._buffers:
+            events = selectors.EVENT_READ
+            if len(output) > 0:
+                events |= selectors.EVENT_WRITE
+            if self._selector.get_key(client).events != events:
+                self._selector.modify(client, events)
+
+
+    def _disconnect(self, client):
+        self._outputs.pop(client, None)
+        if client in self._buffers:
+            self._selector.unregister(client)
+            del self._buffers[client]
+            client.close()
+
+
+    def close(self):
+        """Close the socket and the connections of the clients (done by
+        `serve_forever` when it returns)."""
+
+        for client in list(self._buffers):
+            self._disconnect(client)
+        self._selector.close()
+        self._socket.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+# CLIENT ######################################################################
+
+class DaemonClient(object):
+    """Call `Connection` methods through a `BusDaemon`.
+
+    Methods of the `Connection` class exposed by the daemon can be called
+    directly on the client (e.g. ``client.ping(3)``). Errors raised by the
+    `pyax12.status_packet` module are raised again by the client; other
+    errors are raised as `DaemonError`.
+
+    :param str path: the path of the Unix domain socket of the daemon.
+    :param float timeout: the timeout (in seconds) of each request.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET_PATH, timeout=10.):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._buffer = bytearray()
+        self._request_id = 0
+
+
+    def call(self, name, *args, **kwargs):
+        """Call the specified `Connection` method in the daemon and return
+        its result.
+
+        :param str name: the name of the `Connection` method.
+        """
+
+        self._request_id += 1
+        self._socket.sendall(_frame([self._request_id, name, list(args),
+                                     kwargs]))
+
+        reply = None
+        while reply is None:
+            data = self._socket.recv(RECV_SIZE)
+            if len(data) == 0:
+                raise DaemonError("Connection closed by the daemon.")
+            self._buffer.extend(data)
+
+            # Late replies of requests which timed out are dropped
+            for frame in _split_frames(self._buffer):
+                decoded_frame = decode(frame)
+                if decoded_frame[0] == self._request_id:
+                    reply = decoded_frame
+
+        request_id, success, result = reply
+
+        if success:
+            return result
+
+        error_name, message = result
+        error_class = getattr(sp, error_name, None)
+        if isinstance(error_class, type) and issubclass(error_class,
+                                                        Exception):
+            raise error_class(message)
+        raise DaemonError("{}: {}".format(error_name, message))
+
+
+    def __getattr__(self, name):
+        if not is_exposed_method(name):
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            return self.call(name, *args, **kwargs)
+
+        method.__name__ = name
+        return method
+
+
+    def pretty_print_control_table(self, dynamixel_id):
+        """Print the *control table* of the specified Dynamixel unit (see
+        `Connection.pretty_print_control_table`)."""
+
+        for key, value in self.get_control_table_tuple(dynamixel_id):
+            print("{:.<29} {}".format(key, value))
+
+
+    def close(self):
+        """Close the connection with the daemon."""
+        self._socket.close()
+
+# MAIN FUNCTION ###############################################################
+
+def main(argv=None):
+    """The entry point of the ``pyax12d`` command.
+
+    :param list argv: the command line arguments (``sys.argv[1:]`` by
+        default).
+    """
+
+    from pyax12.argparse_default import common_argument_parser
+    from pyax12.connection import Connection
+
+    parser = common_argument_parser(desc="Share a Dynamixel bus between "
+                                         "local programs.",
+                                    id_arg=False)
+    parser.add_argument("--socket",
+                        "-s",
+                        help="The path of the Unix domain socket "
+                             "(default: {}).".format(DEFAULT_SOCKET_PATH),
+                        metavar="STRING",
+                        default=DEFAULT_SOCKET_PATH)
+    parser.add_argument("--cycle-period",
+                        "-c",
+                        help="The time (in seconds) spent collecting "
+                             "requests before executing them.",
+                        metavar="FLOAT",
+                        type=float,
+                        default=0.)
+    parser.add_argument("--group-access",
+                        help="Let the group of the owner connect to the "
+                             "socket (mode 0660 instead of 0600).",
+                        action="store_true")
+    args = parser.parse_args(argv)
+
+    connection = Connection(port=args.port,
+                            baudrate=args.baudrate,
+                            timeout=args.timeout,
+                            rpi_gpio=args.rpi)
+
+    socket_mode = 0o660 if args.group_access else DEFAULT_SOCKET_MODE
+
+    try:
+        daemon = BusDaemon(connection, args.socket, args.cycle_period,
+                           socket_mode)
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
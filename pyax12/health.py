@@ -0,0 +1,390 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `HealthMonitor` class which watches the temperature,
+the load and the voltage of Dynamixel units in the background.
+
+Dynamixel units shut their torque down when they get too hot, overloaded or
+out of their voltage range. The monitor samples PRESENT_LOAD,
+PRESENT_VOLTAGE and PRESENT_TEMPERATURE (in a single READ_DATA instruction
+per unit), keeps rolling statistics and raises `HealthEvent` items *before*
+these alarms trip, i.e. when a value gets close to the limits defined in the
+control table of each unit.
+
+The traffic of the monitor is capped to a fraction of the bus time so that it
+never steals much time from other transactions (e.g. motion commands).
+"""
+
+__all__ = ['HealthMonitor',
+           'HealthEvent',
+           'HealthStatistics']
+
+import collections
+import threading
+import time
+
+import pyax12.bandwidth as bw
+import pyax12.connection as cn
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+import pyax12.status_packet as sp
+
+try:
+    from pyax12.transport import TransportError
+except ImportError:     # the termios transport is only available on POSIX
+    TransportError = OSError
+
+# GENERAL CONSTANTS
+
+DEFAULT_BUS_FRACTION = 0.05
+DEFAULT_PERIOD = 1.
+DEFAULT_WINDOW = 60
+DEFAULT_TEMPERATURE_MARGIN = 5      # °C
+DEFAULT_VOLTAGE_MARGIN = 0.5        # V
+DEFAULT_LOAD_THRESHOLD = 0.9        # fraction of the maximum load
+DEFAULT_CLIENT = 'telemetry'
+
+# The delay (in seconds) before a sample skipped because the bus time share of
+# the monitor is exhausted is tried again
+SKIPPED_SAMPLE_DELAY = 0.1
+
+MAX_LOAD = 0x3ff
+
+# Event kinds
+TEMPERATURE = 'temperature'
+LOW_VOLTAGE = 'low_voltage'
+HIGH_VOLTAGE = 'high_voltage'
+LOAD = 'load'
+ALARM = 'alarm'
+COMMUNICATION = 'communication'
+
+# The errors which denote a communication failure rather than an alarm of the
+# Dynamixel unit (serial.SerialException is an IOError)
+COMMUNICATION_ERRORS = (sp.MalformedPacketError,
+                        sp.StatusChecksumError,
+                        sp.InstructionChecksumError,
+                        cn.MissingStatusPacketError,
+                        TransportError,
+                        OSError)
+
+HealthEvent = collections.namedtuple('HealthEvent',
+                                     ('dynamixel_id',
+                                      'kind',
+                                      'value',
+                                      'limit'))
+HealthEvent.__doc__ = """An event raised by a `HealthMonitor`.
+
+`kind` is one of ``'temperature'``, ``'low_voltage'``, ``'high_voltage'``,
+``'load'``, ``'alarm'`` or ``'communication'``. An ``'alarm'`` event is
+raised when a status packet reports an error and a ``'communication'`` event
+when a Dynamixel unit cannot be read (missing or corrupted status packet,
+serial port error); `value` is then the exception instance and `limit` is
+``None``. Communication events are raised once, until the unit replies
+again.
+"""
+
+HealthStatistics = collections.namedtuple('HealthStatistics',
+                                          ('last', 'mean', 'minimum',
+                                           'maximum', 'num_samples'))
+HealthStatistics.__doc__ = """Rolling statistics of a monitored quantity."""
+
+
+def _statistics(samples):
+    if len(samples) == 0:
+        return None
+    return HealthStatistics(samples[-1], sum(samples) / len(samples),
+                            min(samples), max(samples), len(samples))
+
+
+class HealthMonitor(object):
+    """Monitor the health of Dynamixel units in a background thread.
+
+    :param connection: the `Connection` used to sample Dynamixel units.
+    :param dynamixel_ids: the sequence of unique ID of the Dynamixel units to
+        monitor.
+    :param float bus_fraction: the maximum fraction of the bus time used by
+        the monitor (e.g. 0.05 for 5%).
+    :param float period: the minimum time (in seconds) between two samples of
+        the same Dynamixel unit.
+    :param int window: the number of samples kept for rolling statistics.
+    :param callback: a function called with a `HealthEvent` each time a
+        threshold is crossed (from the monitor thread).
+    :param float temperature_margin: an event is raised when the temperature
+        gets within `temperature_margin` °C of the maximum temperature.
+    :param float voltage_margin: an event is raised when the voltage gets
+        within `voltage_margin` V of the voltage limits.
+    :param float load_threshold: an event is raised when the load gets higher
+        than this fraction of the maximum load.
+    :param str client: the client charged for the monitor transactions if the
+        connection has a `pyax12.bandwidth.BandwidthBudget`.
+    """
+
+    def __init__(self, connection, dynamixel_ids,
+                 bus_fraction=DEFAULT_BUS_FRACTION, period=DEFAULT_PERIOD,
+                 window=DEFAULT_WINDOW, callback=None,
+                 temperature_margin=DEFAULT_TEMPERATURE_MARGIN,
+                 voltage_margin=DEFAULT_VOLTAGE_MARGIN,
+                 load_threshold=DEFAULT_LOAD_THRESHOLD,
+                 client=DEFAULT_CLIENT):
+
+        if not 0. < bus_fraction <= 1.:
+            raise ValueError("bus_fraction must be in range ]0, 1].")
+
+        self.connection = connection
+        self.dynamixel_ids = tuple(dynamixel_ids)
+        self.bus_fraction = bus_fraction
+        self.period = period
+        self.callback = callback
+
+        self.temperature_margin = temperature_margin
+        self.voltage_margin = voltage_margin
+        self.load_threshold = load_threshold
+        self.client = client
+
+        self.events = collections.deque(maxlen=window)
+
+        self._samples = {}
+        self._limits = {}
+        self._active_events = set()
+        self._bus_time = 0.       # the bus time used by the monitor
+
+        for dynamixel_id in self.dynamixel_ids:
+            self._samples[dynamixel_id] = {
+                TEMPERATURE: collections.deque(maxlen=window),
+                'voltage': collections.deque(maxlen=window),
+                LOAD: collections.deque(maxlen=window)
+            }
+
+        self._thread = None
+        self._stop_event = threading.Event()
+
+
+    # LIMITS AND SAMPLES ######################################################
+
+    def _read_limits(self, dynamixel_id):
+        """Read (once) the temperature and voltage limits of the specified
+        Dynamixel unit."""
+
+        if dynamixel_id not in self._limits:
+            byte_seq = self._read(dynamixel_id, pk.HIGHEST_LIMIT_TEMPERATURE,
+                                  3)
+
+            self._limits[dynamixel_id] = (byte_seq[0],         # °C
+                                          byte_seq[1] / 10.,   # V
+                                          byte_seq[2] / 10.)   # V
+
+        return self._limits[dynamixel_id]
+
+
+    def _read(self, dynamixel_id, address, length):
+        """Read bytes from the control table of the specified Dynamixel unit
+        and account for the bus time of the transaction.
+
+        A transaction whose status packet is missing is charged until its
+        reply deadline (the bus is held that long).
+
+        :raise MissingStatusPacketError: if the unit doesn't reply.
+        """
+
+        inst_packet = ip.InstructionPacket(dynamixel_id, ip.READ_DATA,
+                                           (address, length))
+        timing = self.connection.timing.transaction(inst_packet)
+
+        try:
+            byte_seq = self.connection.read_data(dynamixel_id, address,
+                                                 length)
+        except bw.BandwidthExceededError:
+            raise                   # nothing has been sent
+        except Exception:
+            self._bus_time += timing.reply_time
+            raise
+
+        if byte_seq is None or len(byte_seq) != length:
+            self._bus_time += timing.deadline
+            msg = "Dynamixel unit {} doesn't reply."
+            raise cn.MissingStatusPacketError(msg.format(dynamixel_id))
+
+        self._bus_time += timing.reply_time
+
+        return byte_seq
+
+
+    def sample(self, dynamixel_id):
+        """Sample the specified Dynamixel unit, update its statistics and
+        raise the relevant events.
+
+        This function is called by the monitor thread; it can also be called
+        directly.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        :return: ``True`` if the Dynamixel unit replied, ``False`` otherwise
+            (a ``'communication'`` or ``'alarm'`` event is then raised), or
+            ``None`` if the sample has been skipped because the bus time
+            share of the monitor is exhausted (see
+            `pyax12.bandwidth.BandwidthBudget`).
+        """
+
+        try:
+            limits = self._read_limits(dynamixel_id)
+
+            # Read PRESENT_LOAD, PRESENT_VOLTAGE and PRESENT_TEMPERATURE
+            byte_seq = self._read(dynamixel_id, pk.PRESENT_LOAD, 4)
+        except bw.BandwidthExceededError:
+            return None
+        except COMMUNICATION_ERRORS as error:
+            self._check(dynamixel_id, COMMUNICATION, error, None, True)
+            return False
+        except sp.StatusPacketError as error:
+            self._active_events.discard((dynamixel_id, COMMUNICATION))
+            self._raise_event(HealthEvent(dynamixel_id, ALARM, error, None))
+            return False
+
+        self._active_events.discard((dynamixel_id, COMMUNICATION))
+
+        abs_load = byte_seq[0] + ((byte_seq[1] & 0x03) << 8)
+        load = abs_load if byte_seq[1] & (1 << 2) else -abs_load
+        voltage = byte_seq[2] / 10.
+        temperature = byte_seq[3]
+
+        samples = self._samples[dynamixel_id]
+        samples[LOAD].append(load)
+        samples['voltage'].append(voltage)
+        samples[TEMPERATURE].append(temperature)
+
+        max_temperature, min_voltage, max_voltage = limits
+        max_load = self.load_threshold * MAX_LOAD
+
+        self._check(dynamixel_id, TEMPERATURE, temperature,
+                    max_temperature,
+                    temperature >= max_temperature - self.temperature_margin)
+        self._check(dynamixel_id, LOW_VOLTAGE, voltage, min_voltage,
+                    voltage <= min_voltage + self.voltage_margin)
+        self._check(dynamixel_id, HIGH_VOLTAGE, voltage, max_voltage,
+                    voltage >= max_voltage - self.voltage_margin)
+        self._check(dynamixel_id, LOAD, load, max_load,
+                    abs(load) >= max_load)
+
+        return True
+
+
+    def _check(self, dynamixel_id, kind, value, limit, is_over):
+        """Raise an event when a quantity crosses its threshold (once, until
+        it gets back under the threshold)."""
+
+        key = (dynamixel_id, kind)
+
+        if is_over and key not in self._active_events:
+            self._active_events.add(key)
+            self._raise_event(HealthEvent(dynamixel_id, kind, value, limit))
+        elif not is_over:
+            self._active_events.discard(key)
+
+
+    def _raise_event(self, event):
+        self.events.append(event)
+        if self.callback is not None:
+            self.callback(event)
+
+
+    def statistics(self, dynamixel_id):
+        """Return the rolling statistics of the specified Dynamixel unit.
+
+        :param int dynamixel_id: the unique ID of a monitored Dynamixel unit.
+        :return: a dictionary mapping ``'temperature'``, ``'voltage'`` and
+            ``'load'`` to a `HealthStatistics` (or ``None`` if the unit has
+            not been sampled yet).
+        """
+        samples = self._samples[dynamixel_id]
+        return {key: _statistics(value) for key, value in samples.items()}
+
+
+    # BACKGROUND THREAD #######################################################
+
+    def start(self):
+        """Start monitoring in a background (daemon) thread."""
+
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run,
+                                        name="pyax12-health-monitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    def stop(self):
+        """Stop the monitor thread (and wait for it)."""
+
+        self._stop_event.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+    @property
+    def is_running(self):
+        """``True`` if the monitor thread is running.
+
+        This member is a read-only property.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+
+    def _run(self):
+        next_sample_times = {dxl_id: 0. for dxl_id in self.dynamixel_ids}
+
+        while not self._stop_event.is_set():
+            for dynamixel_id in self.dynamixel_ids:
+                delay = next_sample_times[dynamixel_id] - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    return
+
+                start_time = time.monotonic()
+                start_bus_time = self._bus_time
+                budget = self.connection.bandwidth_budget
+                if budget is None:
+                    is_sampled = self.sample(dynamixel_id) is not None
+                else:
+                    with budget.client(self.client):
+                        is_sampled = self.sample(dynamixel_id) is not None
+                # Bus time (not wall-clock time, which includes the time
+                # spent waiting for the connection lock)
+                busy_time = self._bus_time - start_bus_time
+
+                if is_sampled:
+                    next_sample_times[dynamixel_id] = start_time + self.period
+                else:
+                    next_sample_times[dynamixel_id] = (start_time
+                                                       + SKIPPED_SAMPLE_DELAY)
+
+                # Stay idle long enough to keep the bus budget
+                fraction = self.bus_fraction
+                idle_time = busy_time * (1. - fraction) / fraction
+                if self._stop_event.wait(idle_time):
+                    return
@@ -45,9 +45,10 @@ REG_WRITE = 0x04
 ACTION = 0x05
 RESET = 0x06
 SYNC_WRITE = 0x83
+BULK_READ = 0x92    # MX series only
 
 INSTRUCTIONS = (PING, READ_DATA, WRITE_DATA, REG_WRITE, ACTION, RESET,
-                SYNC_WRITE)
+                SYNC_WRITE, BULK_READ)
 
 # THE NUMBER OF PARAMETERS EXPECTED FOR EACH INSTRUCTION
 # (see the official Dynamixel AX-12 User's manual p.19)
@@ -82,6 +83,10 @@ NUMBER_OF_PARAMETERS = {
     SYNC_WRITE:{
         'min': 4,
         'max': MAX_NUM_PARAMS
+    },
+    BULK_READ:{
+        'min': 4,
+        'max': MAX_NUM_PARAMS
     }
 }
 
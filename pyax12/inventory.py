@@ -0,0 +1,215 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains functions to keep a persistent inventory of the
+Dynamixel units connected to a bus.
+
+Scanning the whole bus and reading the description of each unit takes
+seconds. `discover` saves the inventory in a (JSON) file and, at the next
+startup, only pings the known units: the bus is scanned again only if one of
+them doesn't reply.
+
+Example::
+
+    connection = Connection(port='/dev/ttyUSB0', baudrate=1000000)
+    servos = discover(connection, 'fleet.json')
+    dynamixel_ids = [servo.dynamixel_id for servo in servos]
+"""
+
+__all__ = ['ServoRecord',
+           'InventoryError',
+           'read_servo_record',
+           'load_inventory',
+           'save_inventory',
+           'check_inventory',
+           'discover']
+
+import collections
+import json
+import os
+
+import pyax12.packet as pk
+from pyax12 import utils
+
+# GENERAL CONSTANTS
+
+INVENTORY_VERSION = 1
+
+# The control table bytes read to describe a unit (from MODEL_NUMBER to
+# CCW_ANGLE_LIMIT)
+DESCRIPTION_LENGTH = pk.CCW_ANGLE_LIMIT + 2 - pk.MODEL_NUMBER
+
+# EXCEPTION CLASSES ###########################################################
+
+class InventoryError(Exception):
+    """Exception raised if an inventory file cannot be read."""
+    pass
+
+# SERVO RECORDS ###############################################################
+
+ServoRecord = collections.namedtuple('ServoRecord',
+                                     ('dynamixel_id',
+                                      'model_number',
+                                      'firmware_version',
+                                      'baud_rate',
+                                      'return_delay_time',
+                                      'cw_angle_limit',
+                                      'ccw_angle_limit'))
+ServoRecord.__doc__ = """The description of a Dynamixel unit.
+
+The baud rate is given in bps and the return delay time in microseconds (as
+returned by `Connection.get_baud_rate` and
+`Connection.get_return_delay_time`).
+"""
+
+def read_servo_record(connection, dynamixel_id):
+    """Read the description of a Dynamixel unit (in one transaction).
+
+    :param connection: the `Connection` instance of the bus.
+    :param int dynamixel_id: the unique ID of a Dynamixel unit.
+    :return: a `ServoRecord` or ``None`` if the unit doesn't reply.
+    """
+
+    byte_seq = connection.read_data(dynamixel_id, pk.MODEL_NUMBER,
+                                    DESCRIPTION_LENGTH)
+
+    if byte_seq is None or len(byte_seq) != DESCRIPTION_LENGTH:
+        return None
+
+    def word(address):
+        return utils.little_endian_bytes_to_int(byte_seq[address:address + 2])
+
+    return ServoRecord(dynamixel_id=dynamixel_id,
+                       model_number=word(pk.MODEL_NUMBER),
+                       firmware_version=byte_seq[pk.VERSION_OF_FIRMWARE],
+                       baud_rate=round(2000000 / (byte_seq[pk.BAUD_RATE] + 1),
+                                       1),
+                       return_delay_time=2 * byte_seq[pk.RETURN_DELAY_TIME],
+                       cw_angle_limit=word(pk.CW_ANGLE_LIMIT),
+                       ccw_angle_limit=word(pk.CCW_ANGLE_LIMIT))
+
+# INVENTORY FILES #############################################################
+
+def save_inventory(path, baudrate, servo_records):
+    """Save an inventory in a JSON file.
+
+    :param str path: the path of the inventory file.
+    :param int baudrate: the baud rate of the bus.
+    :param servo_records: a sequence of `ServoRecord`.
+    """
+
+    inventory = {'version': INVENTORY_VERSION,
+                 'baudrate': baudrate,
+                 'servos': [record._asdict() for record in servo_records]}
+
+    # Write the whole file or nothing (the inventory is read at startup)
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as inventory_file:
+        json.dump(inventory, inventory_file, indent=4)
+    os.replace(temporary_path, path)
+
+
+def load_inventory(path):
+    """Load an inventory saved by `save_inventory`.
+
+    :param str path: the path of the inventory file.
+    :return: a ``(baudrate, servo_records)`` tuple.
+    """
+
+    try:
+        with open(path) as inventory_file:
+            inventory = json.load(inventory_file)
+
+        if inventory['version'] != INVENTORY_VERSION:
+            raise InventoryError("Unsupported inventory version.")
+
+        servo_records = [ServoRecord(**servo)
+                         for servo in inventory['servos']]
+        baudrate = inventory['baudrate']
+    except (ValueError, KeyError, TypeError) as error:
+        raise InventoryError("Invalid inventory file: {}".format(error))
+
+    return baudrate, servo_records
+
+# DISCOVERY ###################################################################
+
+def check_inventory(connection, servo_records):
+    """Check that all the units of an inventory reply (one ping per unit).
+
+    The return delay times of the inventory are given to the timing model of
+    the connection.
+
+    :param connection: the `Connection` instance of the bus.
+    :param servo_records: a sequence of `ServoRecord`.
+    :return: ``True`` if all the units reply, ``False`` otherwise.
+    """
+
+    for record in servo_records:
+        connection.timing.set_return_delay_time(
+            record.dynamixel_id, record.return_delay_time * 1e-6)
+
+        if not connection.ping(record.dynamixel_id):
+            return False
+
+    return True
+
+
+def discover(connection, path, dynamixel_ids=None):
+    """Return the description of the Dynamixel units connected to the bus.
+
+    If the inventory file exists, was made at the baud rate of the connection
+    and all its units reply, it is returned as is. Otherwise, the bus is
+    scanned, the units found are described and the inventory file is
+    (re)written.
+
+    Units added to the bus after the inventory was made are not detected until
+    the next scan: remove the inventory file to force it.
+
+    :param connection: the `Connection` instance of the bus.
+    :param str path: the path of the inventory file.
+    :param bytes dynamixel_ids: the IDs to scan (all IDs by default).
+    :return: a list of `ServoRecord` sorted by ID.
+    """
+
+    try:
+        baudrate, servo_records = load_inventory(path)
+    except (OSError, InventoryError):
+        baudrate, servo_records = None, []
+
+    if baudrate == connection.baudrate and len(servo_records) > 0:
+        if check_inventory(connection, servo_records):
+            return servo_records
+
+    servo_records = []
+    for dynamixel_id in connection.scan(dynamixel_ids):
+        record = read_servo_record(connection, dynamixel_id)
+        if record is not None:
+            servo_records.append(record)
+
+    save_inventory(path, connection.baudrate, servo_records)
+
+    return servo_records
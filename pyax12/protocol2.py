@@ -0,0 +1,371 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+r"""
+This module implements the Dynamixel Protocol 2.0 packets.
+
+Protocol 2.0 is understood by the recent Dynamixel units (and by MX units
+with a recent firmware). Its packets begin with a 4 bytes header
+(``b'\xff\xff\xfd\x00'``), have a 2 bytes length, are protected by a CRC-16
+and use "byte stuffing" so that the header never appears in the packet
+body. Its instruction set adds SYNC_READ and BULK_READ, which read the
+control table of many units with a single instruction packet (units reply
+back-to-back).
+
+Use ``Connection(protocol=2)`` to talk Protocol 2.0 on a bus.
+
+The structure of an instruction packet is::
+
+    +----+----+----+----+--+-----+-----+-----------+------+---+-----+-----+
+    |0xFF|0xFF|0xFD|0x00|ID|LEN_L|LEN_H|INSTRUCTION|PARAM1|...|CRC_L|CRC_H|
+    +----+----+----+----+--+-----+-----+-----------+------+---+-----+-----+
+
+Status packets use the instruction 0x55 followed by an error byte and the
+parameters.
+"""
+
+__all__ = ['InstructionPacket2',
+           'StatusPacket2',
+           'Protocol2Error',
+           'StatusCRCError',
+           'StatusError',
+           'MalformedStatusError',
+           'compute_crc',
+           'stuff',
+           'unstuff',
+           'split_status_packets',
+           'status_packet_length']
+
+import struct
+
+# GENERAL CONSTANTS
+
+BROADCAST_ID = 0xfe
+PACKET_HEADER = bytes((0xff, 0xff, 0xfd, 0x00))
+STUFFING_PATTERN = bytes((0xff, 0xff, 0xfd))
+STUFFED_PATTERN = bytes((0xff, 0xff, 0xfd, 0xfd))
+
+# The length of a status packet without parameters
+STATUS_PACKET_OVERHEAD = 11
+
+# THE INSTRUCTION SET
+
+PING = 0x01
+READ = 0x02
+WRITE = 0x03
+REG_WRITE = 0x04
+ACTION = 0x05
+FACTORY_RESET = 0x06
+REBOOT = 0x08
+CLEAR = 0x10
+STATUS = 0x55
+SYNC_READ = 0x82
+SYNC_WRITE = 0x83
+BULK_READ = 0x92
+BULK_WRITE = 0x93
+
+INSTRUCTIONS = (PING, READ, WRITE, REG_WRITE, ACTION, FACTORY_RESET, REBOOT,
+                CLEAR, SYNC_READ, SYNC_WRITE, BULK_READ, BULK_WRITE)
+
+# THE ERROR NUMBERS OF STATUS PACKETS
+
+ERROR_MESSAGES = {
+    1: "Result fail",
+    2: "Instruction error",
+    3: "CRC error",
+    4: "Data range error",
+    5: "Data length error",
+    6: "Data limit error",
+    7: "Access error"
+}
+
+ALERT_BIT = 0x80
+
+# EXCEPTION CLASSES ###########################################################
+
+class Protocol2Error(Exception):
+    """Base class for exceptions in the `protocol2` module."""
+    pass
+
+class StatusCRCError(Protocol2Error):
+    """Exception raised if the CRC of a status packet is incorrect."""
+    pass
+
+class MalformedStatusError(Protocol2Error, ValueError):
+    """Exception raised if the received bytes are not a well-formed status
+    packet (e.g. because of a transmission error)."""
+    pass
+
+class StatusError(Protocol2Error):
+    """Exception raised if a Dynamixel unit reports an error in its status
+    packet (see the `error_number` attribute)."""
+
+    def __init__(self, error_number):
+        self.error_number = error_number
+        message = ERROR_MESSAGES.get(error_number, "Unknown error")
+        super(StatusError, self).__init__("{} ({})".format(message,
+                                                           error_number))
+
+# CRC AND BYTE STUFFING #######################################################
+
+def _make_crc_table():
+    table = []
+    for index in range(256):
+        crc = index << 8
+        for bit in range(8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ 0x8005
+            else:
+                crc <<= 1
+        table.append(crc & 0xffff)
+    return tuple(table)
+
+CRC_TABLE = _make_crc_table()
+
+def compute_crc(byte_seq):
+    """Compute and return the CRC-16 (polynomial 0x8005, initial value 0) of
+    `byte_seq`.
+
+    :param bytes byte_seq: the bytes of the packet from the first header byte
+        to the last byte before the CRC.
+    """
+
+    crc = 0
+    for byte in bytes(byte_seq):
+        crc = ((crc << 8) ^ CRC_TABLE[((crc >> 8) ^ byte) & 0xff]) & 0xffff
+    return crc
+
+
+def stuff(byte_seq):
+    """Add a 0xFD byte after each ``FF FF FD`` sequence of `byte_seq`.
+
+    :param bytes byte_seq: the instruction and parameter bytes of a packet.
+    """
+    return bytes(byte_seq).replace(STUFFING_PATTERN, STUFFED_PATTERN)
+
+
+def unstuff(byte_seq):
+    """Remove the 0xFD bytes added by `stuff`.
+
+    :param bytes byte_seq: the stuffed bytes.
+    """
+    return bytes(byte_seq).replace(STUFFED_PATTERN, STUFFING_PATTERN)
+
+
+def status_packet_length(num_params):
+    """Return the length of a status packet with `num_params` parameters
+    (assuming no byte has to be stuffed).
+
+    :param int num_params: the number of parameters.
+    """
+    return STATUS_PACKET_OVERHEAD + num_params
+
+# PACKETS #####################################################################
+
+def _build_packet(dynamixel_id, instruction_and_params):
+    body = stuff(instruction_and_params)
+    packet = bytearray(PACKET_HEADER)
+    packet.append(dynamixel_id)
+    packet.extend(struct.pack('<H', len(body) + 2))
+    packet.extend(body)
+    packet.extend(struct.pack('<H', compute_crc(packet)))
+    return bytes(packet)
+
+
+class InstructionPacket2(object):
+    """A Protocol 2.0 instruction packet.
+
+    :param int dynamixel_id: the unique ID of the Dynamixel unit which has to
+        execute this instruction packet (0xFE is the broadcasting ID).
+    :param int instruction: the instruction for the Dynamixel unit to perform.
+    :param bytes parameters: the (unstuffed) parameters of the instruction.
+    """
+
+    def __init__(self, dynamixel_id, instruction, parameters=None):
+
+        if parameters is None:
+            parameters = bytes()
+        else:
+            parameters = bytes(tuple(parameters))
+
+        if not 0x00 <= dynamixel_id <= 0xfe:
+            raise ValueError("Wrong dynamixel_id value, "
+                             "an integer in range(0x00, 0xfe) is required.")
+
+        if instruction not in INSTRUCTIONS:
+            raise ValueError("Wrong instruction: {:#x}.".format(instruction))
+
+        self.dynamixel_id = dynamixel_id
+        self.instruction = instruction
+        self.parameters = parameters
+
+        self._bytes = _build_packet(dynamixel_id,
+                                    bytes((instruction, )) + parameters)
+
+
+    def to_bytes(self):
+        """Return the packet as a bytes string."""
+        return self._bytes
+
+
+    @classmethod
+    def ping(cls, dynamixel_id):
+        """Return a PING instruction packet."""
+        return cls(dynamixel_id, PING)
+
+    @classmethod
+    def read(cls, dynamixel_id, address, length):
+        """Return a READ instruction packet."""
+        return cls(dynamixel_id, READ, struct.pack('<HH', address, length))
+
+    @classmethod
+    def write(cls, dynamixel_id, address, data):
+        """Return a WRITE instruction packet."""
+        return cls(dynamixel_id, WRITE,
+                   struct.pack('<H', address) + bytes(data))
+
+    @classmethod
+    def sync_read(cls, address, length, dynamixel_ids):
+        """Return a SYNC_READ instruction packet (the units reply in the order
+        of `dynamixel_ids`)."""
+        return cls(BROADCAST_ID, SYNC_READ,
+                   struct.pack('<HH', address, length) + bytes(dynamixel_ids))
+
+    @classmethod
+    def sync_write(cls, address, length, data):
+        """Return a SYNC_WRITE instruction packet.
+
+        :param data: a sequence of ``(dynamixel_id, bytes)`` pairs.
+        """
+        params = bytearray(struct.pack('<HH', address, length))
+        for dynamixel_id, unit_data in data:
+            params.append(dynamixel_id)
+            params.extend(unit_data)
+        return cls(BROADCAST_ID, SYNC_WRITE, params)
+
+    @classmethod
+    def bulk_read(cls, requests):
+        """Return a BULK_READ instruction packet (the units reply in the order
+        of `requests`).
+
+        :param requests: a sequence of ``(dynamixel_id, address, length)``
+            tuples.
+        """
+        params = bytearray()
+        for dynamixel_id, address, length in requests:
+            params.append(dynamixel_id)
+            params.extend(struct.pack('<HH', address, length))
+        return cls(BROADCAST_ID, BULK_READ, params)
+
+
+class StatusPacket2(object):
+    """A Protocol 2.0 status packet.
+
+    The packet is checked when the instance is made: `StatusCRCError` is
+    raised if its CRC is wrong, `StatusError` if the Dynamixel unit reports an
+    error and `MalformedStatusError` if the packet is malformed.
+
+    :param bytes packet: the full status packet (as received).
+    """
+
+    def __init__(self, packet):
+
+        self._bytes = bytes(tuple(packet))
+
+        if len(self._bytes) < STATUS_PACKET_OVERHEAD:
+            raise MalformedStatusError("Incomplete packet.")
+
+        if self._bytes[:4] != PACKET_HEADER:
+            raise MalformedStatusError("Wrong header.")
+
+        length = struct.unpack_from('<H', self._bytes, 5)[0]
+        if length != len(self._bytes) - 7:
+            raise MalformedStatusError("Wrong length bytes.")
+
+        crc = struct.unpack_from('<H', self._bytes, len(self._bytes) - 2)[0]
+        if compute_crc(self._bytes[:-2]) != crc:
+            raise StatusCRCError("Wrong CRC.")
+
+        if self._bytes[7] != STATUS:
+            raise MalformedStatusError("Not a status packet.")
+
+        self.dynamixel_id = self._bytes[4]
+        self.error = self._bytes[8]
+        self.parameters = unstuff(self._bytes[9:-2])
+
+        if self.error & ~ALERT_BIT:
+            raise StatusError(self.error & ~ALERT_BIT)
+
+
+    @property
+    def alert(self):
+        """``True`` if the Dynamixel unit has a hardware error to report
+        (see its *Hardware Error Status* register).
+
+        This member is a read-only property.
+        """
+        return bool(self.error & ALERT_BIT)
+
+
+    def to_bytes(self):
+        """Return the packet as a bytes string."""
+        return self._bytes
+
+# STREAM PARSING ##############################################################
+
+def split_status_packets(byte_seq):
+    """Split a stream of received bytes into Protocol 2.0 packets (see
+    `pyax12.status_packet.split_status_packets`).
+
+    :param bytes byte_seq: the received bytes.
+    :return: a ``(packets, remaining_bytes)`` tuple.
+    """
+
+    byte_seq = bytes(byte_seq)
+
+    packets = []
+    index = 0
+
+    while True:
+        start = byte_seq.find(PACKET_HEADER, index)
+
+        if start < 0:
+            # Keep the bytes which may be the beginning of the next header
+            for size in (3, 2, 1):
+                tail = byte_seq[max(index, len(byte_seq) - size):]
+                if len(tail) == size and PACKET_HEADER.startswith(tail):
+                    return packets, tail
+            return packets, b''
+
+        if start + 7 > len(byte_seq):
+            return packets, byte_seq[start:]
+
+        end = start + 7 + struct.unpack_from('<H', byte_seq, start + 5)[0]
+        if end > len(byte_seq):
+            return packets, byte_seq[start:]
+
+        packets.append(byte_seq[start:end])
+        index = end
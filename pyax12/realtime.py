@@ -0,0 +1,438 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+This module contains the `RealtimeLoop` class which runs a control loop (e.g.
+reading and commanding Dynamixel units) at a fixed period in a dedicated
+thread.
+
+Where the OS allows it, the loop thread is given a real-time priority
+(``SCHED_FIFO``), pinned to a set of CPUs, the memory of the process can be
+locked while the loop runs (``mlockall``, to avoid page faults; see the
+`lock_memory` argument) and the Python garbage collector is kept out of the
+callback. These settings usually need privileges (e.g.
+root or the ``CAP_SYS_NICE`` and ``CAP_IPC_LOCK`` capabilities, or an
+``rtprio``/``memlock`` entry in ``/etc/security/limits.conf``); the loop
+falls back to normal settings when they are not permitted and tells what has
+been applied in its `status` attribute.
+
+The loop records two histograms to tell where a missed deadline comes from:
+
+- the *wake-up latency* (the time between the scheduled start of a cycle, or
+  the end of the previous cycle if it is late, and its actual start)
+  measures the host (scheduler) jitter;
+- the *callback duration* measures the time spent in the callback, i.e.
+  mostly on the bus.
+
+Example::
+
+    def control():
+        positions = connection.sync_read(ids, pk.PRESENT_POSITION, 2)
+        ...
+
+    loop = RealtimeLoop(control, period=0.01, cpus=[3])
+    loop.start()
+    ...
+    loop.stop()
+    print(loop.wakeup_histogram.format())
+"""
+
+__all__ = ['RealtimeLoop',
+           'RealtimeStatus',
+           'JitterHistogram']
+
+import collections
+import ctypes
+import gc
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:     # not a POSIX system
+    resource = None
+
+# GENERAL CONSTANTS
+
+DEFAULT_PRIORITY = 50
+DEFAULT_BIN_WIDTH = 0.00005   # 50 us
+DEFAULT_NUM_BINS = 40
+
+# Garbage collector modes
+GC_ENABLED = 'enabled'        # the collector runs whenever it wants
+GC_DISABLED = 'disabled'      # the collector is disabled while the loop runs
+GC_SCHEDULED = 'scheduled'    # young objects are collected after callbacks,
+                              # when the slack time allows it
+GC_MODES = (GC_ENABLED, GC_DISABLED, GC_SCHEDULED)
+
+# The minimal slack time (as a fraction of the period) needed to collect
+# young objects in GC_SCHEDULED mode
+GC_SLACK_FRACTION = 0.5
+
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+RealtimeStatus = collections.namedtuple('RealtimeStatus',
+                                        ('realtime_priority',
+                                         'cpu_affinity',
+                                         'memory_locked'))
+RealtimeStatus.__doc__ = """The real-time settings applied to a `RealtimeLoop`
+thread (each field is ``True`` if the setting has been applied)."""
+
+# SYSTEM SETTINGS #############################################################
+
+def _set_realtime_priority(priority):
+    """Give the calling thread the SCHED_FIFO policy (return ``True`` on
+    success)."""
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (AttributeError, OSError):
+        return False
+    return True
+
+
+def _set_cpu_affinity(cpus):
+    """Pin the calling thread to the `cpus` set (return ``True`` on
+    success)."""
+    try:
+        os.sched_setaffinity(0, cpus)
+    except (AttributeError, OSError, ValueError):
+        return False
+    return True
+
+
+def _lock_memory():
+    """Lock the memory of the process (return ``True`` on success).
+
+    Future allocations are locked too (``MCL_FUTURE``) only if the
+    ``RLIMIT_MEMLOCK`` limit is unlimited: otherwise, they would fail once
+    the limit is reached (e.g. the stacks of new threads).
+    """
+
+    flags = MCL_CURRENT
+    if (resource is not None
+            and resource.getrlimit(resource.RLIMIT_MEMLOCK)[0]
+            == resource.RLIM_INFINITY):
+        flags |= MCL_FUTURE
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.mlockall(flags) == 0
+    except (AttributeError, OSError):
+        return False
+
+
+def _unlock_memory():
+    """Unlock the memory of the process."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.munlockall()
+    except (AttributeError, OSError):
+        pass
+
+
+# JITTER HISTOGRAM ############################################################
+
+class JitterHistogram(object):
+    """A histogram of durations with fixed-width bins.
+
+    Durations longer than the last bin are counted in an overflow bin.
+
+    :param float bin_width: the width (in seconds) of each bin.
+    :param int num_bins: the number of bins (the overflow bin excepted).
+    """
+
+    def __init__(self, bin_width=DEFAULT_BIN_WIDTH, num_bins=DEFAULT_NUM_BINS):
+
+        self.bin_width = bin_width
+        self.counts = [0] * (num_bins + 1)
+        self.num_samples = 0
+        self.maximum = 0.
+        self._sum = 0.
+
+
+    def add(self, duration):
+        """Add a duration (in seconds) to the histogram."""
+
+        index = int(max(duration, 0.) / self.bin_width)
+        self.counts[min(index, len(self.counts) - 1)] += 1
+
+        self.num_samples += 1
+        self.maximum = max(self.maximum, duration)
+        self._sum += duration
+
+
+    @property
+    def mean(self):
+        """The mean duration (``None`` if the histogram is empty).
+
+        This member is a read-only property.
+        """
+        if self.num_samples == 0:
+            return None
+        return self._sum / self.num_samples
+
+
+    def percentile(self, fraction):
+        """Return the upper bound of the bin containing the given `fraction`
+        of durations (e.g. 0.99 for the 99th percentile), ``None`` if the
+        histogram is empty or the maximum duration if the percentile falls in
+        the overflow bin.
+
+        :param float fraction: a number in range [0, 1].
+        """
+
+        if self.num_samples == 0:
+            return None
+
+        threshold = fraction * self.num_samples
+        cumulated_count = 0
+
+        for index, count in enumerate(self.counts[:-1]):
+            cumulated_count += count
+            if cumulated_count >= threshold and cumulated_count > 0:
+                return (index + 1) * self.bin_width
+
+        return self.maximum
+
+
+    def format(self):
+        """Return the histogram as a multi-line string (one line per
+        non-empty bin, durations in microseconds)."""
+
+        lines = []
+        last_index = len(self.counts) - 1
+
+        for index, count in enumerate(self.counts):
+            if count == 0:
+                continue
+            lower = index * self.bin_width * 1e6
+            if index == last_index:
+                label = "{:7.0f}+      us".format(lower)
+            else:
+                upper = lower + self.bin_width * 1e6
+                label = "{:7.0f}-{:<6.0f}us".format(lower, upper)
+            lines.append("{}: {}".format(label, count))
+
+        return "\n".join(lines)
+
+
+# REALTIME LOOP ###############################################################
+
+class RealtimeLoop(object):
+    """Call a function at a fixed period in a dedicated thread.
+
+    Cycles are scheduled at absolute times (``start + k * period``) so that
+    delays don't accumulate. A cycle misses its deadline if it ends after the
+    scheduled start of the next cycle; the miss is blamed on the callback
+    (`num_callback_misses`) if the callback alone lasted longer than the
+    period, otherwise on the host (`num_host_misses`). The next cycles which
+    cannot be started on time are skipped: the loop waits for the next
+    scheduled start which is still ahead.
+
+    :param callback: the function called at each cycle (without argument).
+        If it raises an exception, the loop stops and the exception is kept
+        in the `error` attribute.
+    :param float period: the period (in seconds) of the loop.
+    :param int priority: the SCHED_FIFO priority (1 to 99) of the loop
+        thread, or ``None`` to keep the default scheduling policy.
+    :param cpus: the set of CPUs the loop thread is pinned to, or ``None``
+        to keep the default affinity.
+    :param bool lock_memory: if ``True``, lock the memory of the process with
+        ``mlockall`` while the loop runs (it is unlocked with ``munlockall``
+        when the loop returns, which also unlocks memory locked by other
+        parts of the process).
+    :param str gc_mode: ``'enabled'`` to leave the garbage collector alone,
+        ``'disabled'`` to disable it while the loop runs or ``'scheduled'``
+        to disable it and collect young objects after the callbacks which
+        leave enough slack time. The garbage collector is shared by all the
+        threads of the process.
+    :param float bin_width: the width (in seconds) of the histogram bins.
+    :param int num_bins: the number of histogram bins.
+    """
+
+    def __init__(self, callback, period, priority=DEFAULT_PRIORITY,
+                 cpus=None, lock_memory=False, gc_mode=GC_SCHEDULED,
+                 bin_width=DEFAULT_BIN_WIDTH, num_bins=DEFAULT_NUM_BINS):
+
+        if period <= 0:
+            raise ValueError("The period must be positive.")
+
+        if gc_mode not in GC_MODES:
+            raise ValueError("Unknown gc_mode: {}.".format(gc_mode))
+
+        self.callback = callback
+        self.period = period
+        self.priority = priority
+        self.cpus = cpus
+        self.lock_memory = lock_memory
+        self.gc_mode = gc_mode
+
+        self.wakeup_histogram = JitterHistogram(bin_width, num_bins)
+        self.duration_histogram = JitterHistogram(bin_width, num_bins)
+
+        self.num_cycles = 0
+        self.num_skipped_cycles = 0
+        self.num_host_misses = 0
+        self.num_callback_misses = 0
+
+        self.status = None
+        self.error = None
+
+        self._thread = None
+        self._stop_event = threading.Event()
+
+
+    def start(self):
+        """Start the loop in a new (daemon) thread."""
+
+        if self.is_running:
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run,
+                                        name="pyax12-realtime-loop")
+        self._thread.daemon = True
+        self._thread.start()
+
+
+    def stop(self):
+        """Stop the loop thread (and wait for it)."""
+
+        self._stop_event.set()
+
+        if self._thread is not None:
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            self._thread = None
+
+
+    @property
+    def is_running(self):
+        """``True`` if the loop thread is running.
+
+        This member is a read-only property.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+
+    @property
+    def num_missed_deadlines(self):
+        """The number of cycles which ended after their deadline.
+
+        This member is a read-only property.
+        """
+        return self.num_host_misses + self.num_callback_misses
+
+
+    def _setup(self):
+        """Apply the real-time settings to the calling thread."""
+
+        realtime_priority = False
+        if self.priority is not None:
+            realtime_priority = _set_realtime_priority(self.priority)
+
+        cpu_affinity = False
+        if self.cpus is not None:
+            cpu_affinity = _set_cpu_affinity(self.cpus)
+
+        memory_locked = False
+        if self.lock_memory:
+            memory_locked = _lock_memory()
+
+        self.status = RealtimeStatus(realtime_priority, cpu_affinity,
+                                     memory_locked)
+
+
+    def run(self, num_cycles=None):
+        """Run the loop in the calling thread until `stop` is called (or
+        `num_cycles` cycles have been run).
+
+        :param int num_cycles: the number of cycles to run (``None`` to run
+            until `stop` is called).
+        """
+
+        self._setup()
+
+        gc_was_enabled = gc.isenabled()
+        if self.gc_mode != GC_ENABLED:
+            gc.disable()
+
+        gc_slack = GC_SLACK_FRACTION * self.period
+        cycle = 0
+        start_time = time.monotonic()
+        next_time = start_time
+
+        try:
+            while not self._stop_event.is_set():
+                if num_cycles is not None and cycle >= num_cycles:
+                    break
+
+                # A late cycle starts at once: its wake-up latency is 0
+                ready_time = max(next_time, time.monotonic())
+                delay = ready_time - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+                wakeup_time = time.monotonic()
+
+                try:
+                    self.callback()
+                except Exception as error:
+                    self.error = error
+                    break
+
+                end_time = time.monotonic()
+                duration = end_time - wakeup_time
+
+                self.wakeup_histogram.add(wakeup_time - ready_time)
+                self.duration_histogram.add(duration)
+                self.num_cycles += 1
+                cycle += 1
+
+                next_time += self.period
+
+                if end_time > next_time:
+                    if duration > self.period:
+                        self.num_callback_misses += 1
+                    else:
+                        self.num_host_misses += 1
+
+                    # Skip the cycles which cannot start on time (up to the
+                    # first scheduled start after end_time)
+                    num_skipped_cycles = int((end_time - next_time)
+                                             / self.period) + 1
+                    next_time += num_skipped_cycles * self.period
+                    self.num_skipped_cycles += num_skipped_cycles
+
+                elif (self.gc_mode == GC_SCHEDULED
+                      and next_time - end_time > gc_slack):
+                    gc.collect(0)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+            if self.status.memory_locked:
+                _unlock_memory()
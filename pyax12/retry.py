@@ -0,0 +1,190 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `RetryPolicy` and `CircuitBreaker` classes used by
+`Connection` to cope with flaky or dead Dynamixel units.
+
+- A `RetryPolicy` resends an instruction packet a few times (with an
+  exponential backoff) when its status packet is missing or corrupted.
+- A `CircuitBreaker` stops addressing a Dynamixel unit which keeps failing,
+  so that a dead unit doesn't cost a full timeout at each transaction; the
+  unit is probed again after a while.
+
+Example::
+
+    connection = Connection(port='/dev/ttyUSB0',
+                            retry_policy=RetryPolicy(retries=2),
+                            circuit_breaker=CircuitBreaker())
+"""
+
+__all__ = ['RetryPolicy',
+           'CircuitBreaker']
+
+import threading
+import time
+
+# GENERAL CONSTANTS
+
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.001           # seconds
+DEFAULT_BACKOFF_FACTOR = 2.
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 1.        # seconds
+
+# RETRY POLICY ################################################################
+
+class RetryPolicy(object):
+    """Define how many times and when a failed transaction is retried.
+
+    The n-th retry is made ``backoff * backoff_factor ** (n - 1)`` seconds
+    after the failure of the previous attempt.
+
+    :param int retries: the maximum number of retries (i.e. the number of
+        attempts minus one).
+    :param float backoff: the delay (in seconds) before the first retry.
+    :param float backoff_factor: the factor applied to the delay after each
+        retry.
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR):
+
+        if retries < 0:
+            raise ValueError("The number of retries cannot be negative.")
+
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+
+
+    def delays(self):
+        """Return the list of delays (in seconds) before each retry."""
+        return [self.backoff * self.backoff_factor ** index
+                for index in range(self.retries)]
+
+
+# CIRCUIT BREAKER #############################################################
+
+class CircuitBreaker(object):
+    """Stop addressing Dynamixel units which keep failing.
+
+    After `failure_threshold` consecutive failed transactions, the circuit of
+    a Dynamixel unit is *open*: transactions are not sent to it anymore (they
+    fail immediately, as if the unit didn't reply). After `reset_timeout`
+    seconds, one transaction is let through to probe the unit: the circuit is
+    closed again if it succeeds and stays open for another `reset_timeout`
+    otherwise.
+
+    :param int failure_threshold: the number of consecutive failures which
+        opens the circuit of a Dynamixel unit.
+    :param float reset_timeout: the time (in seconds) before an open circuit
+        is probed.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT):
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._failures = {}      # Dynamixel ID -> consecutive failures
+        self._open_times = {}    # Dynamixel ID -> time the circuit opened
+        self._lock = threading.Lock()
+
+
+    def allow(self, dynamixel_id):
+        """Return ``True`` if a transaction can be sent to the specified
+        Dynamixel unit.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        """
+
+        with self._lock:
+            open_time = self._open_times.get(dynamixel_id)
+
+            if open_time is None:
+                return True
+
+            now = time.monotonic()
+            if now - open_time >= self.reset_timeout:
+                # Let one probe through (then wait again if it fails)
+                self._open_times[dynamixel_id] = now
+                return True
+
+            return False
+
+
+    def is_open(self, dynamixel_id):
+        """Return ``True`` if the circuit of the specified Dynamixel unit is
+        open.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        """
+        return dynamixel_id in self._open_times
+
+
+    @property
+    def open_ids(self):
+        """The sorted list of Dynamixel units whose circuit is open.
+
+        This member is a read-only property.
+        """
+        return sorted(self._open_times)
+
+
+    def record_success(self, dynamixel_id):
+        """Close the circuit of the specified Dynamixel unit.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        """
+
+        with self._lock:
+            self._failures.pop(dynamixel_id, None)
+            self._open_times.pop(dynamixel_id, None)
+
+
+    def record_failure(self, dynamixel_id):
+        """Count a failed transaction for the specified Dynamixel unit (and
+        open its circuit if the failure threshold is reached).
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        """
+
+        with self._lock:
+            failures = self._failures.get(dynamixel_id, 0) + 1
+            self._failures[dynamixel_id] = failures
+
+            if failures >= self.failure_threshold:
+                self._open_times[dynamixel_id] = time.monotonic()
+
+
+    def reset(self):
+        """Close all circuits."""
+
+        with self._lock:
+            self._failures.clear()
+            self._open_times.clear()
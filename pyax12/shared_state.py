@@ -0,0 +1,320 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `StatePublisher` and `StateReader` classes which
+share the latest state of Dynamixel units between processes.
+
+Only one process (the publisher) talks to the bus: it reads the present
+position, speed, load, voltage and temperature of each unit (one READ_DATA
+instruction per unit) and writes the raw register block in a
+`multiprocessing.shared_memory` segment. Any number of reader processes
+(planner, logger, user interface, ...) get the latest values from this
+segment without any system call nor any transaction on the bus.
+
+Each row of the table is protected by a sequence counter (a "seqlock"): the
+publisher makes it odd while the row is written and even again once it is
+complete, and readers retry if the counter is odd or changed while they were
+reading the row. Readers therefore never block the publisher and always get
+consistent rows.
+
+Publisher process::
+
+    publisher = StatePublisher(connection, [1, 2, 3], name='robot_state')
+    while True:
+        publisher.poll()
+
+Reader processes::
+
+    reader = StateReader('robot_state')
+    sample = reader.read(2)
+    print(sample.present_position, sample.present_temperature)
+"""
+
+__all__ = ['StatePublisher',
+           'StateReader',
+           'StateSample',
+           'SharedStateError']
+
+import collections
+import os
+import struct
+import sys
+import time
+
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+
+import pyax12.packet as pk
+
+# GENERAL CONSTANTS
+
+STATE_MAGIC = b'PYAX12SM'
+STATE_VERSION = 1
+
+# The register block published for each unit (from PRESENT_POSITION to
+# PRESENT_TEMPERATURE)
+BLOCK_ADDRESS = pk.PRESENT_POSITION
+BLOCK_LENGTH = pk.PRESENT_TEMPERATURE + 1 - pk.PRESENT_POSITION
+
+# The maximum number of attempts to read a row which is being written
+MAX_READ_ATTEMPTS = 1000
+
+HEADER = struct.Struct('<8sHH')         # magic, version, number of rows
+SEQUENCE = struct.Struct('<Q')
+ROW_DATA = struct.Struct('<d{}s'.format(BLOCK_LENGTH))   # timestamp, block
+ROW_SIZE = SEQUENCE.size + ROW_DATA.size
+
+# EXCEPTION CLASSES ###########################################################
+
+class SharedStateError(Exception):
+    """Exception raised if a shared state segment is invalid or cannot be
+    read."""
+    pass
+
+# SAMPLES #####################################################################
+
+StateSample = collections.namedtuple('StateSample',
+                                     ('dynamixel_id',
+                                      'sequence',
+                                      'timestamp',
+                                      'present_position',
+                                      'present_speed',
+                                      'present_load',
+                                      'present_voltage',
+                                      'present_temperature'))
+StateSample.__doc__ = """The latest published state of a Dynamixel unit.
+
+Register values are raw (e.g. the voltage is given in tenths of volt). The
+`timestamp` is the `time.monotonic` time of the read (comparable between
+processes of the same machine) and `sequence` increases each time the row is
+published.
+"""
+
+def _rows_offset(num_rows):
+    """Return the offset of the first row (rows are 8 bytes aligned)."""
+    return (HEADER.size + num_rows + 7) // 8 * 8
+
+
+def _decode_row(dynamixel_id, sequence, timestamp, block):
+    word = lambda index: block[index] + (block[index + 1] << 8)
+    return StateSample(dynamixel_id=dynamixel_id,
+                       sequence=sequence // 2,
+                       timestamp=timestamp,
+                       present_position=word(0),
+                       present_speed=word(2),
+                       present_load=word(4),
+                       present_voltage=block[6],
+                       present_temperature=block[7])
+
+# PUBLISHER ###################################################################
+
+class StatePublisher(object):
+    """Publish the state of Dynamixel units in a shared memory segment.
+
+    The segment is created by the publisher and removed by `close`.
+
+    :param connection: the `Connection` instance of the bus.
+    :param dynamixel_ids: the sequence of unique ID of the published units.
+    :param str name: the name of the shared memory segment (a random name is
+        chosen if ``None``, see the `name` attribute).
+    """
+
+    def __init__(self, connection, dynamixel_ids, name=None):
+
+        self.connection = connection
+        self.dynamixel_ids = list(dynamixel_ids)
+
+        self._rows = {dynamixel_id: index
+                      for index, dynamixel_id in enumerate(self.dynamixel_ids)}
+        self._offset = _rows_offset(len(self.dynamixel_ids))
+
+        size = self._offset + ROW_SIZE * len(self.dynamixel_ids)
+        self._shared_memory = shared_memory.SharedMemory(name=name,
+                                                         create=True,
+                                                         size=size)
+        buffer = self._shared_memory.buf
+        buffer[:size] = bytes(size)
+        HEADER.pack_into(buffer, 0, STATE_MAGIC, STATE_VERSION,
+                         len(self.dynamixel_ids))
+        buffer[HEADER.size:HEADER.size + len(self.dynamixel_ids)] = bytes(
+            self.dynamixel_ids)
+
+
+    @property
+    def name(self):
+        """The name of the shared memory segment (to be given to
+        `StateReader`).
+
+        This member is a read-only property.
+        """
+        return self._shared_memory.name
+
+
+    def publish(self, dynamixel_id, block, timestamp=None):
+        """Write the register block of a Dynamixel unit in its row.
+
+        :param int dynamixel_id: the unique ID of a published unit.
+        :param bytes block: the 8 bytes read from PRESENT_POSITION.
+        :param float timestamp: the `time.monotonic` time of the read (now by
+            default).
+        """
+
+        if len(block) != BLOCK_LENGTH:
+            raise ValueError("Wrong block length: {} bytes ({} expected)."
+                             .format(len(block), BLOCK_LENGTH))
+
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        buffer = self._shared_memory.buf
+        offset = self._offset + ROW_SIZE * self._rows[dynamixel_id]
+
+        sequence = SEQUENCE.unpack_from(buffer, offset)[0]
+        SEQUENCE.pack_into(buffer, offset, sequence + 1)     # odd: writing
+        ROW_DATA.pack_into(buffer, offset + SEQUENCE.size, timestamp,
+                           bytes(block))
+        SEQUENCE.pack_into(buffer, offset, sequence + 2)     # even: done
+
+
+    def poll(self):
+        """Read and publish the state of each unit (units which don't reply
+        keep their previous row).
+
+        :return: the list of units which replied.
+        """
+
+        updated_ids = []
+
+        for dynamixel_id in self.dynamixel_ids:
+            block = self.connection.read_data(dynamixel_id, BLOCK_ADDRESS,
+                                              BLOCK_LENGTH)
+            if block is not None and len(block) == BLOCK_LENGTH:
+                self.publish(dynamixel_id, block)
+                updated_ids.append(dynamixel_id)
+
+        return updated_ids
+
+
+    def close(self):
+        """Close and remove the shared memory segment."""
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+
+# READER ######################################################################
+
+def _attach_segment(name):
+    """Attach to an existing shared memory segment without letting the
+    resource tracker of this process remove it at exit (the segment belongs
+    to the publisher).
+
+    :param str name: the name of the shared memory segment.
+    """
+
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    segment = shared_memory.SharedMemory(name=name)
+
+    # Segments are only tracked on POSIX systems, where they are registered
+    # with a leading slash (which the `name` attribute doesn't have)
+    if os.name == 'posix':
+        resource_tracker.unregister('/' + segment.name.lstrip('/'),
+                                    'shared_memory')
+
+    return segment
+
+
+class StateReader(object):
+    """Read the state of Dynamixel units published by a `StatePublisher`.
+
+    :param str name: the name of the shared memory segment.
+    """
+
+    def __init__(self, name):
+
+        self._shared_memory = _attach_segment(name)
+
+        buffer = self._shared_memory.buf
+        magic, version, num_rows = HEADER.unpack_from(buffer, 0)
+
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            self._shared_memory.close()
+            raise SharedStateError("Not a PyAX-12 shared state segment.")
+
+        self.dynamixel_ids = list(buffer[HEADER.size:HEADER.size + num_rows])
+        self._rows = {dynamixel_id: index
+                      for index, dynamixel_id in enumerate(self.dynamixel_ids)}
+        self._offset = _rows_offset(num_rows)
+
+
+    def read(self, dynamixel_id):
+        """Return the latest `StateSample` of a Dynamixel unit (or ``None`` if
+        it hasn't been published yet).
+
+        :param int dynamixel_id: the unique ID of a published unit.
+        """
+
+        buffer = self._shared_memory.buf
+        offset = self._offset + ROW_SIZE * self._rows[dynamixel_id]
+
+        for attempt in range(MAX_READ_ATTEMPTS):
+            sequence = SEQUENCE.unpack_from(buffer, offset)[0]
+            if sequence % 2 == 1:
+                time.sleep(0)         # the row is being written
+                continue
+
+            timestamp, block = ROW_DATA.unpack_from(buffer,
+                                                    offset + SEQUENCE.size)
+
+            if SEQUENCE.unpack_from(buffer, offset)[0] == sequence:
+                if sequence == 0:
+                    return None
+                return _decode_row(dynamixel_id, sequence, timestamp, block)
+
+        raise SharedStateError("The row of the Dynamixel unit {} cannot be "
+                               "read.".format(dynamixel_id))
+
+
+    def snapshot(self):
+        """Return the latest `StateSample` of each unit (as a dictionary
+        indexed by ID; unpublished units are omitted).
+
+        Each sample is consistent but samples of different units may come from
+        different polls: compare their `timestamp`.
+        """
+
+        samples = {}
+        for dynamixel_id in self.dynamixel_ids:
+            sample = self.read(dynamixel_id)
+            if sample is not None:
+                samples[dynamixel_id] = sample
+        return samples
+
+
+    def close(self):
+        """Detach from the shared memory segment."""
+        self._shared_memory.close()
@@ -0,0 +1,412 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `ServoState` and `FleetState` classes which hold
+the raw register values of Dynamixel units.
+
+A `FleetState` stores the registers of all the units of a fleet in a single
+contiguous ``array('H')`` (one row of `NUM_REGISTERS` unsigned 16 bits
+integers per unit); it can be wrapped without copy by NumPy
+(``numpy.frombuffer(fleet.values, dtype=numpy.uint16)``). A `ServoState` is
+a lightweight view on one row. Registers are kept raw: unit conversions are
+computed on demand (e.g. `ServoState.present_voltage_volts`) and strings are
+only built for display (see `format_control_table`).
+
+Example::
+
+    fleet = FleetState([1, 2, 3])
+    fleet.poll(connection)                        # one read per unit
+    fleet.poll(connection, pk.PRESENT_POSITION, 8)
+    print(fleet.column('present_position'))
+    print(fleet.servo(2).present_temperature)
+"""
+
+__all__ = ['ServoState',
+           'FleetState',
+           'format_control_table']
+
+import array
+
+import pyax12.packet as pk
+from pyax12 import utils
+
+# THE REGISTERS OF THE CONTROL TABLE
+# (see the official Dynamixel AX-12 User's manual p.12)
+
+# (name, address, size in bytes)
+REGISTERS = (
+    ('model_number', pk.MODEL_NUMBER, 2),
+    ('firmware_version', pk.VERSION_OF_FIRMWARE, 1),
+    ('id', pk.ID, 1),
+    ('baud_rate', pk.BAUD_RATE, 1),
+    ('return_delay_time', pk.RETURN_DELAY_TIME, 1),
+    ('cw_angle_limit', pk.CW_ANGLE_LIMIT, 2),
+    ('ccw_angle_limit', pk.CCW_ANGLE_LIMIT, 2),
+    ('max_temperature', pk.HIGHEST_LIMIT_TEMPERATURE, 1),
+    ('min_voltage', pk.LOWEST_LIMIT_VOLTAGE, 1),
+    ('max_voltage', pk.HIGHEST_LIMIT_VOLTAGE, 1),
+    ('max_torque', pk.MAX_TORQUE, 2),
+    ('status_return_level', pk.STATUS_RETURN_LEVEL, 1),
+    ('alarm_led', pk.ALARM_LED, 1),
+    ('alarm_shutdown', pk.ALARM_SHUTDOWN, 1),
+    ('down_calibration', pk.DOWN_CALIBRATION, 2),
+    ('up_calibration', pk.UP_CALIBRATION, 2),
+    ('torque_enable', pk.TORQUE_ENABLE, 1),
+    ('led', pk.LED, 1),
+    ('cw_compliance_margin', pk.CW_COMPLIENCE_MARGIN, 1),
+    ('ccw_compliance_margin', pk.CCW_COMPLIENCE_MARGIN, 1),
+    ('cw_compliance_slope', pk.CW_COMPLIENCE_SLOPE, 1),
+    ('ccw_compliance_slope', pk.CCW_COMPLIENCE_SLOPE, 1),
+    ('goal_position', pk.GOAL_POSITION, 2),
+    ('moving_speed', pk.MOVING_SPEED, 2),
+    ('torque_limit', pk.TORQUE_LIMIT, 2),
+    ('present_position', pk.PRESENT_POSITION, 2),
+    ('present_speed', pk.PRESENT_SPEED, 2),
+    ('present_load', pk.PRESENT_LOAD, 2),
+    ('present_voltage', pk.PRESENT_VOLTAGE, 1),
+    ('present_temperature', pk.PRESENT_TEMPERATURE, 1),
+    ('registred_instruction', pk.REGISTRED_INSTRUCTION, 1),
+    ('moving', pk.MOVING, 1),
+    ('lock', pk.LOCK, 1),
+    ('punch', pk.PUNCH, 2),
+)
+
+NUM_REGISTERS = len(REGISTERS)
+
+# The number of bytes of the control table (from MODEL_NUMBER to PUNCH)
+CONTROL_TABLE_LENGTH = pk.PUNCH + 2
+
+REGISTER_INDEX = {name: index
+                  for index, (name, address, size) in enumerate(REGISTERS)}
+
+
+def decode_registers(byte_seq, values, offset, address=0):
+    """Decode the registers contained in a block of the control table.
+
+    Registers which are not entirely contained in the block are ignored.
+
+    :param bytes byte_seq: the bytes read from the control table.
+    :param values: the ``array('H')`` where register values are written.
+    :param int offset: the index in `values` of the first register (i.e.
+        MODEL_NUMBER) of the unit.
+    :param int address: the address of the first byte of `byte_seq`.
+    """
+
+    end = address + len(byte_seq)
+
+    for index, (name, register_address, size) in enumerate(REGISTERS):
+        if address <= register_address and register_address + size <= end:
+            position = register_address - address
+            value = byte_seq[position]
+            if size == 2:
+                value += byte_seq[position + 1] << 8
+            values[offset + index] = value
+
+# SERVO STATE #################################################################
+
+class ServoState(object):
+    """The raw register values of a Dynamixel unit.
+
+    Each register of the control table is a read-only attribute named after
+    it (e.g. ``state.present_position``); it returns the raw value of the
+    register. Unit conversions are given by the ``*_degrees``, ``*_volts``,
+    ... properties.
+
+    :param values: an ``array('H')`` containing the register values (a new
+        array is made if ``None``).
+    :param int offset: the index in `values` of the first register of the
+        unit.
+    """
+
+    __slots__ = ('_values', '_offset')
+
+    def __init__(self, values=None, offset=0):
+        if values is None:
+            values = array.array('H', bytes(2 * NUM_REGISTERS))
+        self._values = values
+        self._offset = offset
+
+
+    @classmethod
+    def from_bytes(cls, byte_seq, address=0):
+        """Make a `ServoState` from bytes read from the control table.
+
+        :param bytes byte_seq: the bytes read from the control table
+            (`Connection.dump_control_table` returns the whole table).
+        :param int address: the address of the first byte of `byte_seq`.
+        """
+        state = cls()
+        decode_registers(byte_seq, state._values, 0, address)
+        return state
+
+
+    def __getitem__(self, name):
+        return self._values[self._offset + REGISTER_INDEX[name]]
+
+
+    def __repr__(self):
+        return "ServoState(id={}, present_position={})".format(
+            self.id, self.present_position)
+
+
+    def to_dict(self):
+        """Return the raw register values as a dictionary."""
+        return {name: self._values[self._offset + index]
+                for index, (name, address, size) in enumerate(REGISTERS)}
+
+
+    # UNIT CONVERSIONS
+
+    @property
+    def baud_rate_bps(self):
+        """The baud rate (in bps)."""
+        return round(2000000 / (self.baud_rate + 1), 1)
+
+    @property
+    def return_delay_time_us(self):
+        """The return delay time (in microseconds)."""
+        return 2 * self.return_delay_time
+
+    @property
+    def cw_angle_limit_degrees(self):
+        """The clockwise angle limit (in degrees, from -150 to 150)."""
+        return utils.dxl_angle_to_degrees(self.cw_angle_limit)
+
+    @property
+    def ccw_angle_limit_degrees(self):
+        """The counter clockwise angle limit (in degrees, from -150 to
+        150)."""
+        return utils.dxl_angle_to_degrees(self.ccw_angle_limit)
+
+    @property
+    def min_voltage_volts(self):
+        """The lowest limit voltage (in Volts)."""
+        return self.min_voltage / 10.
+
+    @property
+    def max_voltage_volts(self):
+        """The highest limit voltage (in Volts)."""
+        return self.max_voltage / 10.
+
+    @property
+    def goal_position_degrees(self):
+        """The goal position (in degrees, from -150 to 150)."""
+        return utils.dxl_angle_to_degrees(self.goal_position)
+
+    @property
+    def present_position_degrees(self):
+        """The present position (in degrees, from -150 to 150)."""
+        return utils.dxl_angle_to_degrees(self.present_position)
+
+    @property
+    def present_load_signed(self):
+        """The present load (negative if it is applied to the clockwise
+        direction, see `Connection.get_present_load`)."""
+        load = self.present_load & 0x3ff
+        return load if self.present_load & (1 << 10) else -load
+
+    @property
+    def present_voltage_volts(self):
+        """The present voltage (in Volts)."""
+        return self.present_voltage / 10.
+
+
+def _register_property(index, name):
+    def getter(self):
+        return self._values[self._offset + index]
+    return property(getter, doc="The raw value of the {} register."
+                                .format(name))
+
+for _index, (_name, _address, _size) in enumerate(REGISTERS):
+    setattr(ServoState, _name, _register_property(_index, _name))
+
+# FLEET STATE #################################################################
+
+class FleetState(object):
+    """The raw register values of a fleet of Dynamixel units, stored in one
+    contiguous ``array('H')`` (the `values` attribute).
+
+    :param dynamixel_ids: the sequence of unique ID of the units.
+    """
+
+    def __init__(self, dynamixel_ids):
+        self.dynamixel_ids = list(dynamixel_ids)
+        self._rows = {dynamixel_id: index
+                      for index, dynamixel_id in enumerate(self.dynamixel_ids)}
+        self.values = array.array('H', bytes(2 * NUM_REGISTERS
+                                             * len(self.dynamixel_ids)))
+
+
+    def servo(self, dynamixel_id):
+        """Return the `ServoState` view of a unit (it reflects the later
+        updates of the fleet).
+
+        :param int dynamixel_id: the unique ID of a unit of the fleet.
+        """
+        return ServoState(self.values,
+                          self._rows[dynamixel_id] * NUM_REGISTERS)
+
+
+    def column(self, name):
+        """Return the raw values of a register for all the units (in the
+        order of `dynamixel_ids`).
+
+        :param str name: the name of the register (e.g.
+            ``'present_position'``).
+        """
+        return self.values[REGISTER_INDEX[name]::NUM_REGISTERS].tolist()
+
+
+    def update(self, dynamixel_id, byte_seq, address=0):
+        """Update the registers of a unit from bytes read from its control
+        table.
+
+        :param int dynamixel_id: the unique ID of a unit of the fleet.
+        :param bytes byte_seq: the bytes read from the control table.
+        :param int address: the address of the first byte of `byte_seq`.
+        """
+        decode_registers(byte_seq, self.values,
+                         self._rows[dynamixel_id] * NUM_REGISTERS, address)
+
+
+    def poll(self, connection, address=0, length=CONTROL_TABLE_LENGTH):
+        """Read a block of the control table of each unit (one READ_DATA
+        instruction per unit) and update the fleet.
+
+        :param connection: the `Connection` instance of the bus.
+        :param int address: the address of the first byte to read (the whole
+            table is read by default).
+        :param int length: the number of bytes to read.
+        :return: the list of units which replied.
+        """
+
+        updated_ids = []
+
+        for dynamixel_id in self.dynamixel_ids:
+            byte_seq = connection.read_data(dynamixel_id, address, length)
+            if byte_seq is not None and len(byte_seq) == length:
+                self.update(dynamixel_id, byte_seq, address)
+                updated_ids.append(dynamixel_id)
+
+        return updated_ids
+
+# FORMATTING ##################################################################
+
+def _angle_to_str(dxl_angle):
+    return "{}° ({})".format(utils.dxl_angle_to_degrees(dxl_angle), dxl_angle)
+
+
+def _abs_angle_to_str(dxl_angle):
+    return "{}° ({})".format(round(dxl_angle / 1023. * 300., 1), dxl_angle)
+
+
+def _on_off(value):
+    return "on" if value else "off"
+
+
+def _yes_no(value):
+    return "yes" if value else "no"
+
+
+MODEL_NAMES = {12: "AX-12+", 13: "AX-S1"}
+
+STATUS_RETURN_LEVEL_STR = {
+    0: "0 (do not respond to any instructions)",
+    1: "1 (respond only to READ_DATA instructions)",
+    2: "2 (respond to all instructions)"
+}
+
+# The names of the alarm bits (from bit 0 to bit 6)
+ALARMS = ('input_voltage', 'angle_limit', 'overheating', 'range', 'checksum',
+          'overload', 'instruction')
+
+def format_control_table(state):
+    """Return the control table of a unit as an easily human readable tuple
+    of ``(name, value)`` pairs (see `Connection.get_control_table_tuple`).
+
+    :param state: the `ServoState` of the unit.
+    """
+
+    model_number_str = MODEL_NAMES.get(state.model_number,
+                                       "Unknown (%i)" % state.model_number)
+
+    if state.max_torque == 0:
+        max_torque_str = "0 (free run mode)"
+    else:
+        max_torque_str = state.max_torque
+
+    status_return_level_str = STATUS_RETURN_LEVEL_STR.get(
+        state.status_return_level,
+        "%i (unknown)" % state.status_return_level)
+
+    alarm_leds = tuple(("%s_alarm_led" % alarm,
+                        _on_off(state.alarm_led & (1 << bit)))
+                       for bit, alarm in enumerate(ALARMS))
+    alarm_shutdowns = tuple(("%s_alarm_shutdown" % alarm,
+                             _on_off(state.alarm_shutdown & (1 << bit)))
+                            for bit, alarm in enumerate(ALARMS))
+
+    ctrl_table_tuple = (
+        ("model_number", model_number_str),
+        ("firmware_version", state.firmware_version),
+        ("id", state.id),
+        ("baud_rate", "%s bps" % state.baud_rate_bps),
+        ("return_delay_time", "%s µs" % state.return_delay_time_us),
+        ("cw_angle_limit", _angle_to_str(state.cw_angle_limit)),
+        ("ccw_angle_limit", _angle_to_str(state.ccw_angle_limit)),
+        ("max_temperature", "%s°C" % state.max_temperature),
+        ("min_voltage", "%sV" % state.min_voltage_volts),
+        ("max_voltage", "%sV" % state.max_voltage_volts),
+        ("max_torque", max_torque_str),
+        ("status_return_level", status_return_level_str),
+    ) + alarm_leds + alarm_shutdowns + (
+        ("down_calibration", state.down_calibration),
+        ("up_calibration", state.up_calibration),
+        ("torque_enabled", _yes_no(state.torque_enable == 1)),
+        ("led", _on_off(state.led == 1)),
+        ("cw_compliance_margin",
+         _abs_angle_to_str(state.cw_compliance_margin)),
+        ("ccw_compliance_margin",
+         _abs_angle_to_str(state.ccw_compliance_margin)),
+        ("cw_compliance_slope", _abs_angle_to_str(state.cw_compliance_slope)),
+        ("ccw_compliance_slope",
+         _abs_angle_to_str(state.ccw_compliance_slope)),
+        ("goal_position", _angle_to_str(state.goal_position)),
+        ("moving_speed", state.moving_speed),
+        ("torque_limit", state.torque_limit),
+        ("present_position", _angle_to_str(state.present_position)),
+        ("present_speed", state.present_speed),
+        ("present_load", state.present_load_signed),
+        ("present_voltage", "%sV" % state.present_voltage_volts),
+        ("present_temperature", "%s°C" % state.present_temperature),
+        ("registred_instruction", _yes_no(state.registred_instruction == 1)),
+        ("moving", _yes_no(state.moving == 1)),
+        ("locked", _yes_no(state.lock == 1)),
+        ("punch", state.punch),
+    )
+
+    return ctrl_table_tuple
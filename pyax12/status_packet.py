@@ -30,7 +30,8 @@ This module contain the `StatusPacket` class which implements
 controller after receiving an instruction packet).
 """
 
-__all__ = ['StatusPacket']
+__all__ = ['StatusPacket',
+           'split_status_packets']
 
 import pyax12.packet as pk
 
@@ -60,6 +61,12 @@ class StatusChecksumError(StatusPacketError):
     incorrect."""
     pass
 
+class MalformedPacketError(StatusPacketError, ValueError):
+    """Exception raised if the received bytes are not a well-formed status
+    packet (incomplete packet, wrong header, length or ID byte), e.g. because
+    of a transmission error."""
+    pass
+
 class RangeError(StatusPacketError):
     """Exception raised if the instruction sent is out of the defined range."""
     pass
@@ -79,6 +86,63 @@ class InputVoltageError(StatusPacketError):
     defined in the control table."""
     pass
 
+# STREAM PARSING ##############################################################
+
+def split_status_packets(byte_seq):
+    r"""Split a stream of received bytes into status packets.
+
+    Bytes which cannot be the beginning of a packet are skipped. Packets are
+    not checked: give each of them to `StatusPacket` to verify its checksum
+    and its error bits.
+
+    For instance, with the input
+    ``b'\xff\xff\x01\x02\x00\xfc\xff\xff\x02'`` this function returns
+    ``([b'\xff\xff\x01\x02\x00\xfc'], b'\xff\xff\x02')``.
+
+    :param bytes byte_seq: the received bytes. It must be compatible with the
+        "bytes" type.
+    :return: a ``(packets, remaining_bytes)`` tuple where `packets` is the
+        list of complete packets (as bytes strings) found in `byte_seq` and
+        `remaining_bytes` contains the beginning of the next (incomplete)
+        packet, to be prepended to the next received bytes.
+    """
+
+    byte_seq = bytes(byte_seq)
+
+    packets = []
+    index = 0
+
+    while True:
+        start = byte_seq.find(pk.PACKET_HEADER, index)
+
+        if start < 0:
+            # A trailing 0xFF may be the first byte of the next header
+            if byte_seq[index:].endswith(b'\xff'):
+                return packets, byte_seq[-1:]
+            return packets, b''
+
+        # The ID byte cannot be 0xFF: the header begins one byte later
+        if start + 2 < len(byte_seq) and byte_seq[start + 2] == 0xff:
+            index = start + 1
+            continue
+
+        if start + 4 > len(byte_seq):
+            return packets, byte_seq[start:]
+
+        # The length byte counts at least the error and checksum bytes
+        length = byte_seq[start + 3]
+        if length < 2:
+            index = start + 2
+            continue
+
+        end = start + 4 + length
+        if end > len(byte_seq):
+            return packets, byte_seq[start:]
+
+        packets.append(byte_seq[start:end])
+        index = end
+
+
 # STATUS PACKET CLASS #########################################################
 
 class StatusPacket(pk.Packet):
@@ -115,7 +179,7 @@ class StatusPacket(pk.Packet):
 
         # Assert the argument is a sequence with at least 6 items.
         if len(self._bytes) < 6:
-            raise ValueError("Incomplete packet.")
+            raise MalformedPacketError("Incomplete packet.")
 
         # Check the header bytes.
         # Should be tested before the length and checksum because if the header
@@ -123,14 +187,14 @@ class StatusPacket(pk.Packet):
         # the header first gives a more relevant information when its value is
         # wrong).
         if bytes(self.header) != b'\xff\xff':
-            raise ValueError("Wrong header (should be b'\xff\xff').")
+            raise MalformedPacketError("Wrong header (should be b'\xff\xff').")
 
         # Check length (length = num_params + 2 = full_packet_length - 4).
         # Should be tested before the checksum because if the length is wrong
         # then the checksum is wrong too (thus testing the length first gives a
         # more relevant information when its value is wrong).
         if self.length != len(self._bytes) - 4:
-            raise ValueError('Wrong length byte.')
+            raise MalformedPacketError('Wrong length byte.')
 
         # Verify the checksum.
         computed_checksum = pk.compute_checksum(self._bytes[2:-1])
@@ -162,7 +226,7 @@ class StatusPacket(pk.Packet):
         # Check the ID byte
         if not(0x00 <= self.dynamixel_id <= 0xfd):
             msg = "Wrong dynamixel_id, a value in range (0, 0xFD) is required."
-            raise ValueError(msg)
+            raise MalformedPacketError(msg)
 
 
     # READ ONLY PROPERTIES
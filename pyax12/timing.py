@@ -0,0 +1,398 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `TimingModel` class which computes the expected
+duration of each transaction (instruction packet + status packet) on a
+Dynamixel bus.
+
+The time spent by a transaction on the bus is::
+
+    transmission time of the instruction packet
+    + return delay time of the addressed Dynamixel unit
+    + transmission time of the status packet
+
+where the transmission time of `n` bytes is ``n * bits_per_byte / baudrate``
+(10 bits per byte with the 8N1 framing used by Dynamixel units: 1 start bit,
+8 data bits and 1 stop bit).
+
+The `servo_baud_rates` function lists the baud rates reachable by both
+Dynamixel units and the host UART, with their error; e.g. the fastest rate
+reachable with a 16550 UART is::
+
+    >>> rate = servo_baud_rates(base_baudrate=115200, divisor_step=1)[0]
+    >>> rate.register_value, rate.host_baudrate, round(rate.error, 4)
+    (16, 115200.0, -0.0208)
+"""
+
+__all__ = ['TimingModel',
+           'TransactionTiming',
+           'BaudRate',
+           'status_packet_length',
+           'staggered_return_delay_times',
+           'servo_baud_rates']
+
+import collections
+import math
+
+import pyax12.packet as pk
+import pyax12.instruction_packet as ip
+
+# GENERAL CONSTANTS
+
+STATUS_PACKET_OVERHEAD = 6  # header (2) + id + length + error + checksum
+
+READ_DATA_PACKET_LENGTH = 8  # header (2) + id + length + inst + 2 + checksum
+
+# The return delay time register counts units of 2 microseconds (0 to 254)
+RETURN_DELAY_TIME_UNIT = 2e-6
+MAX_RETURN_DELAY_TIME = 254 * RETURN_DELAY_TIME_UNIT
+
+# The idle time left between two status packets of a staggered read
+DEFAULT_GUARD_TIME = 10e-6
+
+DEFAULT_BITS_PER_BYTE = 10
+DEFAULT_RETURN_DELAY_TIME = 0.0005  # factory default (250 i.e. 500µs)
+DEFAULT_LATENCY = 0.02
+
+# The Dynamixel baud rate is 2000000 / (BAUD_RATE register value + 1)
+SERVO_BASE_BAUDRATE = 2000000
+MAX_BAUD_RATE_ERROR = 0.03    # the tolerance given by the AX-12 manual
+
+# The FTDI chips of USB2Dynamixel adapters divide a 3 MHz base by a
+# divisor with a 1/8 resolution
+FTDI_BASE_BAUDRATE = 3000000
+FTDI_DIVISOR_STEP = 0.125
+
+
+def _packet_bytes(instruction_packet):
+    if isinstance(instruction_packet, (bytes, bytearray)):
+        return bytes(instruction_packet)
+    return instruction_packet.to_bytes()
+
+
+def status_packet_length(instruction_packet, status_return_level=2):
+    """Return the length (in bytes) of the status packet expected in reply to
+    `instruction_packet` (``0`` if no status packet is expected).
+
+    Dynamixel units never reply to broadcasted instruction packets; READ_DATA
+    instructions get `length` parameters back; every other instruction gets a
+    status packet without parameters.
+
+    Depending on the *status return level* of the addressed unit, some
+    instructions are not answered:
+
+    +---------------------+-------------------------------+
+    | Status return level | Answered instructions         |
+    +=====================+===============================+
+    | 0                   | PING                          |
+    +---------------------+-------------------------------+
+    | 1                   | PING and READ_DATA            |
+    +---------------------+-------------------------------+
+    | 2                   | All instructions              |
+    +---------------------+-------------------------------+
+
+    :param instruction_packet: either an `InstructionPacket` instance or a
+        "bytes" string containing the full instruction packet.
+    :param int status_return_level: the status return level of the addressed
+        Dynamixel unit.
+    """
+
+    packet_bytes = _packet_bytes(instruction_packet)
+
+    dynamixel_id = packet_bytes[2]
+    instruction = packet_bytes[4]
+
+    if dynamixel_id == pk.BROADCAST_ID or instruction == ip.SYNC_WRITE:
+        length = 0
+    elif instruction == ip.PING:
+        length = STATUS_PACKET_OVERHEAD
+    elif instruction == ip.READ_DATA:
+        if status_return_level >= 1:
+            length = STATUS_PACKET_OVERHEAD + packet_bytes[6]
+        else:
+            length = 0
+    elif status_return_level >= 2:
+        length = STATUS_PACKET_OVERHEAD
+    else:
+        length = 0
+
+    return length
+
+
+TransactionTiming = collections.namedtuple('TransactionTiming',
+                                           ('transmission_time',
+                                            'return_delay_time',
+                                            'status_packet_length',
+                                            'reply_time',
+                                            'deadline'))
+TransactionTiming.__doc__ = """The expected timing of a transaction.
+
+All times are in seconds and relative to the beginning of the transmission of
+the instruction packet:
+
+- `transmission_time`: the time to send the instruction packet;
+- `return_delay_time`: the return delay time of the addressed unit;
+- `status_packet_length`: the expected length (in bytes) of the status packet
+  (``0`` if no status packet is expected);
+- `reply_time`: the expected time when the status packet is fully received;
+- `deadline`: the time after which the status packet is considered lost.
+"""
+
+
+class TimingModel(object):
+    """Compute the expected duration of transactions on a Dynamixel bus.
+
+    The return delay time of each Dynamixel unit is cached in the
+    `return_delay_times` dictionary (Dynamixel ID -> seconds); units which are
+    not in this dictionary are assumed to use `default_return_delay_time`.
+    Likewise, the reply latency of units which have been calibrated (see
+    `pyax12.calibration`) is cached in the `reply_latencies` dictionary;
+    other units use `latency`.
+
+    :param int baudrate: the baud rate of the bus (e.g. 57600).
+    :param int bits_per_byte: the number of bits sent on the line for each
+        byte (10 for the 8N1 framing used by Dynamixel units).
+    :param float default_return_delay_time: the return delay time (in seconds)
+        assumed for Dynamixel units whose return delay time is unknown.
+    :param float latency: the extra time (in seconds) allowed, on top of the
+        expected wire time, for a status packet to arrive (this covers the
+        host OS and USB adapter latencies). A missing status packet costs this
+        amount of time.
+    """
+
+    def __init__(self, baudrate, bits_per_byte=DEFAULT_BITS_PER_BYTE,
+                 default_return_delay_time=DEFAULT_RETURN_DELAY_TIME,
+                 latency=DEFAULT_LATENCY):
+
+        self.baudrate = baudrate
+        self.bits_per_byte = bits_per_byte
+        self.default_return_delay_time = default_return_delay_time
+        self.latency = latency
+
+        self.return_delay_times = {}
+        self.reply_latencies = {}
+
+
+    def transmission_time(self, num_bytes):
+        """Return the time (in seconds) to send `num_bytes` bytes on the bus.
+
+        :param int num_bytes: the number of bytes to send.
+        """
+        return num_bytes * self.bits_per_byte / float(self.baudrate)
+
+
+    def return_delay_time(self, dynamixel_id):
+        """Return the (cached) return delay time of the specified Dynamixel
+        unit (in seconds).
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        """
+        return self.return_delay_times.get(dynamixel_id,
+                                           self.default_return_delay_time)
+
+
+    def set_return_delay_time(self, dynamixel_id, return_delay_time):
+        """Update the cached return delay time of the specified Dynamixel unit.
+
+        If `dynamixel_id` is the broadcast ID, the new value applies to every
+        Dynamixel unit of the bus.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        :param float return_delay_time: the return delay time in seconds.
+        """
+        if dynamixel_id == pk.BROADCAST_ID:
+            self.default_return_delay_time = return_delay_time
+            self.return_delay_times.clear()
+        else:
+            self.return_delay_times[dynamixel_id] = return_delay_time
+
+
+    def reply_latency(self, dynamixel_id):
+        """Return the extra time (in seconds) allowed for a status packet of
+        the specified Dynamixel unit to arrive.
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        """
+        return self.reply_latencies.get(dynamixel_id, self.latency)
+
+
+    def set_reply_latency(self, dynamixel_id, latency):
+        """Set the extra time allowed for a status packet of the specified
+        Dynamixel unit to arrive (e.g. as measured by
+        `pyax12.calibration.calibrate`).
+
+        :param int dynamixel_id: the unique ID of a Dynamixel unit.
+        :param float latency: the reply latency in seconds.
+        """
+        self.reply_latencies[dynamixel_id] = latency
+
+
+    def transaction(self, instruction_packet, status_length=None):
+        """Return the expected `TransactionTiming` of `instruction_packet`.
+
+        :param instruction_packet: either an `InstructionPacket` instance or a
+            "bytes" string containing the full instruction packet.
+        :param int status_length: the expected length of the status packet.
+            If ``None``, it is deduced from the instruction packet (see
+            `status_packet_length()`).
+        """
+
+        packet_bytes = _packet_bytes(instruction_packet)
+
+        if status_length is None:
+            status_length = status_packet_length(packet_bytes)
+
+        transmission_time = self.transmission_time(len(packet_bytes))
+
+        if status_length > 0:
+            return_delay_time = self.return_delay_time(packet_bytes[2])
+            reply_time = (transmission_time + return_delay_time
+                          + self.transmission_time(status_length))
+            deadline = reply_time + self.reply_latency(packet_bytes[2])
+        else:
+            return_delay_time = 0.
+            reply_time = transmission_time
+            deadline = transmission_time
+
+        return TransactionTiming(transmission_time, return_delay_time,
+                                 status_length, reply_time, deadline)
+
+
+    def transaction_time(self, instruction_packet, status_length=None):
+        """Return the time (in seconds) `instruction_packet` and its status
+        packet occupy the bus.
+
+        :param instruction_packet: either an `InstructionPacket` instance or a
+            "bytes" string containing the full instruction packet.
+        :param int status_length: the expected length of the status packet.
+            If ``None``, it is deduced from the instruction packet.
+        """
+        return self.transaction(instruction_packet, status_length).reply_time
+
+
+def staggered_return_delay_times(timing_model, num_units, status_length,
+                                 guard_time=DEFAULT_GUARD_TIME):
+    """Return the return delay times (in seconds) which let `num_units`
+    Dynamixel units answer READ_DATA instruction packets sent back-to-back,
+    each in its own time slot.
+
+    The k-th unit (from 0) receives its instruction packet at ``(k + 1) * P``
+    (where ``P`` is the transmission time of a READ_DATA packet) and must
+    start replying once all instruction packets have been sent and the
+    previous units have replied, i.e. at ``N * P + k * (R + G)`` (where ``R``
+    is the transmission time of a status packet and ``G`` the guard time).
+    Its return delay time is therefore::
+
+        (N - k - 1) * P + k * (R + G)
+
+    Return delay times are rounded up to the 2 microseconds resolution of
+    the RETURN_DELAY_TIME register.
+
+    :param timing_model: the `TimingModel` of the bus.
+    :param int num_units: the number of Dynamixel units read together.
+    :param int status_length: the length of each status packet.
+    :param float guard_time: the idle time (in seconds) left between two
+        status packets (to absorb the timing jitter of Dynamixel units).
+    :raise ValueError: if a return delay time exceeds the maximum value of
+        the register (508 microseconds); use a higher baud rate or fewer
+        units.
+    """
+
+    packet_time = timing_model.transmission_time(READ_DATA_PACKET_LENGTH)
+    slot_time = timing_model.transmission_time(status_length) + guard_time
+
+    return_delay_times = []
+
+    for index in range(num_units):
+        delay = (num_units - index - 1) * packet_time + index * slot_time
+        units = int(math.ceil(delay / RETURN_DELAY_TIME_UNIT - 1e-9))
+        return_delay_time = units * RETURN_DELAY_TIME_UNIT
+
+        if return_delay_time > MAX_RETURN_DELAY_TIME + 1e-12:
+            msg = ("{} units cannot be staggered at {} bps (a return delay "
+                   "time of {:.0f}us would be needed).")
+            raise ValueError(msg.format(num_units, timing_model.baudrate,
+                                        delay * 1e6))
+
+        return_delay_times.append(return_delay_time)
+
+    return return_delay_times
+
+
+BaudRate = collections.namedtuple('BaudRate', ('register_value',
+                                               'servo_baudrate',
+                                               'host_baudrate',
+                                               'error'))
+BaudRate.__doc__ = """A baud rate reachable by Dynamixel units.
+
+`register_value` is the value of the BAUD_RATE register, `servo_baudrate` the
+actual baud rate of Dynamixel units, `host_baudrate` the nearest baud rate of
+the host UART and `error` the relative difference between both
+(``(host_baudrate - servo_baudrate) / servo_baudrate``).
+"""
+
+
+def servo_baud_rates(base_baudrate=FTDI_BASE_BAUDRATE,
+                     divisor_step=FTDI_DIVISOR_STEP,
+                     max_error=MAX_BAUD_RATE_ERROR):
+    """Return the baud rates reachable by both Dynamixel units and the host
+    UART, from the fastest to the slowest.
+
+    Dynamixel units run at ``2000000 / (n + 1)`` bps where ``n`` is the value
+    of their BAUD_RATE register (1 to 254). The host UART runs at
+    ``base_baudrate / divisor`` bps where the divisor is a multiple of
+    `divisor_step`. The default values describe the FTDI chips of
+    USB2Dynamixel adapters; e.g. use ``base_baudrate=115200`` and
+    ``divisor_step=1`` for a 16550 UART.
+
+    The fastest usable baud rate is the first item of the list.
+
+    :param float base_baudrate: the baud rate of the host UART with a
+        divisor of 1.
+    :param float divisor_step: the resolution of the divisor of the host
+        UART.
+    :param float max_error: the maximum relative error (e.g. 0.03 for 3%)
+        between the servo and the host baud rates.
+    :return: a list of `BaudRate`.
+    """
+
+    baud_rates = []
+
+    for register_value in range(1, 255):
+        servo_baudrate = SERVO_BASE_BAUDRATE / (register_value + 1.)
+
+        num_steps = round(base_baudrate / servo_baudrate / divisor_step)
+        divisor = max(num_steps, 1) * divisor_step
+        host_baudrate = min(base_baudrate / divisor, base_baudrate)
+
+        error = (host_baudrate - servo_baudrate) / servo_baudrate
+
+        if abs(error) <= max_error:
+            baud_rates.append(BaudRate(register_value, servo_baudrate,
+                                       host_baudrate, error))
+
+    return baud_rates
@@ -0,0 +1,213 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `TrajectoryStreamer` class which plays
+time-parameterized joint trajectories on several Dynamixel units at a fixed
+control rate.
+
+Each control period, the goal positions of all Dynamixel units are
+interpolated and sent in a single SYNC_WRITE instruction packet (a *frame*).
+Frames are scheduled on absolute deadlines (``start + k * period``) so that
+the control rate doesn't drift.
+"""
+
+__all__ = ['TrajectoryStreamer',
+           'StreamReport']
+
+import bisect
+import collections
+import time
+
+import pyax12.packet as pk
+from pyax12 import utils
+
+# GENERAL CONSTANTS
+
+DEFAULT_RATE = 100.   # frames per second
+
+StreamReport = collections.namedtuple('StreamReport',
+                                      ('num_frames',
+                                       'deadline_misses',
+                                       'achieved_rate',
+                                       'max_lateness'))
+StreamReport.__doc__ = """The report of a `TrajectoryStreamer.stream()` call.
+
+- `num_frames`: the number of frames sent;
+- `deadline_misses`: the number of frames skipped because they were more than
+  one period late;
+- `achieved_rate`: the number of frames sent per second;
+- `max_lateness`: the maximum delay (in seconds) between the deadline of a
+  frame and the time it was actually sent.
+"""
+
+
+def _sleep_until(deadline):
+    """Sleep until the given (monotonic) time."""
+    delay = deadline - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+class TrajectoryStreamer(object):
+    """Stream joint trajectories to several Dynamixel units at a fixed rate.
+
+    :param connection: the `Connection` used to send frames.
+    :param dynamixel_ids: the sequence of unique ID of the Dynamixel units to
+        control (one per column of the trajectories).
+    :param float rate: the control rate (in frames per second).
+    :param bool degrees: if ``True``, positions are defined *in degrees* in
+        range (-150, 150); otherwise they are unit free positions in range
+        (0, 1023).
+    """
+
+    def __init__(self, connection, dynamixel_ids, rate=DEFAULT_RATE,
+                 degrees=False):
+
+        if rate <= 0:
+            raise ValueError("The control rate must be positive.")
+
+        self.connection = connection
+        self.dynamixel_ids = tuple(dynamixel_ids)
+        self.rate = rate
+        self.degrees = degrees
+
+
+    @property
+    def period(self):
+        """The control period (in seconds).
+
+        This member is a read-only property.
+        """
+        return 1. / self.rate
+
+
+    def interpolate(self, times, positions, instant):
+        """Return the positions of all Dynamixel units at the given instant
+        (linear interpolation).
+
+        :param times: the increasing sequence of waypoint times (in seconds).
+        :param positions: the sequence of waypoint positions (one row per
+            waypoint, one column per Dynamixel unit); e.g. a 2D NumPy array.
+        :param float instant: the time (in seconds) to interpolate at. It is
+            clipped to the ``(times[0], times[-1])`` range.
+        """
+
+        if instant <= times[0]:
+            return [float(position) for position in positions[0]]
+
+        if instant >= times[-1]:
+            return [float(position) for position in positions[-1]]
+
+        index = bisect.bisect_right(times, instant)
+        time_0, time_1 = times[index - 1], times[index]
+        ratio = (instant - time_0) / float(time_1 - time_0)
+
+        return [float(p_0) + ratio * (float(p_1) - float(p_0))
+                for p_0, p_1 in zip(positions[index - 1], positions[index])]
+
+
+    def make_frame(self, positions):
+        """Return the SYNC_WRITE data (a dictionary mapping each Dynamixel ID
+        to its goal position bytes) for the given positions.
+
+        :param positions: the goal position of each Dynamixel unit.
+        """
+
+        frame = {}
+
+        for dynamixel_id, position in zip(self.dynamixel_ids, positions):
+            if self.degrees:
+                position = utils.degrees_to_dxl_angle(position)
+            position = min(max(int(round(position)), 0), 1023)
+            frame[dynamixel_id] = utils.int_to_little_endian_bytes(position)
+
+        return frame
+
+
+    def stream(self, times, positions):
+        """Play a trajectory.
+
+        Frames are sent every `period` seconds from ``times[0]`` to
+        ``times[-1]`` (both included). A frame which is more than one period
+        late is skipped and counted as a deadline miss.
+
+        :param times: the increasing sequence of waypoint times (in seconds),
+            e.g. a 1D NumPy array.
+        :param positions: the sequence of waypoint positions (one row per
+            waypoint, one column per Dynamixel unit), e.g. a 2D NumPy array.
+        :return: a `StreamReport`.
+        """
+
+        times = [float(instant) for instant in times]
+
+        if len(times) == 0 or len(times) != len(positions):
+            raise ValueError("One row of positions is required per waypoint.")
+
+        if any(t_1 <= t_0 for t_0, t_1 in zip(times, times[1:])):
+            raise ValueError("Waypoint times must be strictly increasing.")
+
+        period = self.period
+        num_ticks = int((times[-1] - times[0]) * self.rate + 1e-9) + 1
+
+        num_frames = 0
+        deadline_misses = 0
+        max_lateness = 0.
+
+        start_time = time.monotonic()
+        tick = 0
+
+        while tick < num_ticks:
+            deadline = start_time + tick * period
+            _sleep_until(deadline)
+
+            lateness = time.monotonic() - deadline
+            if lateness > period:
+                # Skip the frames whose deadline is over
+                num_missed_ticks = min(int(lateness / period),
+                                       num_ticks - 1 - tick)
+                if num_missed_ticks > 0:
+                    deadline_misses += num_missed_ticks
+                    tick += num_missed_ticks
+                    continue
+
+            max_lateness = max(max_lateness, lateness)
+
+            instant = times[0] + tick * period
+            frame = self.make_frame(self.interpolate(times, positions, instant))
+            self.connection.sync_write(pk.GOAL_POSITION, frame)
+
+            num_frames += 1
+            tick += 1
+
+        elapsed_time = time.monotonic() - start_time
+        if num_frames > 1 and elapsed_time > 0:
+            achieved_rate = (num_frames - 1) / elapsed_time
+        else:
+            achieved_rate = 0.
+
+        return StreamReport(num_frames, deadline_misses, achieved_rate,
+                            max_lateness)
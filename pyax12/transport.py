@@ -0,0 +1,550 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+This module contains the `TermiosSerial` class, a Linux (POSIX) serial
+transport which talks to the tty driver directly with `os` and `termios`.
+It can't be imported on platforms without `fcntl` and `termios` (e.g.
+Windows), hence it is not part of ``from pyax12 import *``.
+
+`TermiosSerial` implements the subset of the `serial.Serial` interface used
+by `Connection` (``write``, ``read``, ``inWaiting``, ``flushInput``, ...) and
+can be given to it as a drop-in replacement for pyserial::
+
+    transport = TermiosSerial('/dev/ttyUSB0', baudrate=1000000)
+    connection = Connection(transport=transport, baudrate=1000000)
+
+Compared to pyserial, each call is a single system call on a non-blocking
+file descriptor (no Python-level wrappers, no per-call reconfiguration),
+reads go to a preallocated buffer and waits for incoming bytes are made with
+``poll`` deadlines (see `TermiosSerial.wait_readable`) instead of sleeps.
+The ``examples/benchmark_transport.py`` script compares the per-transaction
+overhead of both transports on a pseudo-terminal.
+
+Baud rates which are not standard POSIX speeds (e.g. 250000 or 400000 bps,
+which Dynamixel units support) are set with the Linux ``termios2`` ioctls
+and the ``BOTHER`` flag. The `pyax12.timing.servo_baud_rates` function
+lists the baud rates reachable by both Dynamixel units and the host UART.
+
+USB-serial adapters add their own latency: FTDI chips (e.g. in the
+USB2Dynamixel) hold received bytes for up to 16 ms by default, which is far
+longer than the reply time of Dynamixel units. `TermiosSerial` detects
+FTDI, CH340 and CP210x adapters (see `usb_serial_adapter`) and, where
+permitted, sets the ``ASYNC_LOW_LATENCY`` flag of the driver and a 1 ms
+latency timer. `measure_round_trip_floor` measures the resulting round trip
+time with a real Dynamixel unit (the ``pyax12 adapter`` command prints it).
+"""
+
+__all__ = ['TermiosSerial',
+           'BaudRate',
+           'servo_baud_rates',
+           'usb_serial_adapter',
+           'get_latency_timer',
+           'set_latency_timer',
+           'set_low_latency',
+           'measure_round_trip_floor']
+
+import array
+import fcntl
+import os
+import select
+import struct
+import sys
+import termios
+import time
+
+# Imported for backward compatibility (the baud rate table is portable)
+from pyax12.timing import BaudRate, servo_baud_rates
+
+# GENERAL CONSTANTS
+
+READ_BUFFER_SIZE = 4096   # bytes
+
+# Linux termios2 ioctls (asm-generic values, used by x86 and ARM)
+TCGETS2 = 0x802c542a
+TCSETS2 = 0x402c542b
+CBAUD = 0o010017
+BOTHER = 0o010000
+
+# struct termios2: c_iflag, c_oflag, c_cflag, c_lflag, c_line, c_cc[19],
+# c_ispeed, c_ospeed
+_TERMIOS2 = struct.Struct('IIIIB19sII')
+
+# Linux serial_struct ioctls (the "flags" field is the fifth int)
+TIOCGSERIAL = 0x541e
+TIOCSSERIAL = 0x541f
+ASYNC_LOW_LATENCY = 1 << 13
+_SERIAL_STRUCT_SIZE = 128              # more than sizeof(struct serial_struct)
+_SERIAL_FLAGS = struct.Struct('4xi')   # type, line, port, irq, flags
+
+# Kernel drivers of USB-serial adapters (driver name -> adapter name)
+USB_SERIAL_DRIVERS = {'ftdi_sio': 'FTDI',
+                      'ch341': 'CH340',
+                      'ch341-uart': 'CH340',
+                      'cp210x': 'CP210x'}
+
+SYSFS_ROOT = '/sys'
+LOW_LATENCY_TIMER = 1      # milliseconds
+
+# EXCEPTION CLASSES ###########################################################
+
+class TransportError(Exception):
+    """Base class for exceptions in the `transport` module."""
+    pass
+
+# BAUD RATES ##################################################################
+
+def _termios_speed(baudrate):
+    """Return the termios constant (e.g. ``termios.B57600``) of a standard
+    baud rate or ``None`` if `baudrate` is not a standard POSIX speed.
+
+    :param int baudrate: the baud rate (e.g. 57600).
+    """
+
+    if baudrate != int(baudrate):
+        return None
+
+    return getattr(termios, 'B{}'.format(int(baudrate)), None)
+
+
+def _set_custom_baudrate(fd, baudrate):
+    """Set an arbitrary baud rate with the Linux ``termios2`` ioctls.
+
+    :param int fd: the file descriptor of the tty.
+    :param int baudrate: the baud rate (e.g. 250000).
+    :raise ValueError: if the platform or the driver doesn't support
+        arbitrary baud rates.
+    """
+
+    if not sys.platform.startswith('linux'):
+        msg = "Unsupported baud rate: {} bps (not a standard termios speed)."
+        raise ValueError(msg.format(baudrate))
+
+    buf = bytearray(_TERMIOS2.size)
+
+    try:
+        fcntl.ioctl(fd, TCGETS2, buf)
+        (iflag, oflag, cflag, lflag,
+         line, cc, ispeed, ospeed) = _TERMIOS2.unpack(buf)
+
+        cflag = (cflag & ~CBAUD) | BOTHER
+        cflag &= ~(CBAUD << 16)           # CIBAUD: same input speed
+        speed = int(round(baudrate))
+
+        fcntl.ioctl(fd, TCSETS2, _TERMIOS2.pack(iflag, oflag, cflag, lflag,
+                                                line, cc, speed, speed))
+    except OSError as error:
+        msg = "Unsupported baud rate: {} bps ({})."
+        raise ValueError(msg.format(baudrate, error))
+
+
+# USB-SERIAL ADAPTERS #########################################################
+
+def _sysfs_device_path(port, sysfs_root):
+    """Return the sysfs directory of the device behind the tty `port`."""
+    tty_name = os.path.basename(os.path.realpath(port))
+    return os.path.join(sysfs_root, 'class', 'tty', tty_name, 'device')
+
+
+def usb_serial_adapter(port, sysfs_root=SYSFS_ROOT):
+    """Return the name of the USB-serial adapter behind `port` ('FTDI',
+    'CH340' or 'CP210x') or ``None`` if it is not a known USB-serial adapter
+    (or if sysfs is not available).
+
+    :param str port: the serial device (e.g. '/dev/ttyUSB0').
+    :param str sysfs_root: the mount point of sysfs.
+    """
+
+    driver_path = os.path.join(_sysfs_device_path(port, sysfs_root),
+                               'driver')
+
+    if not os.path.exists(driver_path):
+        return None
+
+    driver = os.path.basename(os.path.realpath(driver_path))
+
+    return USB_SERIAL_DRIVERS.get(driver)
+
+
+def get_latency_timer(port, sysfs_root=SYSFS_ROOT):
+    """Return the latency timer (in milliseconds) of the FTDI adapter behind
+    `port` or ``None`` if the adapter has no latency timer.
+
+    :param str port: the serial device (e.g. '/dev/ttyUSB0').
+    :param str sysfs_root: the mount point of sysfs.
+    """
+
+    path = os.path.join(_sysfs_device_path(port, sysfs_root),
+                        'latency_timer')
+
+    try:
+        with open(path) as fd:
+            return int(fd.read())
+    except (OSError, ValueError):
+        return None
+
+
+def set_latency_timer(port, latency_timer=LOW_LATENCY_TIMER,
+                      sysfs_root=SYSFS_ROOT):
+    """Set the latency timer (in milliseconds) of the FTDI adapter behind
+    `port`.
+
+    Writing the latency timer usually requires root privileges (or an udev
+    rule such as ``ATTR{latency_timer}="1"``).
+
+    :param str port: the serial device (e.g. '/dev/ttyUSB0').
+    :param int latency_timer: the new latency timer (1 to 255 ms).
+    :param str sysfs_root: the mount point of sysfs.
+    :return: ``True`` if the latency timer has been set, ``False`` if it
+        isn't permitted or if the adapter has no latency timer.
+    """
+
+    path = os.path.join(_sysfs_device_path(port, sysfs_root),
+                        'latency_timer')
+
+    try:
+        with open(path, 'w') as fd:
+            fd.write(str(int(latency_timer)))
+    except OSError:
+        return False
+
+    return True
+
+
+def set_low_latency(fd):
+    """Set the ``ASYNC_LOW_LATENCY`` flag of the serial driver of the tty
+    `fd` (received bytes are then pushed to readers at once).
+
+    :param int fd: the file descriptor of the tty.
+    :return: ``True`` if the flag is set, ``False`` if the driver doesn't
+        support it or if it isn't permitted.
+    """
+
+    buf = bytearray(_SERIAL_STRUCT_SIZE)
+
+    try:
+        fcntl.ioctl(fd, TIOCGSERIAL, buf)
+        flags = _SERIAL_FLAGS.unpack_from(buf)[0]
+
+        if not flags & ASYNC_LOW_LATENCY:
+            _SERIAL_FLAGS.pack_into(buf, 0, flags | ASYNC_LOW_LATENCY)
+            fcntl.ioctl(fd, TIOCSSERIAL, buf)
+    except OSError:
+        return False
+
+    return True
+
+
+def measure_round_trip_floor(connection, dynamixel_id, num_transactions=20):
+    """Return the shortest round trip time (in seconds) of PING transactions
+    with the specified Dynamixel unit.
+
+    The difference between this time and the wire time of the transaction
+    (see `pyax12.timing`) is the latency added by the host and the USB
+    adapter: if it is close to the latency timer of the adapter, the adapter
+    is the bottleneck.
+
+    :param connection: a `Connection` instance.
+    :param int dynamixel_id: the unique ID of an available Dynamixel unit.
+    :param int num_transactions: the number of PING transactions made.
+    :return: the shortest round trip time or ``None`` if the unit never
+        replied.
+    """
+
+    round_trip_floor = None
+
+    for _ in range(num_transactions):
+        start = time.perf_counter()
+        is_available = connection.ping(dynamixel_id)
+        round_trip_time = time.perf_counter() - start
+
+        if is_available and (round_trip_floor is None
+                             or round_trip_time < round_trip_floor):
+            round_trip_floor = round_trip_time
+
+    return round_trip_floor
+
+
+# TERMIOS TRANSPORT ###########################################################
+
+class TermiosSerial(object):
+    """A serial connection opened with ``os.open`` and configured with
+    `termios` (raw mode, 8 data bits, no parity, one stop bit, no flow
+    control).
+
+    :param str port: the serial device to open (e.g. '/dev/ttyUSB0').
+    :param int baudrate: the baud rate speed (e.g. 57600). Non-standard baud
+        rates (e.g. 250000) are supported on Linux.
+    :param float timeout: the maximum time (in seconds) `read` waits for the
+        requested bytes (``None`` to wait forever, 0 to never wait).
+    :param float write_timeout: the maximum time (in seconds) `write` waits
+        for the output buffer of the driver (``None`` to wait forever).
+    :param bool low_latency: if ``True``, set the ``ASYNC_LOW_LATENCY`` flag
+        and (for FTDI adapters) a 1 ms latency timer where permitted. The
+        outcome is given by the `adapter`, `low_latency` and `latency_timer`
+        attributes.
+    """
+
+    def __init__(self, port, baudrate=57600, timeout=0.1, write_timeout=None,
+                 low_latency=True):
+
+        self.port = port
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+
+        self._baudrate = baudrate
+        self._buffer = bytearray(READ_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._num_bytes_available = array.array('i', [0])
+
+        self._fd = os.open(port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+
+        try:
+            self._configure()
+        except Exception:
+            os.close(self._fd)
+            self._fd = None
+            raise
+
+        self._poll_in = select.poll()
+        self._poll_in.register(self._fd, select.POLLIN)
+        self._poll_out = select.poll()
+        self._poll_out.register(self._fd, select.POLLOUT)
+
+        # The USB-serial adapter (if any) and its latency settings
+        self.adapter = usb_serial_adapter(port)
+        self.low_latency = False
+
+        if low_latency:
+            self.low_latency = set_low_latency(self._fd)
+            if self.adapter == 'FTDI':
+                set_latency_timer(port, LOW_LATENCY_TIMER)
+
+        self.latency_timer = get_latency_timer(port)
+
+
+    def _configure(self):
+        """Put the tty in raw mode at the current baud rate."""
+
+        speed = _termios_speed(self._baudrate)
+        custom_baudrate = speed is None
+        if custom_baudrate:
+            speed = termios.B38400   # replaced below
+
+        (iflag, oflag, cflag, lflag,
+         ispeed, ospeed, cc) = termios.tcgetattr(self._fd)
+
+        iflag = 0
+        oflag = 0
+        lflag = 0
+        cflag &= ~(termios.CSIZE | termios.PARENB | termios.CSTOPB
+                   | getattr(termios, 'CRTSCTS', 0))
+        cflag |= termios.CS8 | termios.CREAD | termios.CLOCAL
+
+        # Reads return at once (the file descriptor is non-blocking anyway)
+        cc[termios.VMIN] = 0
+        cc[termios.VTIME] = 0
+
+        termios.tcsetattr(self._fd, termios.TCSANOW,
+                          [iflag, oflag, cflag, lflag, speed, speed, cc])
+
+        if custom_baudrate:
+            _set_custom_baudrate(self._fd, self._baudrate)
+
+
+    @property
+    def baudrate(self):
+        """The baud rate of the serial connection (setting it reconfigures
+        the tty)."""
+        return self._baudrate
+
+    @baudrate.setter
+    def baudrate(self, baudrate):
+        previous_baudrate = self._baudrate
+        self._baudrate = baudrate
+        try:
+            self._configure()
+        except Exception:
+            self._baudrate = previous_baudrate
+            raise
+
+    @property
+    def is_open(self):
+        """``True`` until the connection is closed."""
+        return self._fd is not None
+
+
+    def fileno(self):
+        """Return the file descriptor of the tty."""
+        return self._fd
+
+
+    def _check_open(self):
+        if self._fd is None:
+            raise TransportError("The serial connection is closed.")
+
+
+    def write(self, data):
+        """Write `data` and return the number of bytes written.
+
+        :param bytes data: the bytes to send.
+        :raise TransportError: if the output buffer stays full longer than
+            `write_timeout`.
+        """
+
+        self._check_open()
+
+        data = memoryview(data)
+        num_bytes = len(data)
+        num_written_bytes = os.write(self._fd, data)
+
+        if num_written_bytes < num_bytes:
+            # The output buffer of the driver is full (rare)
+            deadline = None
+            if self.write_timeout is not None:
+                deadline = time.monotonic() + self.write_timeout
+
+            while num_written_bytes < num_bytes:
+                if not self._poll(self._poll_out, deadline):
+                    raise TransportError("Write timeout.")
+                try:
+                    num_written_bytes += os.write(
+                        self._fd, data[num_written_bytes:])
+                except BlockingIOError:
+                    pass
+
+        return num_bytes
+
+
+    def read(self, size=1):
+        """Read `size` bytes or return what has been received when `timeout`
+        expires.
+
+        :param int size: the number of bytes to read.
+        """
+
+        self._check_open()
+
+        if size > len(self._buffer):
+            self._buffer = bytearray(size)
+            self._view = memoryview(self._buffer)
+
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.monotonic() + self.timeout
+
+        num_read_bytes = 0
+
+        while num_read_bytes < size:
+            try:
+                num_new_bytes = os.readv(self._fd,
+                                         [self._view[num_read_bytes:size]])
+            except BlockingIOError:
+                num_new_bytes = 0
+
+            # With VMIN = 0, reading an empty tty returns 0 bytes
+            if num_new_bytes > 0:
+                num_read_bytes += num_new_bytes
+            elif not self._poll(self._poll_in, deadline):
+                break
+
+        return bytes(self._view[:num_read_bytes])
+
+
+    def wait_readable(self, timeout):
+        """Wait until bytes can be read or `timeout` (in seconds) expires.
+
+        :return: ``True`` if bytes can be read.
+        """
+
+        self._check_open()
+        return self._poll(self._poll_in, time.monotonic() + timeout)
+
+
+    @staticmethod
+    def _poll(poll_object, deadline):
+        """Wait for a file descriptor event until the (monotonic) `deadline`
+        (``None`` to wait forever) and return ``True`` if it happened."""
+
+        if deadline is None:
+            events = poll_object.poll()
+        else:
+            timeout_ms = max(deadline - time.monotonic(), 0.) * 1000.
+            events = poll_object.poll(timeout_ms)
+
+        for _, event in events:
+            if event & (select.POLLERR | select.POLLHUP | select.POLLNVAL):
+                raise TransportError("The serial device has been "
+                                     "disconnected.")
+
+        return len(events) > 0
+
+
+    def inWaiting(self):
+        """Return the number of bytes in the input buffer."""
+
+        self._check_open()
+        fcntl.ioctl(self._fd, termios.FIONREAD, self._num_bytes_available)
+        return self._num_bytes_available[0]
+
+    @property
+    def in_waiting(self):
+        """The number of bytes in the input buffer."""
+        return self.inWaiting()
+
+
+    def flushInput(self):
+        """Discard the content of the input buffer."""
+
+        self._check_open()
+        termios.tcflush(self._fd, termios.TCIFLUSH)
+
+    reset_input_buffer = flushInput
+
+
+    def flushOutput(self):
+        """Discard the bytes of the output buffer which have not been
+        transmitted yet (like pyserial)."""
+
+        self._check_open()
+        termios.tcflush(self._fd, termios.TCOFLUSH)
+
+    reset_output_buffer = flushOutput
+
+
+    def flush(self):
+        """Wait until all written bytes have been transmitted."""
+
+        self._check_open()
+        termios.tcdrain(self._fd)
+
+
+    def close(self):
+        """Close the serial connection."""
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
@@ -0,0 +1,247 @@
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains the `tune_bus` procedure which moves every Dynamixel unit
+of a bus to a faster baud rate and a shorter return delay time.
+
+All Dynamixel units are shipped at 57600 bps with a 500µs return delay time;
+at 1 Mbps with a null return delay time, transactions are about 20 times
+faster.
+"""
+
+__all__ = ['TuningReport',
+           'tune_bus',
+           'measure_latency']
+
+import collections
+import time
+
+import pyax12.packet as pk
+import pyax12.timing as tm
+
+# GENERAL CONSTANTS
+
+DEFAULT_SETTLE_TIME = 0.05   # time given to units to apply a new baud rate
+MAX_BAUDRATE_ERROR = tm.MAX_BAUD_RATE_ERROR
+
+# EXCEPTION CLASSES ###########################################################
+
+class TuningError(Exception):
+    """Exception raised if the bus tuning failed (the former configuration has
+    been restored).
+
+    `unreachable_ids` lists the Dynamixel units which don't reply at the
+    former baud rate after the rollback (they may have been left at the new
+    baud rate).
+    """
+
+    def __init__(self, message, unreachable_ids=()):
+        super(TuningError, self).__init__(message)
+        self.unreachable_ids = list(unreachable_ids)
+
+# BUS TUNING ##################################################################
+
+TuningReport = collections.namedtuple('TuningReport',
+                                      ('dynamixel_ids',
+                                       'former_baudrate',
+                                       'baudrate',
+                                       'former_latency',
+                                       'latency',
+                                       'baudrate_error'))
+TuningReport.__doc__ = """The report of a successful `tune_bus()` call.
+
+`former_latency` and `latency` are the mean ping round-trip times (in
+seconds) measured before and after the tuning. `baudrate_error` is the
+relative difference between the baud rate of the host and the actual baud
+rate of Dynamixel units (see `pyax12.timing.servo_baud_rates`).
+"""
+
+
+def _baud_rate_raw_value(baudrate):
+    # See Connection.set_baud_rate()
+    return int(round(2000000. / baudrate)) - 1
+
+
+def _check_baudrate(baudrate, max_error):
+    """Return the relative error between `baudrate` and the actual baud rate
+    of Dynamixel units or raise `TuningError` if it is not reachable by both
+    the host and Dynamixel units.
+    """
+
+    raw_baudrate = _baud_rate_raw_value(baudrate)
+    baud_rates = tm.servo_baud_rates(max_error=max_error)
+
+    servo_baudrate = tm.SERVO_BASE_BAUDRATE / (raw_baudrate + 1.)
+    error = (baudrate - servo_baudrate) / servo_baudrate
+
+    reachable = any(rate.register_value == raw_baudrate
+                    for rate in baud_rates)
+
+    if not reachable or abs(error) > max_error:
+        nearest = min(baud_rates,
+                      key=lambda rate: abs(rate.servo_baudrate - baudrate))
+        msg = ("Unreachable baud rate: {} bps (Dynamixel units would run at "
+               "{:.0f} bps, {:+.1%} error); the nearest usable baud rate is "
+               "{:.0f} bps.")
+        raise TuningError(msg.format(baudrate, servo_baudrate, error,
+                                     nearest.servo_baudrate))
+
+    return error
+
+
+def measure_latency(connection, dynamixel_ids, num_pings=10):
+    """Return the mean ping round-trip time (in seconds) of the specified
+    Dynamixel units.
+
+    Pings which don't get any reply are ignored; ``None`` is returned if no
+    reply was received at all.
+
+    :param connection: the `Connection` to measure.
+    :param dynamixel_ids: a sequence of unique ID of the Dynamixel units to be
+        pinged.
+    :param int num_pings: the number of pings sent to each Dynamixel unit.
+    """
+
+    round_trip_times = []
+
+    for dynamixel_id in dynamixel_ids:
+        for _ in range(num_pings):
+            start_time = time.perf_counter()
+            is_available = connection.ping(dynamixel_id)
+            if is_available:
+                round_trip_times.append(time.perf_counter() - start_time)
+
+    if len(round_trip_times) == 0:
+        return None
+
+    return sum(round_trip_times) / len(round_trip_times)
+
+
+def tune_bus(connection, baudrate=1000000, return_delay_time=0,
+             dynamixel_ids=None, num_pings=10,
+             settle_time=DEFAULT_SETTLE_TIME,
+             max_baudrate_error=MAX_BAUDRATE_ERROR):
+    """Set every Dynamixel unit of the bus to `baudrate` and
+    `return_delay_time` then reopen the connection at the new baud rate.
+
+    New values are written with SYNC_WRITE instruction packets (one for the
+    return delay time, one for the baud rate). Each Dynamixel unit is then
+    pinged at the new baud rate; if any of them doesn't reply, the former
+    baud rates and return delay times are restored, each Dynamixel unit is
+    pinged at the former baud rate and `TuningError` is raised (with the
+    units which don't reply as `unreachable_ids`).
+
+    `TuningError` is also raised before anything is written if `baudrate`
+    is not reachable by Dynamixel units within `max_baudrate_error` (see
+    `pyax12.timing.servo_baud_rates`).
+
+    :param connection: the `Connection` to tune.
+    :param int baudrate: the new baud rate (in bps) of the bus.
+    :param int return_delay_time: the new return delay time (in µs) of all
+        Dynamixel units.
+    :param dynamixel_ids: a sequence of unique ID of the Dynamixel units to
+        tune. If ``None``, the bus is scanned.
+    :param int num_pings: the number of pings sent to each Dynamixel unit to
+        measure the round-trip latency before and after the tuning.
+    :param float settle_time: the time (in seconds) given to Dynamixel units
+        to apply their new baud rate.
+    :param float max_baudrate_error: the maximum relative error between the
+        baud rate of the host and the actual baud rate of Dynamixel units.
+    :return: a `TuningReport`.
+    """
+
+    raw_return_delay_time = int(round(return_delay_time / 2.))
+    if not 0 <= raw_return_delay_time <= 254:
+        msg = "Wrong return delay time: {}µs (should be in range 0-508µs)."
+        raise ValueError(msg.format(return_delay_time))
+
+    baudrate_error = _check_baudrate(baudrate, max_baudrate_error)
+    raw_baudrate = _baud_rate_raw_value(baudrate)
+
+    if dynamixel_ids is None:
+        dynamixel_ids = connection.scan()
+
+    dynamixel_ids = list(dynamixel_ids)
+    former_baudrate = connection.baudrate
+
+    if len(dynamixel_ids) == 0:
+        raise TuningError("No Dynamixel unit to tune.")
+
+    # Backup the current configuration
+    former_config = {}
+    for dynamixel_id in dynamixel_ids:
+        byte_seq = connection.read_data(dynamixel_id, pk.BAUD_RATE, 2)
+        if byte_seq is None:
+            msg = "Dynamixel unit {} doesn't reply."
+            raise TuningError(msg.format(dynamixel_id))
+        former_config[dynamixel_id] = byte_seq   # (baud rate, RDT) raw values
+
+    former_latency = measure_latency(connection, dynamixel_ids, num_pings)
+
+    # Apply the new configuration
+    connection.sync_write(pk.RETURN_DELAY_TIME,
+                          {dxl_id: raw_return_delay_time
+                           for dxl_id in dynamixel_ids})
+    connection.sync_write(pk.BAUD_RATE,
+                          {dxl_id: raw_baudrate for dxl_id in dynamixel_ids})
+
+    time.sleep(settle_time)
+    connection.change_baudrate(baudrate)
+
+    # Check every unit replies at the new baud rate
+    failed_ids = [dxl_id for dxl_id in dynamixel_ids
+                  if not connection.ping(dxl_id)]
+
+    if len(failed_ids) > 0:
+        # Rollback: units which didn't switch won't hear this packet
+        connection.sync_write(pk.BAUD_RATE,
+                              {dxl_id: former_config[dxl_id][0]
+                               for dxl_id in dynamixel_ids})
+
+        time.sleep(settle_time)
+        connection.change_baudrate(former_baudrate)
+
+        connection.sync_write(pk.RETURN_DELAY_TIME,
+                              {dxl_id: former_config[dxl_id][1]
+                               for dxl_id in dynamixel_ids})
+
+        # Check the rollback
+        unreachable_ids = [dxl_id for dxl_id in dynamixel_ids
+                           if not connection.ping(dxl_id)]
+
+        msg = ("Dynamixel units {} don't reply at {} bps "
+               "(rolled back to {} bps).")
+        msg = msg.format(failed_ids, baudrate, former_baudrate)
+        if len(unreachable_ids) > 0:
+            msg += " Dynamixel units {} don't reply at {} bps either."
+            msg = msg.format(unreachable_ids, former_baudrate)
+        raise TuningError(msg, unreachable_ids)
+
+    latency = measure_latency(connection, dynamixel_ids, num_pings)
+
+    return TuningReport(dynamixel_ids, former_baudrate, baudrate,
+                        former_latency, latency, baudrate_error)
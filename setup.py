@@ -76,7 +76,10 @@ SCRIPTS = ["examples/pyax12demo"]
 # Entry point can be used to create plugins or to automatically generate
 # system commands to call specific functions.
 # Syntax: "name_of_the_command_to_make = package.module:function".
-ENTRY_POINTS = {}
+ENTRY_POINTS = {
+    'console_scripts': ['pyax12 = pyax12.cli:main',
+                        'pyax12d = pyax12.daemon:main'],
+}
 #ENTRY_POINTS = {
 #  'console_scripts': [
 #      'pyax12gui = pyax12.gui:run',
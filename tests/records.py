@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+This module contains helpers shared by the unit tests which replay serial
+traffic with `pyax12.capture.ReplaySerial`.
+"""
+
+__all__ = ['tx',
+           'rx',
+           'status2']
+
+from pyax12.capture import CaptureRecord, TX, RX
+from pyax12.packet import Packet
+import pyax12.instruction_packet as ip
+import pyax12.protocol2 as p2
+
+import struct
+
+def tx(dynamixel_id, instruction, params=None):
+    """Return the capture record of an instruction packet."""
+    packet = ip.InstructionPacket(dynamixel_id, instruction, params)
+    return CaptureRecord(0., TX, packet.to_bytes())
+
+def rx(dynamixel_id, params=b'', error=0):
+    """Return the capture record of a status packet."""
+    packet = Packet(dynamixel_id, bytes((error, )) + bytes(params))
+    return CaptureRecord(0., RX, packet.to_bytes())
+
+def status2(dynamixel_id, params=b'', error=0):
+    """Return a Protocol 2.0 status packet."""
+    body = p2.stuff(bytes((p2.STATUS, error)) + bytes(params))
+    packet = (p2.PACKET_HEADER + bytes((dynamixel_id, ))
+              + struct.pack('<H', len(body) + 2) + body)
+    return packet + struct.pack('<H', p2.compute_crc(packet))
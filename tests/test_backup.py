@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+"""
+This module contains unit tests for the "backup" module.
+"""
+
+from pyax12.backup import (RestoredServo, BackupError, backup_fleet,
+                           restore_fleet, save_backup, load_backup,
+                           changed_ranges)
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+import pyax12.state as st
+
+import os
+import tempfile
+import unittest
+
+from records import tx, rx
+
+def control_table(dynamixel_id):
+    """Return a factory-like control table."""
+    table = bytearray(st.CONTROL_TABLE_LENGTH)
+    table[pk.MODEL_NUMBER] = 0x0c
+    table[pk.ID] = dynamixel_id
+    table[pk.BAUD_RATE] = 0x01
+    table[pk.RETURN_DELAY_TIME] = 0xfa
+    table[pk.CCW_ANGLE_LIMIT:pk.CCW_ANGLE_LIMIT + 2] = b'\xff\x03'
+    table[pk.HIGHEST_LIMIT_TEMPERATURE] = 70
+    table[pk.LOWEST_LIMIT_VOLTAGE] = 60
+    table[pk.HIGHEST_LIMIT_VOLTAGE] = 140
+    table[pk.MAX_TORQUE:pk.MAX_TORQUE + 2] = b'\xff\x03'
+    table[pk.STATUS_RETURN_LEVEL] = 2
+    table[pk.ALARM_LED] = 0x24
+    table[pk.ALARM_SHUTDOWN] = 0x24
+    return table
+
+RESTORE_READ = (pk.RETURN_DELAY_TIME, 14)
+
+def eeprom(table):
+    """Return the restored area of a control table."""
+    return bytes(table[pk.RETURN_DELAY_TIME:pk.ALARM_SHUTDOWN + 1])
+
+class TestBackup(unittest.TestCase):
+    """
+    Contains unit tests for the "backup" module.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'robot.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def test_changed_ranges(self):
+        """Check the computation of the byte ranges to be written."""
+
+        backup = eeprom(control_table(1))
+
+        self.assertEqual(changed_ranges(backup, backup), [])
+
+        # The low byte of a two-byte register: both bytes are written
+        current = bytearray(backup)
+        current[pk.CCW_ANGLE_LIMIT - pk.RETURN_DELAY_TIME] = 0
+        self.assertEqual(changed_ranges(current, backup),
+                         [(pk.CCW_ANGLE_LIMIT, 2)])
+
+        # Close changes are merged but never cross the reserved address
+        current[0] = 0
+        current[pk.HIGHEST_LIMIT_TEMPERATURE - pk.RETURN_DELAY_TIME] = 0
+        self.assertEqual(changed_ranges(current, backup),
+                         [(pk.RETURN_DELAY_TIME, 5),
+                          (pk.HIGHEST_LIMIT_TEMPERATURE, 1)])
+
+        # Distant changes are not merged
+        current = bytearray(backup)
+        current[pk.HIGHEST_LIMIT_TEMPERATURE - pk.RETURN_DELAY_TIME] = 0
+        current[pk.ALARM_SHUTDOWN - pk.RETURN_DELAY_TIME] = 0
+        self.assertEqual(changed_ranges(current, backup),
+                         [(pk.HIGHEST_LIMIT_TEMPERATURE, 1),
+                          (pk.ALARM_SHUTDOWN, 1)])
+
+        # ID and baud rate are not in the restored area
+        self.assertEqual(len(backup), 14)
+
+
+    def test_backup_fleet(self):
+        """Check that the control tables are saved and can be read back."""
+
+        tables = {1: control_table(1), 2: control_table(2)}
+        replay = ReplaySerial([
+            tx(1, ip.READ_DATA, (0, 50)), rx(1, tables[1]),
+            tx(2, ip.READ_DATA, (0, 50)), rx(2, tables[2]),
+            tx(3, ip.READ_DATA, (0, 50))])              # no reply
+        connection = Connection(transport=replay, baudrate=1000000)
+
+        saved = backup_fleet(connection, self.path, bytes((1, 2, 3)))
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(saved, tables)
+        self.assertEqual(load_backup(self.path), (1000000, tables))
+
+        with open(self.path, 'w') as backup_file:
+            backup_file.write('{"version": 1}')
+
+        with self.assertRaises(BackupError):
+            load_backup(self.path)
+
+
+    def test_restore_fleet(self):
+        """Check that only the changed ranges are written and verified."""
+
+        # Unit 1 is unchanged; units 2 and 3 are new units (return delay time
+        # 250) and their alarm LED and maximum torque settings had been
+        # changed
+        tables = {1: control_table(1), 2: control_table(2),
+                  3: control_table(3)}
+        current = {dynamixel_id: eeprom(table)
+                   for dynamixel_id, table in tables.items()}
+
+        tables[2][pk.RETURN_DELAY_TIME] = 0
+        tables[3][pk.RETURN_DELAY_TIME] = 0
+        tables[2][pk.ALARM_LED] = 0x04
+        tables[3][pk.MAX_TORQUE:pk.MAX_TORQUE + 2] = b'\x00\x02'
+        save_backup(self.path, 1000000, tables)
+
+        restored = {dynamixel_id: eeprom(table)
+                    for dynamixel_id, table in tables.items()}
+
+        replay = ReplaySerial([
+            tx(1, ip.READ_DATA, RESTORE_READ), rx(1, current[1]),
+            tx(2, ip.READ_DATA, RESTORE_READ), rx(2, current[2]),
+            tx(3, ip.READ_DATA, RESTORE_READ), rx(3, current[3]),
+            # Return delay time of units 2 and 3
+            tx(pk.BROADCAST_ID, ip.SYNC_WRITE,
+               (pk.RETURN_DELAY_TIME, 1, 2, 0, 3, 0)),
+            # Alarm LED of unit 2
+            tx(pk.BROADCAST_ID, ip.SYNC_WRITE,
+               (pk.ALARM_LED, 1, 2, 0x04)),
+            # Maximum torque of unit 3
+            tx(pk.BROADCAST_ID, ip.SYNC_WRITE,
+               (pk.MAX_TORQUE, 2, 3, 0x00, 0x02)),
+            # Verification (unit 3 didn't take the new settings)
+            tx(1, ip.READ_DATA, RESTORE_READ), rx(1, restored[1]),
+            tx(2, ip.READ_DATA, RESTORE_READ), rx(2, restored[2]),
+            tx(3, ip.READ_DATA, RESTORE_READ), rx(3, current[3])])
+        connection = Connection(transport=replay, baudrate=1000000)
+
+        results = restore_fleet(connection, self.path)
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(results, [
+            RestoredServo(1, [], True),
+            RestoredServo(2, [(pk.RETURN_DELAY_TIME, 1), (pk.ALARM_LED, 1)],
+                          True),
+            RestoredServo(3, [(pk.RETURN_DELAY_TIME, 1),
+                              (pk.MAX_TORQUE, 2)], False)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "bandwidth" module.
+"""
+
+from pyax12.bandwidth import BandwidthBudget, BandwidthExceededError
+from pyax12.capture import CaptureRecord, ReplaySerial, TX, RX
+from pyax12.connection import Connection
+
+import unittest
+
+class TestBandwidth(unittest.TestCase):
+    """
+    Contains unit tests for the "bandwidth" module.
+    """
+
+    def test_admit(self):
+        """Check that a client cannot exceed its share of the bus time."""
+
+        budget = BandwidthBudget({'motion': 0.7, 'telemetry': 0.1},
+                                 window=1., block=False)
+
+        budget.admit(0.05, 'telemetry')
+        budget.admit(0.04, 'telemetry')
+
+        with self.assertRaises(BandwidthExceededError):
+            budget.admit(0.02, 'telemetry')
+
+        # Other clients are not affected
+        budget.admit(0.5, 'motion')
+        budget.admit(0.5, 'unlimited')
+
+        self.assertAlmostEqual(budget.utilization('telemetry'), 0.09)
+        self.assertAlmostEqual(budget.utilization(), 1.09)
+
+
+    def test_client_context(self):
+        """Check that transactions are charged to the client selected in the
+        current thread."""
+
+        budget = BandwidthBudget({'telemetry': 0.25})
+        ping = b'\xff\xff\x01\x02\x01\xfb'
+        reply = b'\xff\xff\x01\x02\x00\xfc'
+        replay = ReplaySerial([CaptureRecord(0., TX, ping),
+                               CaptureRecord(0., RX, reply)])
+        serial_connection = Connection(transport=replay,
+                                       bandwidth_budget=budget)
+
+        with budget.client('telemetry'):
+            self.assertEqual(budget.current_client, 'telemetry')
+            serial_connection.ping(1)
+
+        self.assertEqual(budget.current_client, 'default')
+        self.assertGreater(budget.utilization('telemetry'), 0.)
+        self.assertEqual(budget.utilization('default'), 0.)
+
+
+if __name__ == '__main__':
+    unittest.main()
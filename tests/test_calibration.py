@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "calibration" module.
+"""
+
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+import pyax12.calibration as cb
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+
+import os
+import tempfile
+import unittest
+
+from records import tx, rx
+
+def profile(maximum):
+    """Return a latency profile with the given maximum latency."""
+    return cb.LatencyProfile(1, 1000000, 6, 10, 0, maximum / 2.,
+                             maximum / 2., maximum, maximum)
+
+class TestCalibration(unittest.TestCase):
+    """
+    Contains unit tests for the "calibration" module.
+    """
+
+    def test_reply_latency(self):
+        """Check the reply latency derived from latency profiles."""
+
+        profiles = [profile(0.0010), profile(0.0012)]
+
+        self.assertAlmostEqual(cb.reply_latency(profiles, 0.0004,
+                                                safety_factor=1.5,
+                                                margin=0.0005),
+                               1.5 * 0.0012 - 0.0004 + 0.0005)
+        self.assertAlmostEqual(cb.reply_latency(profiles, 0.01, margin=0.),
+                               0.)
+        lost_profile = cb.LatencyProfile(1, 1000000, 6, 0, 10,
+                                         None, None, None, None)
+        self.assertIsNone(cb.reply_latency([lost_profile], 0.))
+
+
+    def test_profile_servo(self):
+        """Check the latency profiles of a Dynamixel unit."""
+
+        position = (pk.PRESENT_POSITION, 2)
+        replay = ReplaySerial([tx(1, ip.PING), rx(1),
+                               tx(1, ip.PING),                  # lost
+                               tx(1, ip.READ_DATA, position),
+                               rx(1, (0x00, 0x02)),
+                               tx(1, ip.READ_DATA, position),
+                               rx(1, (0x00, 0x02))],
+                              baudrate=1000000)
+        connection = Connection(transport=replay, baudrate=1000000)
+        connection.timing.set_return_delay_time(1, 0.0005)
+
+        profiles = cb.profile_servo(connection, 1, num_samples=2,
+                                    read_lengths=(2, ))
+        self.assertTrue(replay.is_exhausted)
+
+        self.assertEqual([(p.status_length, p.num_samples, p.num_lost)
+                          for p in profiles],
+                         [(6, 1, 1), (8, 2, 0)])
+        self.assertLessEqual(profiles[1].minimum, profiles[1].maximum)
+
+        # The timing model is restored
+        self.assertEqual(connection.timing.return_delay_time(1), 0.0005)
+        self.assertEqual(connection.timing.reply_latencies, {})
+
+
+    def test_calibrate_return_delay_time(self):
+        """Check that the return delay time is lowered until a status packet
+        is lost."""
+
+        delay = pk.RETURN_DELAY_TIME
+        replay = ReplaySerial([tx(1, ip.READ_DATA, (delay, 1)), rx(1, (250, )),
+                               tx(1, ip.WRITE_DATA, (delay, 100)), rx(1),
+                               tx(1, ip.PING), rx(1),
+                               tx(1, ip.PING), rx(1),
+                               tx(1, ip.WRITE_DATA, (delay, 50)), rx(1),
+                               tx(1, ip.PING), rx(1),
+                               tx(1, ip.PING),                  # lost
+                               tx(1, ip.WRITE_DATA, (delay, 100)), rx(1)])
+        connection = Connection(transport=replay, status_return_level=2)
+        connection.timing.latency = 0.005
+
+        self.assertEqual(cb.calibrate_return_delay_time(connection, 1,
+                                                        num_samples=2),
+                         200)
+        self.assertTrue(replay.is_exhausted)
+        self.assertAlmostEqual(connection.timing.return_delay_time(1),
+                               0.0002)
+
+
+    def test_calibration_file(self):
+        """Check that a calibration file is loaded by `Connection`."""
+
+        calibrations = [cb.ServoCalibration(1, 1000000, 20, 0.0015,
+                                            [profile(0.001)]),
+                        cb.ServoCalibration(2, 57600, 500, 0.003,
+                                            [profile(0.002)])]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'calibration.json')
+
+            connection = Connection(transport=ReplaySerial([]),
+                                    baudrate=1000000, calibration=path)
+            self.assertEqual(connection.timing.reply_latencies, {})
+
+            cb.save_calibration(path, calibrations)
+            self.assertEqual(cb.load_calibration(path), calibrations)
+
+            connection = Connection(transport=ReplaySerial([]),
+                                    baudrate=1000000, calibration=path)
+
+            # The calibration of unit 2 was made at another baud rate
+            self.assertEqual(connection.timing.reply_latencies, {1: 0.0015})
+            self.assertAlmostEqual(connection.timing.return_delay_time(1),
+                                   0.00002)
+
+            with open(path, 'w') as calibration_file:
+                calibration_file.write('{"version": 1}')
+
+            with self.assertRaises(cb.CalibrationError):
+                cb.load_calibration(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "capture" module.
+"""
+
+from pyax12.capture import CaptureRecord, CaptureSerial, ReplaySerial
+from pyax12.capture import CaptureError, ReplayError, read_capture
+from pyax12.capture import TX, RX
+from pyax12.connection import Connection
+
+import io
+import unittest
+
+# Example: ping the Dynamixel unit #1 (see the Dynamixel user guide p.20)
+PING_1 = b'\xff\xff\x01\x02\x01\xfb'
+PING_1_REPLY = b'\xff\xff\x01\x02\x00\xfc'
+
+class TestCapture(unittest.TestCase):
+    """
+    Contains unit tests for the "capture" module.
+    """
+
+    def test_capture_round_trip(self):
+        """Check that the traffic recorded by CaptureSerial can be read back
+        with read_capture()."""
+
+        replay = ReplaySerial([CaptureRecord(0., TX, PING_1),
+                               CaptureRecord(0.001, RX, PING_1_REPLY)])
+
+        fd = io.BytesIO()
+        serial_connection = CaptureSerial(replay, fd, baudrate=57600)
+
+        serial_connection.write(PING_1)
+        serial_connection.read(serial_connection.inWaiting())
+
+        fd.seek(0)
+        baudrate, records = read_capture(fd)
+
+        self.assertEqual(baudrate, 57600)
+        self.assertEqual([(r.direction, r.data) for r in records],
+                         [(TX, PING_1), (RX, PING_1_REPLY)])
+        self.assertLessEqual(records[0].timestamp, records[1].timestamp)
+
+
+    def test_read_capture_wrong_magic(self):
+        """Check that read_capture() fails on files which are not capture
+        files."""
+
+        with self.assertRaises(CaptureError):
+            read_capture(io.BytesIO(b'\x00' * 32))
+
+
+    def test_replay_connection(self):
+        """Check that a recorded session can be replayed through a
+        Connection."""
+
+        replay = ReplaySerial([CaptureRecord(0., TX, PING_1),
+                               CaptureRecord(0.001, RX, PING_1_REPLY)])
+        serial_connection = Connection(transport=replay)
+
+        self.assertTrue(serial_connection.ping(1))
+        self.assertTrue(replay.is_exhausted)
+
+        serial_connection.close()
+
+
+    def test_replay_mismatch(self):
+        """Check that ReplaySerial fails when the replayed traffic diverges
+        from the recorded one."""
+
+        replay = ReplaySerial([CaptureRecord(0., TX, PING_1),
+                               CaptureRecord(0.001, RX, PING_1_REPLY)])
+
+        with self.assertRaises(ReplayError):
+            replay.write(b'\xff\xff\x02\x02\x01\xfa')
+
+
+if __name__ == '__main__':
+    unittest.main()
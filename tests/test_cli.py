@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "cli" module.
+"""
+
+from pyax12.cli import make_argument_parser, IMPORT_TIME_BUDGET
+
+import pyax12.packet as pk
+
+import subprocess
+import sys
+import unittest
+
+# Measure the import time in a fresh interpreter
+IMPORT_TIME_SCRIPT = """
+import sys, time
+start_time = time.perf_counter()
+import pyax12.cli
+print(time.perf_counter() - start_time)
+print('serial' in sys.modules or 'RPi' in sys.modules)
+"""
+
+class TestCli(unittest.TestCase):
+    """
+    Contains unit tests for the "cli" module.
+    """
+
+    def test_import_time(self):
+        """Check that the command line tool is imported quickly and doesn't
+        import pyserial nor RPi.GPIO."""
+
+        import_times = []
+        for trial in range(3):
+            output = subprocess.check_output([sys.executable, '-c',
+                                              IMPORT_TIME_SCRIPT],
+                                             universal_newlines=True)
+            import_time, heavy_modules_imported = output.split()
+            import_times.append(float(import_time))
+            self.assertEqual(heavy_modules_imported, 'False')
+
+        self.assertLess(min(import_times), IMPORT_TIME_BUDGET)
+
+
+    def test_subcommands(self):
+        """Check the arguments of some subcommands."""
+
+        parser = make_argument_parser()
+
+        args = parser.parse_args(['ping', '-i', '3', '-b', '1000000'])
+        self.assertEqual(args.command, 'ping')
+        self.assertEqual(args.dynamixel_id, 3)
+        self.assertEqual(args.baudrate, 1000000)
+
+        args = parser.parse_args(['scan'])
+        self.assertFalse(hasattr(args, 'dynamixel_id'))
+
+        args = parser.parse_args(['move', '--', '-45'])
+        self.assertEqual(args.dynamixel_id, pk.BROADCAST_ID)
+        self.assertEqual(args.position, -45.)
+        self.assertEqual(args.speed, 512)
+
+        with self.assertRaises(SystemExit):
+            parser.parse_args(['led', '-i', '1', 'blink'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,11 +29,19 @@
 This module contain unit tests for the "pyax12.connection.Connection" class.
 """
 
-from pyax12.connection import Connection
+from pyax12.capture import CaptureRecord, ReplaySerial, TX, RX
+from pyax12.connection import (Connection, MissingStatusPacketError,
+                               MIN_TRAVEL_TIMEOUT, MAX_DEFERRED_ERRORS)
+from pyax12.status_packet import RangeError
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
 import serial
 
+import time
 import unittest
 
+from records import tx, rx
+
 class TestConnection(unittest.TestCase):
     """
     Contains unit tests for the "pyax12.connection.Connection" class.
@@ -142,6 +150,313 @@ class TestConnection(unittest.TestCase):
 #            serial_connection.close()
 
 
+    ###
+
+    def test_status_return_level_query(self):
+        """Check that the status return level of a Dynamixel unit is read
+        once and that writes don't wait for a reply when it is 1."""
+
+        led_on = (pk.LED, 1)
+        replay = ReplaySerial([tx(1, ip.READ_DATA, (pk.STATUS_RETURN_LEVEL, 1)),
+                               rx(1, (1, )),
+                               tx(1, ip.WRITE_DATA, led_on),
+                               tx(1, ip.WRITE_DATA, led_on)])
+        serial_connection = Connection(transport=replay)
+
+        start_time = time.monotonic()
+        serial_connection.write_data(1, pk.LED, 1)
+        serial_connection.write_data(1, pk.LED, 1)
+        elapsed_time = time.monotonic() - start_time
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(serial_connection.status_return_levels[1], 1)
+        self.assertLess(elapsed_time, serial_connection.timing.latency)
+
+    ###
+
+    def test_status_return_level_declared(self):
+        """Check that a declared status return level is never read."""
+
+        replay = ReplaySerial([tx(1, ip.WRITE_DATA, (pk.LED, 1)),
+                               rx(1)])
+        serial_connection = Connection(transport=replay, status_return_level=2)
+
+        serial_connection.write_data(1, pk.LED, 1)
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(replay.inWaiting(), 0)   # the reply has been read
+
+
+    ###
+
+    def test_waiting_time_without_reply(self):
+        """Check that a fixed waiting time is only waited for when a status
+        packet is expected."""
+
+        replay = ReplaySerial([tx(1, ip.WRITE_DATA, (pk.LED, 1)),
+                               tx(pk.BROADCAST_ID, ip.SYNC_WRITE,
+                                  (pk.LED, 1, 1, 0)),
+                               tx(1, ip.READ_DATA, (pk.LED, 1)),
+                               rx(1, (0, ))])
+        serial_connection = Connection(transport=replay, waiting_time=0.2,
+                                       status_return_level=1)
+
+        start_time = time.monotonic()
+        serial_connection.write_data(1, pk.LED, 1)
+        serial_connection.sync_write(pk.LED, {1: 0})
+        elapsed_time = time.monotonic() - start_time
+
+        self.assertLess(elapsed_time, 0.2)
+
+        self.assertEqual(serial_connection.read_data(1, pk.LED, 1), b'\x00')
+        self.assertTrue(replay.is_exhausted)
+
+
+    ###
+
+    def test_post_collect_errors(self):
+        """Check that errors of posted instruction packets are matched to
+        their packets and reported by collect_errors()."""
+
+        goal = (pk.GOAL_POSITION, 0, 2)
+        replay = ReplaySerial([tx(1, ip.WRITE_DATA, goal), rx(1),
+                               tx(2, ip.WRITE_DATA, goal), rx(2, error=0x08),
+                               tx(3, ip.WRITE_DATA, goal)])  # no reply
+        reported_errors = []
+        serial_connection = Connection(transport=replay, status_return_level=2,
+                                       error_callback=reported_errors.append)
+
+        for dynamixel_id in (1, 2, 3):
+            serial_connection.goto(dynamixel_id, 512, blocking=False)
+
+        errors = serial_connection.collect_errors()
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual([error.dynamixel_id for error in errors], [2, 3])
+        self.assertIsInstance(errors[0].error, RangeError)
+        self.assertIsInstance(errors[1].error, MissingStatusPacketError)
+        self.assertEqual(reported_errors, errors)
+        self.assertEqual(serial_connection.collect_errors(), [])
+
+        # Errors which are never collected don't pile up
+        self.assertEqual(serial_connection.deferred_errors.maxlen,
+                         MAX_DEFERRED_ERRORS)
+
+
+    ###
+
+    def test_goto_wait(self):
+        """Check that goto(..., wait=True) polls the MOVING register once the
+        estimated travel time is over."""
+
+        goal = (pk.GOAL_POSITION, 0x00, 0x02, 0xff, 0x03)
+        replay = ReplaySerial([tx(1, ip.WRITE_DATA, goal), rx(1),
+                               tx(1, ip.READ_DATA, (pk.GOAL_POSITION, 8)),
+                               rx(1, (0x00, 0x02, 0xff, 0x03,
+                                      0xff, 0x03, 0xfa, 0x01)),
+                               tx(1, ip.READ_DATA, (pk.MOVING, 1)), rx(1, (1, )),
+                               tx(1, ip.READ_DATA, (pk.MOVING, 1)), rx(1, (0, ))])
+        serial_connection = Connection(transport=replay, status_return_level=2)
+
+        self.assertTrue(serial_connection.goto(1, 512, speed=1023, wait=True))
+        self.assertTrue(replay.is_exhausted)
+
+
+    def test_wait_until_stopped_mute_unit(self):
+        """Check that wait_until_stopped() gives up when a unit doesn't reply
+        anymore."""
+
+        moving = tx(1, ip.READ_DATA, (pk.MOVING, 1))
+        replay = ReplaySerial([tx(1, ip.READ_DATA, (pk.GOAL_POSITION, 8)),
+                               moving, rx(1, (1, )),
+                               moving, moving, moving])      # no reply
+        serial_connection = Connection(transport=replay, status_return_level=2)
+
+        start_time = time.monotonic()
+        self.assertFalse(serial_connection.wait_until_stopped(1))
+        elapsed_time = time.monotonic() - start_time
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertLess(elapsed_time, MIN_TRAVEL_TIMEOUT)
+        self.assertFalse(serial_connection.deferred_errors)
+
+
+    def test_wait_until_stopped_broadcast(self):
+        """Check that waiting for units addressed with the broadcast ID is
+        refused (nothing is sent)."""
+
+        replay = ReplaySerial([])
+        serial_connection = Connection(transport=replay, status_return_level=2)
+
+        with self.assertRaises(ValueError):
+            serial_connection.wait_until_stopped(pk.BROADCAST_ID)
+
+        with self.assertRaises(ValueError):
+            serial_connection.goto(pk.BROADCAST_ID, 0, wait=True)
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertFalse(serial_connection.deferred_errors)
+
+
+    def test_bulk_read(self):
+        """Check that MX units are read with a single BULK_READ instruction
+        packet and other units with READ_DATA."""
+
+        model_number = (pk.MODEL_NUMBER, 2)
+        bulk_read = (0x00, 2, 1, pk.PRESENT_POSITION, 2, 2, pk.PRESENT_POSITION)
+        position = (pk.PRESENT_POSITION, 2)
+        chained_replies = rx(1, (0x00, 0x02)).data + rx(2, (0xff, 0x03)).data
+        replay = ReplaySerial([tx(1, ip.READ_DATA, model_number),
+                               rx(1, (29, 0)),                  # MX-28
+                               tx(3, ip.READ_DATA, model_number),
+                               rx(3, (12, 0)),                  # AX-12
+                               tx(2, ip.READ_DATA, model_number),
+                               rx(2, (29, 0)),                  # MX-28
+                               tx(pk.BROADCAST_ID, ip.BULK_READ, bulk_read),
+                               CaptureRecord(0., RX, chained_replies),
+                               tx(3, ip.READ_DATA, position),
+                               rx(3, (0x00, 0x00)),
+                               tx(pk.BROADCAST_ID, ip.BULK_READ, bulk_read),
+                               rx(1, (0x10, 0x02)),             # 2 is missing
+                               tx(3, ip.READ_DATA, position),
+                               rx(3, (0x00, 0x00))])
+        reported_errors = []
+        serial_connection = Connection(transport=replay,
+                                       error_callback=reported_errors.append)
+        serial_connection.timing.latency = 0.005
+
+        requests = [(1, pk.PRESENT_POSITION, 2),
+                    (3, pk.PRESENT_POSITION, 2),
+                    (2, pk.PRESENT_POSITION, 2)]
+
+        self.assertEqual(serial_connection.bulk_read(requests),
+                         [b'\x00\x02', b'\x00\x00', b'\xff\x03'])
+
+        # Model numbers are cached
+        self.assertEqual(serial_connection.bulk_read(requests),
+                         [b'\x10\x02', b'\x00\x00', None])
+        self.assertTrue(replay.is_exhausted)
+
+        # Read errors are reported but not kept as posted packet errors
+        self.assertEqual([error.dynamixel_id for error in reported_errors],
+                         [2])
+        self.assertEqual(serial_connection.collect_errors(), [])
+
+
+    def test_bulk_read_unknown_model(self):
+        """Check that units whose model number can't be read are read with
+        READ_DATA and that their model number is not read again."""
+
+        model_number = (pk.MODEL_NUMBER, 2)
+        position = (pk.PRESENT_POSITION, 2)
+        replay = ReplaySerial([tx(4, ip.READ_DATA, model_number), # no reply
+                               tx(5, ip.READ_DATA, model_number),
+                               rx(5, (29, 0), error=0x04),      # overheating
+                               tx(4, ip.READ_DATA, position),   # no reply
+                               tx(5, ip.READ_DATA, position),
+                               rx(5, (0x00, 0x02)),
+                               tx(4, ip.READ_DATA, position),   # no reply
+                               tx(5, ip.READ_DATA, position),
+                               rx(5, (0x10, 0x02))])
+        serial_connection = Connection(transport=replay)
+        serial_connection.timing.latency = 0.005
+
+        requests = [(4, pk.PRESENT_POSITION, 2),
+                    (5, pk.PRESENT_POSITION, 2)]
+
+        self.assertEqual(serial_connection.bulk_read(requests),
+                         [None, b'\x00\x02'])
+        self.assertEqual(serial_connection.bulk_read(requests),
+                         [None, b'\x10\x02'])
+        self.assertTrue(replay.is_exhausted)
+
+
+    def test_staggered_read(self):
+        """Check that units with staggered return delay times are read with
+        back-to-back READ_DATA instruction packets."""
+
+        position = (pk.PRESENT_POSITION, 2)
+        read_packets = b''.join(tx(dynamixel_id, ip.READ_DATA, position).data
+                                for dynamixel_id in (1, 2, 3))
+        staggered_replies = (rx(1, (0x00, 0x02)).data
+                             + rx(2, (0xff, 0x03)).data
+                             + rx(3, (0x10, 0x00)).data)
+        delay = pk.RETURN_DELAY_TIME
+        replay = ReplaySerial([tx(1, ip.WRITE_DATA, (delay, 80)), rx(1),
+                               tx(2, ip.WRITE_DATA, (delay, 85)), rx(2),
+                               tx(3, ip.WRITE_DATA, (delay, 90)), rx(3),
+                               CaptureRecord(0., TX, read_packets),
+                               CaptureRecord(0., RX, staggered_replies),
+                               CaptureRecord(0., TX, read_packets),
+                               rx(1, (0x00, 0x02)),             # 2 and 3 fail
+                               rx(2, (0xff, 0x03), error=0x08)])
+        reported_errors = []
+        serial_connection = Connection(transport=replay, baudrate=1000000,
+                                       status_return_level=2,
+                                       error_callback=reported_errors.append)
+        serial_connection.timing.latency = 0.005
+
+        serial_connection.configure_staggered_read((1, 2, 3), 2,
+                                                   guard_time=0.00001)
+        self.assertAlmostEqual(serial_connection.timing.return_delay_time(3),
+                               0.00018)
+
+        self.assertEqual(
+            serial_connection.sync_read((1, 2, 3), pk.PRESENT_POSITION, 2),
+            {1: b'\x00\x02', 2: b'\xff\x03', 3: b'\x10\x00'})
+
+        self.assertEqual(
+            serial_connection.sync_read((1, 2, 3), pk.PRESENT_POSITION, 2),
+            {1: b'\x00\x02', 2: None, 3: None})
+        self.assertTrue(replay.is_exhausted)
+
+        self.assertEqual([error.dynamixel_id for error in reported_errors],
+                         [2, 3])
+        self.assertIsInstance(reported_errors[0].error, RangeError)
+        self.assertEqual(serial_connection.collect_errors(), [])
+
+        # At 57600 bps, units cannot be staggered
+        slow_connection = Connection(transport=ReplaySerial([]))
+        with self.assertRaises(ValueError):
+            slow_connection.configure_staggered_read((1, 2), 2)
+
+
+    def test_batch_output(self):
+        """Check that instruction packets which expect no status packet are
+        written together with the next transaction."""
+
+        led_on = (pk.LED, 1)
+        position = (pk.PRESENT_POSITION, 2)
+        batch = (tx(1, ip.WRITE_DATA, led_on).data
+                 + tx(2, ip.WRITE_DATA, led_on).data
+                 + tx(1, ip.READ_DATA, position).data)
+        sync_write = (pk.LED, 1, 1, 0, 2, 0)
+        replay = ReplaySerial([CaptureRecord(0., TX, batch),
+                               rx(1, (0x00, 0x02)),
+                               tx(pk.BROADCAST_ID, ip.SYNC_WRITE, sync_write)])
+        serial_connection = Connection(transport=replay,
+                                       status_return_level=1,
+                                       batch_output=True)
+        serial_connection.timing.latency = 0.005
+
+        serial_connection.write_data(1, pk.LED, 1)
+        serial_connection.write_data(2, pk.LED, 1)
+        self.assertIsNone(serial_connection.packets_per_write)
+
+        self.assertEqual(serial_connection.read_data(1, pk.PRESENT_POSITION,
+                                                     2),
+                         b'\x00\x02')
+
+        serial_connection.sync_write(pk.LED, {1: 0, 2: 0})
+        self.assertFalse(replay.is_exhausted)
+
+        serial_connection.flush_batch()
+        self.assertTrue(replay.is_exhausted)
+
+        self.assertEqual(serial_connection.num_writes, 2)
+        self.assertEqual(serial_connection.packets_per_write, 2.)
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "daemon" module.
+"""
+
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+from pyax12.daemon import (BusDaemon, DaemonClient, DaemonError, encode,
+                           decode, FRAME_HEADER)
+
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+import pyax12.status_packet as sp
+
+import os
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+
+from records import tx, rx
+
+def frame(obj):
+    """Return a framed message."""
+    data = encode(obj)
+    return FRAME_HEADER.pack(len(data)) + data
+
+class TestDaemon(unittest.TestCase):
+    """
+    Contains unit tests for the "daemon" module.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'pyax12d.sock')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def test_encoding(self):
+        """Check that supported objects are decoded back."""
+
+        obj = [None, True, False, -3, 2**40, 0.5, b'\x00\xff', 'abc°',
+               [1, [2]], {1: 'a', 'b': [b'']}]
+        self.assertEqual(decode(encode(obj)), obj)
+        self.assertEqual(decode(encode((1, bytearray(b'a')))), [1, b'a'])
+
+        with self.assertRaises(TypeError):
+            encode(object())
+
+        with self.assertRaises(ValueError):
+            decode(b'NN')
+
+
+    def test_client(self):
+        """Check that clients can call Connection methods."""
+
+        temperature = (pk.PRESENT_TEMPERATURE, 1)
+        replay = ReplaySerial([tx(1, ip.PING), rx(1),
+                               tx(1, ip.READ_DATA, temperature),
+                               rx(1, (40, )),
+                               tx(1, ip.WRITE_DATA, (pk.LED, 1)),
+                               rx(1, error=0x08)])
+        connection = Connection(transport=replay, status_return_level=2)
+        daemon = BusDaemon(connection, self.path)
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+
+        try:
+            client = DaemonClient(self.path)
+            self.assertTrue(client.ping(1))
+            self.assertEqual(client.get_present_temperature(1), 40)
+
+            with self.assertRaises(sp.RangeError):
+                client.write_data(1, pk.LED, 1)
+
+            with self.assertRaises(DaemonError):
+                client.call('close')
+
+            with self.assertRaises(AttributeError):
+                client.send
+
+            client.close()
+        finally:
+            daemon.stop()
+            thread.join()
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertFalse(os.path.exists(self.path))
+
+
+    def test_batching(self):
+        """Check that identical read requests of a cycle are executed once,
+        unless a write request is made in between."""
+
+        replay = ReplaySerial([tx(1, ip.PING), rx(1),
+                               tx(1, ip.WRITE_DATA, (pk.LED, 1)),
+                               tx(1, ip.PING), rx(1)])
+        connection = Connection(transport=replay, status_return_level=1)
+        daemon = BusDaemon(connection, self.path)
+        server_side, client_side = socket.socketpair()
+
+        ping = encode([0, 'ping', [1], {}])
+        requests = [(server_side, ping),
+                    (server_side, ping),
+                    (server_side, encode([1, 'write_data', [1, pk.LED, 1],
+                                          {}])),
+                    (server_side, ping)]
+        daemon.run_cycle(requests)
+
+        self.assertEqual(daemon.num_requests, 4)
+        self.assertEqual(daemon.num_executed_requests, 3)
+        self.assertTrue(replay.is_exhausted)
+
+        expected_replies = (frame([0, True, True]) * 2
+                            + frame([1, True, None])
+                            + frame([0, True, True]))
+        self.assertEqual(client_side.recv(len(expected_replies)),
+                         expected_replies)
+
+        server_side.close()
+        client_side.close()
+        daemon.close()
+
+    def test_socket_mode(self):
+        """Check that only the owner can connect to the socket."""
+
+        daemon = BusDaemon(Connection(transport=ReplaySerial([])), self.path)
+        mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        daemon.close()
+
+        self.assertEqual(mode, 0o600)
+
+
+    def test_existing_socket(self):
+        """Check that a stale socket file is replaced but that the socket of
+        a running daemon (or another file) is not."""
+
+        stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale_socket.bind(self.path)
+        stale_socket.close()                    # nobody listens anymore
+
+        daemon = BusDaemon(Connection(transport=ReplaySerial([])), self.path)
+
+        try:
+            with self.assertRaises(DaemonError):
+                BusDaemon(Connection(transport=ReplaySerial([])), self.path)
+            self.assertTrue(stat.S_ISSOCK(os.stat(self.path).st_mode))
+        finally:
+            daemon.close()
+
+        with open(self.path, 'w') as file:
+            file.write('data')
+
+        with self.assertRaises(FileExistsError):
+            BusDaemon(Connection(transport=ReplaySerial([])), self.path)
+        self.assertTrue(os.path.isfile(self.path))
+
+
+    def test_client_timeout(self):
+        """Check that the late reply of a request which timed out is not
+        returned by the next request."""
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen()
+
+        client = DaemonClient(self.path, timeout=0.05)
+        server_side, address = server.accept()
+
+        with self.assertRaises(socket.timeout):
+            client.ping(1)
+
+        server_side.sendall(frame([1, True, False]))    # late reply
+        server_side.sendall(frame([2, True, True]))
+        self.assertTrue(client.ping(1))
+
+        client.close()
+        server_side.close()
+        server.close()
+
+
+    def test_slow_client(self):
+        """Check that replies are buffered for clients which don't read them
+        as fast as they are produced."""
+
+        connection = Connection(transport=ReplaySerial([]))
+        daemon = BusDaemon(connection, self.path)
+        server_side, client_side = socket.socketpair()
+        server_side.setblocking(False)
+        server_side.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+        request = encode([0, 'declare_status_return_level', [1, 2], {}])
+        daemon.run_cycle([(server_side, request)] * 2000)
+
+        expected_replies = frame([0, True, None]) * 2000
+        replies = bytearray()
+        while len(replies) < len(expected_replies):
+            daemon._flush(server_side)
+            replies += client_side.recv(len(expected_replies))
+
+        self.assertEqual(replies, expected_replies)
+
+        server_side.close()
+        client_side.close()
+        daemon.close()
+
+
+    def test_long_requests(self):
+        """Check that requests which could hold the bus for long are
+        bounded."""
+
+        connection = Connection(transport=ReplaySerial([]))
+        daemon = BusDaemon(connection, self.path, max_wait_time=0.1,
+                           max_scan_ids=4)
+
+        args, kwargs = daemon._bound_request('wait_until_stopped', [1], {})
+        self.assertEqual(args, (1, 0.1))
+
+        # goto(dynamixel_id, position, speed, degrees, blocking, wait,
+        # timeout)
+        args, kwargs = daemon._bound_request('goto', [1, 512],
+                                             {'wait': True, 'timeout': 5.})
+        self.assertEqual(args[-1], 0.1)
+
+        args, kwargs = daemon._bound_request('goto', [1, 512], {})
+        self.assertIsNone(args[-1])
+
+        with self.assertRaises(DaemonError):
+            daemon._bound_request('scan', [], {})
+
+        daemon.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
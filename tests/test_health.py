@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "health" module.
+"""
+
+from pyax12.bandwidth import BandwidthBudget
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+from pyax12.health import HealthMonitor
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+import serial
+
+import time
+import unittest
+
+from records import tx, rx
+
+class DisconnectedSerial(ReplaySerial):
+    """A replayed serial port which has been unplugged."""
+
+    def write(self, data):
+        raise serial.SerialException("Device disconnected.")
+
+class TestHealth(unittest.TestCase):
+    """
+    Contains unit tests for the "health" module.
+    """
+
+    def test_sample(self):
+        """Check that samples update statistics and raise events close to the
+        limits (once)."""
+
+        read_limits = tx(1, ip.READ_DATA, (pk.HIGHEST_LIMIT_TEMPERATURE, 3))
+        read_sample = tx(1, ip.READ_DATA, (pk.PRESENT_LOAD, 4))
+
+        # Limits: 70°C, 6.0V and 14.0V
+        replay = ReplaySerial([read_limits, rx(1, (70, 60, 140)),
+                               read_sample, rx(1, (0x00, 0x05, 120, 68)),
+                               read_sample, rx(1, (0x00, 0x05, 120, 69))])
+        serial_connection = Connection(transport=replay)
+
+        events = []
+        monitor = HealthMonitor(serial_connection, (1, ),
+                                callback=events.append)
+
+        self.assertTrue(monitor.sample(1))
+        self.assertTrue(monitor.sample(1))
+        self.assertTrue(replay.is_exhausted)
+
+        self.assertEqual([(event.kind, event.value) for event in events],
+                         [('temperature', 68)])
+
+        statistics = monitor.statistics(1)
+        self.assertEqual(statistics['temperature'].mean, 68.5)
+        self.assertEqual(statistics['voltage'].last, 12.)
+        self.assertEqual(statistics['load'].maximum, 256)
+
+
+    def test_alarm(self):
+        """Check that status packet errors are reported as events."""
+
+        replay = ReplaySerial([tx(1, ip.READ_DATA,
+                                  (pk.HIGHEST_LIMIT_TEMPERATURE, 3)),
+                               rx(1, (70, 60, 140)),
+                               tx(1, ip.READ_DATA, (pk.PRESENT_LOAD, 4)),
+                               rx(1, (0x00, 0x05, 120, 75), error=0x04)])
+        serial_connection = Connection(transport=replay)
+
+        monitor = HealthMonitor(serial_connection, (1, ))
+
+        self.assertFalse(monitor.sample(1))
+        self.assertEqual(monitor.events[0].kind, 'alarm')
+
+
+    def test_communication_errors(self):
+        """Check that communication errors are reported as events (once,
+        until the unit replies again)."""
+
+        read_limits = tx(1, ip.READ_DATA, (pk.HIGHEST_LIMIT_TEMPERATURE, 3))
+        replay = ReplaySerial([read_limits,                    # no reply
+                               read_limits,                    # no reply
+                               read_limits, rx(1, (70, 60, 140)),
+                               tx(1, ip.READ_DATA, (pk.PRESENT_LOAD, 4)),
+                               rx(1, (0x00, 0x05, 120, 40))])
+        serial_connection = Connection(transport=replay)
+
+        monitor = HealthMonitor(serial_connection, (1, ))
+
+        self.assertFalse(monitor.sample(1))
+
+        # A missing status packet holds the bus until the reply deadline
+        timing = serial_connection.timing.transaction(read_limits.data)
+        self.assertAlmostEqual(monitor._bus_time, timing.deadline)
+
+        self.assertFalse(monitor.sample(1))
+        self.assertTrue(monitor.sample(1))
+        self.assertTrue(replay.is_exhausted)
+
+        self.assertEqual([event.kind for event in monitor.events],
+                         ['communication'])
+
+
+    def test_disconnected_port(self):
+        """Check that the monitor thread survives serial port errors."""
+
+        serial_connection = Connection(transport=DisconnectedSerial([]))
+
+        monitor = HealthMonitor(serial_connection, (1, ), period=0.01)
+        monitor.start()
+        time.sleep(0.05)
+
+        self.assertTrue(monitor.is_running)
+        monitor.stop()
+
+        self.assertEqual(monitor.events[0].kind, 'communication')
+        self.assertIsInstance(monitor.events[0].value,
+                              serial.SerialException)
+
+
+    def test_bandwidth_exceeded(self):
+        """Check that samples rejected by a non-blocking bandwidth budget are
+        skipped (without event) and that the monitor thread survives."""
+
+        budget = BandwidthBudget({'telemetry': 0.001}, block=False)
+        budget.admit(1., 'telemetry')           # the share is exhausted
+        replay = ReplaySerial([])
+        serial_connection = Connection(transport=replay,
+                                       bandwidth_budget=budget)
+
+        monitor = HealthMonitor(serial_connection, (1, ), period=0.01)
+
+        with budget.client('telemetry'):
+            self.assertIsNone(monitor.sample(1))
+
+        monitor.start()
+        time.sleep(0.05)
+
+        self.assertTrue(monitor.is_running)
+        monitor.stop()
+
+        self.assertEqual(len(monitor.events), 0)
+        self.assertTrue(replay.is_exhausted)
+
+
+if __name__ == '__main__':
+    unittest.main()
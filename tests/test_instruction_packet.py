@@ -473,6 +473,21 @@ class TestInstructionPacket(unittest.TestCase):
         self.assertEqual(instruction_packet.to_printable_string(), expected_str)
 
 
+    def test_example_bulk_read(self):
+        """Check the BULK_READ example from the MX-28 user guide: read 2 bytes
+        from 0x1E on the Dynamixel #1 and 2 bytes from 0x24 on the Dynamixel
+        #2."""
+
+        dxl_id = pk.BROADCAST_ID
+        instruction = ip.BULK_READ
+        params = (0x00, 2, 1, 0x1e, 2, 2, 0x24)
+
+        instruction_packet = ip.InstructionPacket(dxl_id, instruction, params)
+
+        expected_str = "ff ff fe 09 92 00 02 01 1e 02 02 24 1d"
+        self.assertEqual(instruction_packet.to_printable_string(), expected_str)
+
+
 if __name__ == '__main__':
     unittest.main()
 
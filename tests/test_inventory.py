@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "inventory" module.
+"""
+
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+from pyax12.inventory import (ServoRecord, InventoryError, discover,
+                              load_inventory, save_inventory)
+
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+
+import os
+import tempfile
+import unittest
+
+from records import tx, rx
+
+# Model 12, firmware 24, ID 1, 1Mbps, 500us, angle limits 0 and 1023
+DESCRIPTION = (0x0c, 0x00, 0x18, 0x01, 0x01, 0xfa, 0x00, 0x00, 0xff, 0x03)
+
+SCAN = [tx(1, ip.PING), rx(1),
+        tx(2, ip.PING),                                 # no reply
+        tx(1, ip.READ_DATA, (pk.MODEL_NUMBER, 10)), rx(1, DESCRIPTION)]
+
+class TestInventory(unittest.TestCase):
+    """
+    Contains unit tests for the "inventory" module.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'fleet.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+
+    def test_save_and_load(self):
+        """Check that an inventory file can be read back."""
+
+        record = ServoRecord(1, 12, 24, 1000000.0, 500, 0, 1023)
+        save_inventory(self.path, 1000000, [record])
+
+        self.assertEqual(load_inventory(self.path), (1000000, [record]))
+
+        with open(self.path, 'w') as inventory_file:
+            inventory_file.write('{')
+
+        with self.assertRaises(InventoryError):
+            load_inventory(self.path)
+
+
+    def test_discover(self):
+        """Check that the bus is scanned only when the inventory is
+        outdated."""
+
+        # No inventory file: scan the bus
+        replay = ReplaySerial(list(SCAN))
+        connection = Connection(transport=replay, baudrate=1000000)
+        servos = discover(connection, self.path, bytes((1, 2)))
+
+        self.assertEqual(servos, [ServoRecord(1, 12, 24, 1000000.0, 500,
+                                              0, 1023)])
+        self.assertTrue(replay.is_exhausted)
+
+        # Valid inventory file: one ping per known unit
+        replay = ReplaySerial([tx(1, ip.PING), rx(1)])
+        connection = Connection(transport=replay, baudrate=1000000)
+
+        self.assertEqual(discover(connection, self.path, bytes((1, 2))),
+                         servos)
+        self.assertTrue(replay.is_exhausted)
+        self.assertAlmostEqual(connection.timing.return_delay_time(1), 0.0005)
+
+        # A known unit doesn't reply: scan the bus again
+        replay = ReplaySerial([tx(1, ip.PING)] + SCAN)
+        connection = Connection(transport=replay, baudrate=1000000)
+
+        self.assertEqual(discover(connection, self.path, bytes((1, 2))),
+                         servos)
+        self.assertTrue(replay.is_exhausted)
+
+        # The inventory was made at another baud rate
+        replay = ReplaySerial(list(SCAN))
+        connection = Connection(transport=replay, baudrate=57600)
+        discover(connection, self.path, bytes((1, 2)))
+        self.assertTrue(replay.is_exhausted)
+
+if __name__ == '__main__':
+    unittest.main()
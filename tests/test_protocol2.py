@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "protocol2" module.
+"""
+
+from pyax12.capture import CaptureRecord, ReplaySerial, TX, RX
+from pyax12.connection import Connection, MissingStatusPacketError
+
+import pyax12.protocol2 as p2
+
+import unittest
+
+from records import status2
+
+class TestProtocol2(unittest.TestCase):
+    """
+    Contains unit tests for the "protocol2" module.
+    """
+
+    def test_crc(self):
+        """Check the CRC with the examples of the Protocol 2.0 manual."""
+
+        self.assertEqual(p2.compute_crc(b'123456789'), 0xfee8)
+
+        ping = p2.InstructionPacket2.ping(1)
+        self.assertEqual(ping.to_bytes(),
+                         b'\xff\xff\xfd\x00\x01\x03\x00\x01\x19\x4e')
+
+        read = p2.InstructionPacket2.read(1, 132, 4)
+        self.assertEqual(read.to_bytes(), b'\xff\xff\xfd\x00\x01\x07\x00\x02'
+                                          b'\x84\x00\x04\x00\x1d\x15')
+
+
+    def test_stuffing(self):
+        """Check that the header never appears in a packet body."""
+
+        self.assertEqual(p2.stuff(b'\x01\xff\xff\xfd\x02'),
+                         b'\x01\xff\xff\xfd\xfd\x02')
+        self.assertEqual(p2.unstuff(b'\x01\xff\xff\xfd\xfd\x02'),
+                         b'\x01\xff\xff\xfd\x02')
+
+        packet = p2.InstructionPacket2.write(1, 0, b'\xff\xff\xfd\x00')
+        self.assertEqual(packet.to_bytes()[5:7], b'\x0a\x00')
+        self.assertEqual(packet.to_bytes().count(p2.PACKET_HEADER), 1)
+
+        status_packet = p2.StatusPacket2(status2(1, b'\xff\xff\xfd\x00'))
+        self.assertEqual(status_packet.parameters, b'\xff\xff\xfd\x00')
+
+
+    def test_status_packet(self):
+        """Check status packets."""
+
+        status_packet = p2.StatusPacket2(b'\xff\xff\xfd\x00\x01\x07\x00\x55'
+                                         b'\x00\x06\x04\x26\x65\x5d')
+        self.assertEqual(status_packet.dynamixel_id, 1)
+        self.assertEqual(status_packet.parameters, b'\x06\x04\x26')
+        self.assertFalse(status_packet.alert)
+
+        self.assertTrue(p2.StatusPacket2(status2(1, error=0x80)).alert)
+
+        with self.assertRaises(p2.StatusError) as context:
+            p2.StatusPacket2(status2(1, error=0x04))
+        self.assertEqual(context.exception.error_number, 4)
+
+        corrupted = bytearray(status2(1, b'\x00'))
+        corrupted[-1] ^= 0xff
+        with self.assertRaises(p2.StatusCRCError):
+            p2.StatusPacket2(corrupted)
+
+
+    def test_split(self):
+        """Check the stream parser."""
+
+        stream = b'\x00' + status2(1, b'\x01') + status2(2)
+        packets, remaining = p2.split_status_packets(stream + b'\xff\xff')
+        self.assertEqual(packets, [status2(1, b'\x01'), status2(2)])
+        self.assertEqual(remaining, b'\xff\xff')
+
+        packets, remaining = p2.split_status_packets(status2(3)[:9])
+        self.assertEqual(packets, [])
+        self.assertEqual(remaining, status2(3)[:9])
+
+
+    def test_connection(self):
+        """Check Protocol 2.0 transactions."""
+
+        sync_read = p2.InstructionPacket2.sync_read(132, 4, [1, 2, 3])
+        replay = ReplaySerial([
+            CaptureRecord(0., TX, p2.InstructionPacket2.ping(1).to_bytes()),
+            CaptureRecord(0., RX, status2(1, b'\x06\x04\x26')),
+            CaptureRecord(0., TX, sync_read.to_bytes()),
+            CaptureRecord(0., RX, status2(1, b'\x00\x08\x00\x00')
+                                  + status2(2, error=0x07))])  # 3 is missing
+        reported_errors = []
+        connection = Connection(transport=replay, protocol=2,
+                                error_callback=reported_errors.append)
+        connection.timing.latency = 0.005
+
+        self.assertTrue(connection.ping(1))
+        self.assertEqual(connection.sync_read([1, 2, 3], 132, 4),
+                         {1: b'\x00\x08\x00\x00', 2: None, 3: None})
+        self.assertTrue(replay.is_exhausted)
+
+        self.assertEqual([error.dynamixel_id for error in reported_errors],
+                         [2, 3])
+        self.assertIsInstance(reported_errors[0].error, p2.StatusError)
+        self.assertIsInstance(reported_errors[1].error,
+                              MissingStatusPacketError)
+        self.assertEqual(connection.collect_errors(), [])
+
+        with self.assertRaises(ValueError):
+            Connection(transport=replay, protocol=3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "realtime" module.
+"""
+
+from pyax12.realtime import RealtimeLoop, JitterHistogram
+import pyax12.realtime as rt
+
+import gc
+import time
+import unittest
+from unittest import mock
+
+class TestRealtime(unittest.TestCase):
+    """
+    Contains unit tests for the "realtime" module.
+    """
+
+    def test_histogram(self):
+        """Check the bins and the percentiles of a jitter histogram."""
+
+        histogram = JitterHistogram(bin_width=0.001, num_bins=3)
+        self.assertIsNone(histogram.percentile(0.5))
+
+        for duration in (0.0001, 0.0002, 0.0015, 0.01):
+            histogram.add(duration)
+
+        self.assertEqual(histogram.counts, [2, 1, 0, 1])
+        self.assertEqual(histogram.num_samples, 4)
+        self.assertEqual(histogram.maximum, 0.01)
+        self.assertAlmostEqual(histogram.mean, 0.011800 / 4)
+        self.assertEqual(histogram.percentile(0.5), 0.001)
+        self.assertEqual(histogram.percentile(0.75), 0.002)
+        self.assertEqual(histogram.percentile(1.), 0.01)
+        self.assertEqual(histogram.format().splitlines(),
+                         ["      0-1000  us: 2",
+                          "   1000-2000  us: 1",
+                          "   3000+      us: 1"])
+
+
+    def test_run(self):
+        """Check that the loop runs at the given period and restores the
+        garbage collector."""
+
+        call_times = []
+        loop = RealtimeLoop(lambda: call_times.append(time.monotonic()),
+                            period=0.005, priority=None, lock_memory=False)
+
+        gc_was_enabled = gc.isenabled()
+        loop.run(num_cycles=10)
+
+        self.assertEqual(loop.num_cycles, 10)
+        self.assertEqual(gc.isenabled(), gc_was_enabled)
+        self.assertGreaterEqual(call_times[-1] - call_times[0], 0.045)
+        self.assertEqual(loop.wakeup_histogram.num_samples, 10)
+        self.assertEqual(tuple(loop.status), (False, False, False))
+
+
+    def test_missed_deadlines(self):
+        """Check that callbacks longer than the period are blamed for the
+        missed deadlines."""
+
+        call_times = []
+
+        def late_callback():
+            call_times.append(time.monotonic())
+            time.sleep(0.012)
+
+        loop = RealtimeLoop(late_callback, period=0.005, priority=None,
+                            lock_memory=False)
+        loop.run(num_cycles=3)
+
+        self.assertEqual(loop.num_callback_misses, 3)
+        self.assertEqual(loop.num_missed_deadlines, 3)
+        self.assertGreaterEqual(loop.num_skipped_cycles, 6)
+
+        # Late cycles wait for the next scheduled start (0.015s later)
+        for index in range(1, len(call_times)):
+            self.assertGreaterEqual(call_times[index] - call_times[index - 1],
+                                    0.0145)
+
+
+    def test_memory_lock(self):
+        """Check that the memory locked by the loop is unlocked when it
+        returns."""
+
+        with mock.patch.object(rt, '_lock_memory', return_value=True), \
+                mock.patch.object(rt, '_unlock_memory') as unlock_memory:
+            loop = RealtimeLoop(lambda: None, period=0.001, priority=None,
+                                lock_memory=True)
+            loop.run(num_cycles=2)
+
+            self.assertTrue(loop.status.memory_locked)
+            unlock_memory.assert_called_once_with()
+
+        # Memory is only locked on request
+        loop = RealtimeLoop(lambda: None, period=0.001, priority=None)
+        loop.run(num_cycles=1)
+        self.assertFalse(loop.status.memory_locked)
+
+
+    def test_thread(self):
+        """Check that the loop can be started and stopped in a thread and
+        that it stops when the callback fails."""
+
+        # The real-time priority and the affinity only apply to the loop
+        # thread (they are skipped if they are not permitted)
+        loop = RealtimeLoop(lambda: None, period=0.001, cpus=[0],
+                            lock_memory=False, gc_mode='disabled')
+        loop.start()
+        self.assertTrue(loop.is_running)
+        time.sleep(0.02)
+        loop.stop()
+
+        self.assertFalse(loop.is_running)
+        self.assertGreater(loop.num_cycles, 0)
+        self.assertTrue(all(isinstance(applied, bool)
+                            for applied in loop.status))
+
+        def failing_callback():
+            raise RuntimeError("bus error")
+
+        loop = RealtimeLoop(failing_callback, period=0.001, priority=None,
+                            lock_memory=False)
+        loop.run()
+        self.assertIsInstance(loop.error, RuntimeError)
+
+        with self.assertRaises(ValueError):
+            RealtimeLoop(lambda: None, period=0.001, gc_mode='sometimes')
+
+
+if __name__ == '__main__':
+    unittest.main()
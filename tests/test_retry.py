@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "retry" module.
+"""
+
+from pyax12.capture import CaptureRecord, ReplaySerial, TX, RX
+from pyax12.connection import (Connection, MissingStatusPacketError,
+                               CircuitOpenError)
+from pyax12.retry import RetryPolicy, CircuitBreaker
+
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+import pyax12.protocol2 as p2
+import pyax12.status_packet as sp
+
+import time
+import unittest
+
+from records import tx, rx, status2
+
+class TestRetry(unittest.TestCase):
+    """
+    Contains unit tests for the "retry" module.
+    """
+
+    def test_delays(self):
+        """Check the exponential backoff."""
+
+        policy = RetryPolicy(retries=3, backoff=0.001, backoff_factor=2.)
+        self.assertEqual(policy.delays(), [0.001, 0.002, 0.004])
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(retries=-1)
+
+
+    def test_circuit_breaker(self):
+        """Check that the circuit opens after consecutive failures and is
+        probed after the reset timeout."""
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+        breaker.record_failure(1)
+        self.assertTrue(breaker.allow(1))
+        breaker.record_failure(1)
+        self.assertTrue(breaker.is_open(1))
+        self.assertFalse(breaker.allow(1))
+        self.assertEqual(breaker.open_ids, [1])
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow(1))    # the probe
+        self.assertFalse(breaker.allow(1))
+
+        breaker.record_success(1)
+        self.assertFalse(breaker.is_open(1))
+        self.assertTrue(breaker.allow(1))
+
+
+    def test_retry_missing_reply(self):
+        """Check that a transaction is sent again when its status packet is
+        missing or corrupted."""
+
+        corrupted = CaptureRecord(0., RX, b'\xff\xff\x01\x02\x00\x00')
+        malformed = CaptureRecord(0., RX, b'\xff\xff\x01\x03\x00\xfb')
+        replay = ReplaySerial([tx(1, ip.PING),                 # no reply
+                               tx(1, ip.PING), corrupted,
+                               tx(1, ip.PING), malformed,
+                               tx(1, ip.PING), rx(1)])
+        serial_connection = Connection(transport=replay,
+                                       retry_policy=RetryPolicy(retries=3))
+
+        self.assertTrue(serial_connection.ping(1))
+        self.assertTrue(replay.is_exhausted)
+
+
+    def test_no_retry_on_error_flags(self):
+        """Check that a status packet with an error flag is not retried."""
+
+        replay = ReplaySerial([tx(1, ip.PING), rx(1, error=0x08)])
+        serial_connection = Connection(transport=replay,
+                                       retry_policy=RetryPolicy(retries=2))
+
+        with self.assertRaises(sp.RangeError):
+            serial_connection.ping(1)
+
+        self.assertTrue(replay.is_exhausted)
+
+
+    def test_open_circuit(self):
+        """Check that a unit whose circuit is open is not addressed."""
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10.)
+        replay = ReplaySerial([tx(1, ip.PING), tx(1, ip.PING)])
+        serial_connection = Connection(transport=replay,
+                                       circuit_breaker=breaker)
+
+        self.assertFalse(serial_connection.ping(1))
+        self.assertFalse(serial_connection.ping(1))
+        self.assertTrue(breaker.is_open(1))
+
+        # The bus is not used anymore (the replay would raise otherwise)
+        self.assertFalse(serial_connection.ping(1))
+        self.assertTrue(replay.is_exhausted)
+
+
+
+    def test_accessor_errors(self):
+        """Check that high level accessors raise an exception when no status
+        packet is received."""
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.)
+        position = (pk.PRESENT_POSITION, 2)
+        replay = ReplaySerial([tx(1, ip.READ_DATA, position)])  # no reply
+        serial_connection = Connection(transport=replay, status_return_level=2,
+                                       circuit_breaker=breaker)
+
+        with self.assertRaises(MissingStatusPacketError) as context:
+            serial_connection.get_present_position(1)
+        self.assertNotIsInstance(context.exception, CircuitOpenError)
+
+        # The circuit is open: the bus is not used
+        with self.assertRaises(CircuitOpenError):
+            serial_connection.get_present_position(1)
+
+        self.assertTrue(replay.is_exhausted)
+
+
+    def test_protocol2(self):
+        """Check that Protocol 2.0 transactions are retried and stop
+        addressing failing units too."""
+
+        ping = CaptureRecord(0., TX, p2.InstructionPacket2.ping(1).to_bytes())
+        reply = status2(1, b'\x06\x04\x26')
+        corrupted = reply[:-1] + bytes((reply[-1] ^ 0xff, ))    # wrong CRC
+        replay = ReplaySerial([ping,                            # no reply
+                               ping, CaptureRecord(0., RX, corrupted),
+                               ping, CaptureRecord(0., RX, reply)])
+        serial_connection = Connection(transport=replay, protocol=2,
+                                       retry_policy=RetryPolicy(retries=2))
+        serial_connection.timing.latency = 0.005
+
+        self.assertTrue(serial_connection.ping(1))
+        self.assertTrue(replay.is_exhausted)
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.)
+        replay = ReplaySerial([ping])                           # no reply
+        serial_connection = Connection(transport=replay, protocol=2,
+                                       circuit_breaker=breaker)
+        serial_connection.timing.latency = 0.005
+
+        self.assertFalse(serial_connection.ping(1))
+        self.assertTrue(breaker.is_open(1))
+
+        # The bus is not used anymore (the replay would raise otherwise)
+        self.assertFalse(serial_connection.ping(1))
+        self.assertTrue(replay.is_exhausted)
+
+if __name__ == '__main__':
+    unittest.main()
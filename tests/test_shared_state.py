@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "shared_state" module.
+"""
+
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+from pyax12.shared_state import (StatePublisher, StateReader,
+                                 SharedStateError, BLOCK_ADDRESS,
+                                 BLOCK_LENGTH)
+
+import pyax12.instruction_packet as ip
+
+import subprocess
+import sys
+import unittest
+
+from records import tx, rx
+
+# Position 512, speed 0, load 1024 (CW, 0%), 12.0V, 40°C
+BLOCK = (0x00, 0x02, 0x00, 0x00, 0x00, 0x04, 120, 40)
+
+# Print the position and the temperature of the unit 1 in another process
+READER_SCRIPT = """
+import sys
+from pyax12.shared_state import StateReader
+reader = StateReader(sys.argv[1])
+sample = reader.read(1)
+print(sample.present_position, sample.present_temperature)
+reader.close()
+"""
+
+class TestSharedState(unittest.TestCase):
+    """
+    Contains unit tests for the "shared_state" module.
+    """
+
+    def test_publish(self):
+        """Check that readers get the published state."""
+
+        read_block = (BLOCK_ADDRESS, BLOCK_LENGTH)
+        replay = ReplaySerial([tx(1, ip.READ_DATA, read_block),
+                               rx(1, BLOCK),
+                               tx(2, ip.READ_DATA, read_block)])  # no reply
+        connection = Connection(transport=replay)
+        publisher = StatePublisher(connection, [1, 2])
+
+        try:
+            reader = StateReader(publisher.name)
+            self.assertEqual(reader.dynamixel_ids, [1, 2])
+            self.assertEqual(reader.snapshot(), {})
+
+            self.assertEqual(publisher.poll(), [1])
+
+            sample = reader.read(1)
+            self.assertEqual(sample.sequence, 1)
+            self.assertEqual(sample.present_position, 512)
+            self.assertEqual(sample.present_load, 1024)
+            self.assertEqual(sample.present_voltage, 120)
+            self.assertEqual(sample.present_temperature, 40)
+            self.assertIsNone(reader.read(2))
+
+            publisher.publish(2, BLOCK, timestamp=1.5)
+            self.assertEqual(reader.read(2).timestamp, 1.5)
+            self.assertEqual(sorted(reader.snapshot()), [1, 2])
+
+            with self.assertRaises(ValueError):
+                publisher.publish(2, b'\x00')
+
+            # A reader in another process (which must not remove the segment
+            # nor warn about it when it exits)
+            output = subprocess.check_output([sys.executable, '-c',
+                                              READER_SCRIPT, publisher.name],
+                                             stderr=subprocess.STDOUT,
+                                             universal_newlines=True)
+            self.assertEqual(output.split(), ['512', '40'])
+
+            other_reader = StateReader(publisher.name)
+            self.assertEqual(other_reader.read(1).present_position, 512)
+            other_reader.close()
+
+            reader.close()
+        finally:
+            publisher.close()
+
+
+    def test_torn_row(self):
+        """Check that a row being written is not returned."""
+
+        connection = Connection(transport=ReplaySerial([]))
+        publisher = StatePublisher(connection, [1])
+
+        try:
+            publisher.publish(1, BLOCK)
+            reader = StateReader(publisher.name)
+
+            # Simulate a publisher interrupted while writing the row
+            buffer = publisher._shared_memory.buf
+            buffer[reader._offset] += 1
+
+            with self.assertRaises(SharedStateError):
+                reader.read(1)
+
+            reader.close()
+        finally:
+            publisher.close()
+
+if __name__ == '__main__':
+    unittest.main()
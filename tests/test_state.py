@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "state" module.
+"""
+
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+from pyax12.state import ServoState, FleetState, CONTROL_TABLE_LENGTH
+
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+
+import unittest
+
+from records import tx, rx
+
+# The control table of an AX-12+ unit (ID 1) at the factory settings
+CONTROL_TABLE = bytes((0x0c, 0x00, 0x18, 0x01, 0x01, 0xfa, 0x00, 0x00,
+                       0xff, 0x03, 0x00, 0x46, 0x3c, 0x8c, 0xff, 0x03,
+                       0x02, 0x24, 0x24, 0x00, 0xe4, 0x01, 0x0e, 0x02,
+                       0x00, 0x00, 0x01, 0x01, 0x20, 0x20, 0x00, 0x02,
+                       0x00, 0x00, 0xff, 0x03, 0x00, 0x02, 0x00, 0x00,
+                       0x10, 0x04, 0x78, 0x28, 0x00, 0x00, 0x00, 0x00,
+                       0x20, 0x00))
+
+class TestState(unittest.TestCase):
+    """
+    Contains unit tests for the "state" module.
+    """
+
+    def test_servo_state(self):
+        """Check raw registers and unit conversions."""
+
+        state = ServoState.from_bytes(CONTROL_TABLE)
+
+        self.assertEqual(state.model_number, 12)
+        self.assertEqual(state.id, 1)
+        self.assertEqual(state.baud_rate_bps, 1000000.0)
+        self.assertEqual(state.return_delay_time_us, 500)
+        self.assertEqual(state.ccw_angle_limit, 1023)
+        self.assertEqual(state.ccw_angle_limit_degrees, 150.)
+        self.assertEqual(state.max_voltage_volts, 14.)
+        self.assertEqual(state.present_position, 512)
+        self.assertEqual(state.present_load_signed, 16)
+        self.assertEqual(state.present_voltage_volts, 12.)
+        self.assertEqual(state.punch, 32)
+        self.assertEqual(state['present_temperature'], 40)
+
+        # Registers are read-only and states have no __dict__
+        with self.assertRaises(AttributeError):
+            state.present_position = 0
+        with self.assertRaises(AttributeError):
+            state.foo = 0
+
+
+    def test_fleet_state(self):
+        """Check that a fleet is updated by blocks of registers."""
+
+        present_block = (pk.PRESENT_POSITION, 8)
+        replay = ReplaySerial([tx(1, ip.READ_DATA, present_block),
+                               rx(1, CONTROL_TABLE[pk.PRESENT_POSITION:
+                                                   pk.PRESENT_POSITION + 8]),
+                               tx(2, ip.READ_DATA, present_block)])
+        connection = Connection(transport=replay)
+
+        fleet = FleetState([1, 2])
+        servo = fleet.servo(1)
+
+        self.assertEqual(fleet.poll(connection, *present_block), [1])
+        self.assertTrue(replay.is_exhausted)
+
+        self.assertEqual(fleet.column('present_position'), [512, 0])
+        self.assertEqual(fleet.column('present_temperature'), [40, 0])
+        self.assertEqual(servo.present_voltage, 120)
+        self.assertEqual(servo.model_number, 0)     # not read yet
+
+        fleet.update(2, CONTROL_TABLE)
+        self.assertEqual(fleet.servo(2).to_dict(),
+                         ServoState.from_bytes(CONTROL_TABLE).to_dict())
+
+
+    def test_control_table_tuple(self):
+        """Check that the control table is read in one transaction."""
+
+        replay = ReplaySerial([tx(1, ip.READ_DATA, (0, CONTROL_TABLE_LENGTH)),
+                               rx(1, CONTROL_TABLE)])
+        connection = Connection(transport=replay)
+
+        ctrl_table = dict(connection.get_control_table_tuple(1))
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(ctrl_table['model_number'], "AX-12+")
+        self.assertEqual(ctrl_table['baud_rate'], "1000000.0 bps")
+        self.assertEqual(ctrl_table['status_return_level'],
+                         "2 (respond to all instructions)")
+        self.assertEqual(ctrl_table['overheating_alarm_led'], "on")
+        self.assertEqual(ctrl_table['range_alarm_led'], "off")
+        self.assertEqual(ctrl_table['present_position'], "0.1° (512)")
+        self.assertEqual(ctrl_table['present_voltage'], "12.0V")
+        self.assertEqual(ctrl_table['locked'], "no")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -30,6 +30,7 @@ This module contains unit tests for the "StatusPacket" class.
 """
 
 from pyax12.status_packet import StatusPacket
+from pyax12.status_packet import split_status_packets
 
 from pyax12.status_packet import StatusPacketError
 from pyax12.status_packet import InstructionError
@@ -378,6 +379,27 @@ class TestStatusPacket(unittest.TestCase):
 
 
 
+    ###
+
+    def test_split_status_packets(self):
+        """Check that split_status_packets() splits a stream of bytes into
+        packets and keeps the incomplete trailing packet."""
+
+        packet1 = b'\xff\xff\x01\x02\x00\xfc'
+        packet2 = b'\xff\xff\x01\x03\x00\x20\xdb'
+
+        byte_seq = b'\x00' + packet1 + b'\xff' + packet2 + packet1[:3]
+        packets, remaining_bytes = split_status_packets(byte_seq)
+
+        self.assertEqual(packets, [packet1, packet2])
+        self.assertEqual(remaining_bytes, packet1[:3])
+
+        packets, remaining_bytes = split_status_packets(remaining_bytes
+                                                        + packet1[3:])
+        self.assertEqual(packets, [packet1])
+        self.assertEqual(remaining_bytes, b'')
+
+
 if __name__ == '__main__':
     unittest.main()
 
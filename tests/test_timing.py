@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "timing" module.
+"""
+
+from pyax12.timing import TimingModel, status_packet_length
+from pyax12.timing import staggered_return_delay_times, servo_baud_rates
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+
+import unittest
+
+class TestTiming(unittest.TestCase):
+    """
+    Contains unit tests for the "timing" module.
+    """
+
+    def test_status_packet_length(self):
+        """Check the expected length of status packets."""
+
+        ping = ip.InstructionPacket(1, ip.PING)
+        read = ip.InstructionPacket(1, ip.READ_DATA, (pk.PRESENT_POSITION, 2))
+        write = ip.InstructionPacket(1, ip.WRITE_DATA, (pk.LED, 1))
+        broadcast = ip.InstructionPacket(pk.BROADCAST_ID, ip.WRITE_DATA,
+                                         (pk.LED, 1))
+
+        self.assertEqual(status_packet_length(ping), 6)
+        self.assertEqual(status_packet_length(read), 8)
+        self.assertEqual(status_packet_length(write), 6)
+        self.assertEqual(status_packet_length(broadcast), 0)
+        self.assertEqual(status_packet_length(read.to_bytes()), 8)
+
+
+    def test_transaction_time(self):
+        """Check the expected duration of a transaction."""
+
+        # READ_DATA packet: 8 bytes, status packet: 8 bytes
+        read = ip.InstructionPacket(1, ip.READ_DATA, (pk.PRESENT_POSITION, 2))
+
+        timing_model = TimingModel(1000000, default_return_delay_time=0.)
+        self.assertAlmostEqual(timing_model.transaction_time(read), 16e-5)
+
+        timing_model.set_return_delay_time(1, 0.0005)
+        self.assertAlmostEqual(timing_model.transaction_time(read), 66e-5)
+
+        # Moving a bus from 57600 bps to 1 Mbps gives a ~17x speedup
+        slow_timing_model = TimingModel(57600, default_return_delay_time=0.)
+        fast_timing_model = TimingModel(1000000, default_return_delay_time=0.)
+        ratio = (slow_timing_model.transaction_time(read)
+                 / fast_timing_model.transaction_time(read))
+        self.assertAlmostEqual(ratio, 1000000 / 57600.)
+
+
+    def test_broadcast_return_delay_time(self):
+        """Check that a broadcasted return delay time applies to every
+        unit."""
+
+        timing_model = TimingModel(57600)
+        timing_model.set_return_delay_time(1, 0.0001)
+        timing_model.set_return_delay_time(pk.BROADCAST_ID, 0.00002)
+
+        self.assertEqual(timing_model.return_delay_time(1), 0.00002)
+        self.assertEqual(timing_model.return_delay_time(2), 0.00002)
+
+
+    def test_staggered_return_delay_times(self):
+        """Check that staggered reply slots don't overlap and that they are
+        rejected when the bus is too slow."""
+
+        # At 1 Mbps, a READ_DATA packet and a 8 bytes status packet both take
+        # 80us
+        timing_model = TimingModel(1000000)
+        delays = staggered_return_delay_times(timing_model, 3, 8,
+                                              guard_time=0.00001)
+
+        self.assertEqual([int(round(delay * 1e6)) for delay in delays],
+                         [160, 170, 180])
+
+        # At 57600 bps, a single READ_DATA packet takes more than 508us
+        timing_model = TimingModel(57600)
+        self.assertEqual(staggered_return_delay_times(timing_model, 1, 8),
+                         [0.])
+
+        with self.assertRaises(ValueError):
+            staggered_return_delay_times(timing_model, 2, 8)
+
+
+    def test_servo_baud_rates(self):
+        """Check the baud rates reachable by Dynamixel units and the host."""
+
+        # FTDI chips can reach every Dynamixel baud rate
+        rates = servo_baud_rates()
+        self.assertEqual(len(rates), 254)
+        self.assertEqual(rates[0].servo_baudrate, 1000000)
+        self.assertTrue(all(rate.error == 0 for rate in rates))
+
+        # With a 16550 UART, 117647 bps (n = 16) is reached with 115200 bps
+        rates = servo_baud_rates(base_baudrate=115200, divisor_step=1)
+        self.assertEqual(rates[0].register_value, 16)
+        self.assertEqual(rates[0].host_baudrate, 115200)
+        self.assertAlmostEqual(rates[0].error, -0.0208)
+
+        rates = servo_baud_rates(115200, 1, max_error=0.01)
+        self.assertEqual(rates[0].register_value, 34)       # 57143 bps
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "trajectory" module.
+"""
+
+from pyax12.capture import CaptureRecord, ReplaySerial, TX
+from pyax12.connection import Connection
+from pyax12.trajectory import TrajectoryStreamer
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+
+import unittest
+
+def frame(*params):
+    """Return the capture record of a SYNC_WRITE goal position frame."""
+    packet = ip.InstructionPacket(pk.BROADCAST_ID, ip.SYNC_WRITE,
+                                  (pk.GOAL_POSITION, 2) + params)
+    return CaptureRecord(0., TX, packet.to_bytes())
+
+class TestTrajectory(unittest.TestCase):
+    """
+    Contains unit tests for the "trajectory" module.
+    """
+
+    def test_interpolate(self):
+        """Check the linear interpolation of waypoints."""
+
+        streamer = TrajectoryStreamer(None, (1, 2))
+        times = (0., 1., 3.)
+        positions = ((0, 100), (100, 100), (300, 0))
+
+        self.assertEqual(streamer.interpolate(times, positions, -1.), [0, 100])
+        self.assertEqual(streamer.interpolate(times, positions, 0.5), [50, 100])
+        self.assertEqual(streamer.interpolate(times, positions, 2.), [200, 50])
+        self.assertEqual(streamer.interpolate(times, positions, 4.), [300, 0])
+
+
+    def test_stream(self):
+        """Check that one SYNC_WRITE frame is sent per control period."""
+
+        replay = ReplaySerial([frame(1, 0x00, 0x00, 2, 0xff, 0x03),
+                               frame(1, 0xf4, 0x01, 2, 0x0b, 0x02),
+                               frame(1, 0xe8, 0x03, 2, 0x17, 0x00)])
+        serial_connection = Connection(transport=replay)
+
+        streamer = TrajectoryStreamer(serial_connection, (1, 2), rate=100.)
+        report = streamer.stream((0., 0.02), ((0, 1023), (1000, 23)))
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(report.num_frames + report.deadline_misses, 3)
+
+
+    def test_stream_wrong_times(self):
+        """Check that stream() fails when waypoint times are not
+        increasing."""
+
+        streamer = TrajectoryStreamer(None, (1, ))
+
+        with self.assertRaises(ValueError):
+            streamer.stream((0., 1., 1.), ((0, ), (1, ), (2, )))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "transport" module.
+"""
+
+from pyax12.connection import Connection
+from pyax12.packet import Packet
+from pyax12.transport import TermiosSerial, TransportError
+import pyax12.transport as tr
+
+import os
+import pty
+import tempfile
+import threading
+import time
+import unittest
+
+def reply_to_pings(master_fd, num_pings):
+    """Answer `num_pings` PING instruction packets on the master side of a
+    pseudo-terminal."""
+
+    for _ in range(num_pings):
+        instruction_packet = b''
+        while len(instruction_packet) < 6:
+            instruction_packet += os.read(master_fd,
+                                          6 - len(instruction_packet))
+        status_packet = Packet(instruction_packet[2], (0, ))
+        os.write(master_fd, status_packet.to_bytes())
+
+class TestTransport(unittest.TestCase):
+    """
+    Contains unit tests for the "transport" module.
+    """
+
+    def setUp(self):
+        self.master_fd, slave_fd = pty.openpty()
+        self.port = os.ttyname(slave_fd)
+        self.transport = TermiosSerial(self.port, baudrate=1000000,
+                                       timeout=0.05)
+        os.close(slave_fd)
+
+    def tearDown(self):
+        self.transport.close()
+        os.close(self.master_fd)
+
+
+    def test_write_read(self):
+        """Check that bytes are written and read on the tty."""
+
+        self.assertEqual(self.transport.write(b'\xff\xff\x01\x02\x01\xfb'), 6)
+        self.assertEqual(os.read(self.master_fd, 6),
+                         b'\xff\xff\x01\x02\x01\xfb')
+
+        os.write(self.master_fd, b'\xff\xff\x01\x02\x00\xfc')
+        self.assertTrue(self.transport.wait_readable(1.))
+        self.assertEqual(self.transport.read(6), b'\xff\xff\x01\x02\x00\xfc')
+        self.assertEqual(self.transport.inWaiting(), 0)
+
+
+    def test_read_timeout(self):
+        """Check that read returns the received bytes when the timeout
+        expires."""
+
+        os.write(self.master_fd, b'\xff\xff')
+        start = time.monotonic()
+
+        self.assertEqual(self.transport.read(6), b'\xff\xff')
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        self.assertFalse(self.transport.wait_readable(0.01))
+
+
+    def test_flush_input(self):
+        """Check that flushInput discards received bytes."""
+
+        os.write(self.master_fd, b'\x00\x01\x02')
+        self.transport.wait_readable(1.)
+        time.sleep(0.01)
+        self.assertEqual(self.transport.inWaiting(), 3)
+
+        self.transport.flushInput()
+        self.assertEqual(self.transport.inWaiting(), 0)
+
+
+    def test_baudrate(self):
+        """Check that the baud rate can be changed, including to non-standard
+        baud rates."""
+
+        self.transport.baudrate = 57600
+        self.assertEqual(self.transport.baudrate, 57600)
+
+        # Not a standard POSIX speed (set with termios2)
+        self.transport.baudrate = 250000
+        self.assertEqual(self.transport.baudrate, 250000)
+
+
+    def test_closed(self):
+        """Check that a closed transport cannot be used."""
+
+        self.transport.close()
+        self.assertFalse(self.transport.is_open)
+
+        with self.assertRaises(TransportError):
+            self.transport.write(b'\x00')
+
+
+    def test_connection(self):
+        """Check that the transport can replace pyserial in a
+        `Connection`."""
+
+        responder = threading.Thread(target=reply_to_pings,
+                                     args=(self.master_fd, 2))
+        responder.start()
+
+        connection = Connection(transport=self.transport, baudrate=1000000)
+        connection.timing.latency = 0.5
+
+        self.assertTrue(connection.ping(1))
+        self.assertTrue(connection.ping(2))
+        responder.join()
+
+
+    def test_usb_serial_adapter(self):
+        """Check the detection of USB-serial adapters and their latency
+        timer in (a fake) sysfs."""
+
+        with tempfile.TemporaryDirectory() as sysfs_root:
+            driver_path = os.path.join(sysfs_root, 'bus', 'usb-serial',
+                                       'drivers', 'ftdi_sio')
+            device_path = os.path.join(sysfs_root, 'class', 'tty', 'ttyUSB0',
+                                       'device')
+            os.makedirs(driver_path)
+            os.makedirs(device_path)
+            os.symlink(driver_path, os.path.join(device_path, 'driver'))
+
+            with open(os.path.join(device_path, 'latency_timer'), 'w') as fd:
+                fd.write('16\n')
+
+            port = '/dev/ttyUSB0'
+            self.assertEqual(tr.usb_serial_adapter(port, sysfs_root), 'FTDI')
+            self.assertEqual(tr.get_latency_timer(port, sysfs_root), 16)
+
+            self.assertTrue(tr.set_latency_timer(port, 1, sysfs_root))
+            self.assertEqual(tr.get_latency_timer(port, sysfs_root), 1)
+
+            port = '/dev/ttyACM0'
+            self.assertIsNone(tr.usb_serial_adapter(port, sysfs_root))
+            self.assertIsNone(tr.get_latency_timer(port, sysfs_root))
+            self.assertFalse(tr.set_latency_timer(port, 1, sysfs_root))
+
+
+    def test_low_latency(self):
+        """Check that unsupported low latency settings are ignored."""
+
+        # Pseudo-terminals have no serial driver
+        self.assertFalse(tr.set_low_latency(self.transport.fileno()))
+        self.assertIsNone(self.transport.adapter)
+        self.assertFalse(self.transport.low_latency)
+        self.assertIsNone(self.transport.latency_timer)
+
+
+    def test_round_trip_floor(self):
+        """Check the measure of the shortest round trip time."""
+
+        responder = threading.Thread(target=reply_to_pings,
+                                     args=(self.master_fd, 5))
+        responder.start()
+
+        connection = Connection(transport=self.transport, baudrate=1000000)
+        connection.timing.latency = 0.5
+
+        round_trip_floor = tr.measure_round_trip_floor(connection, 1, 5)
+        responder.join()
+
+        self.assertGreater(round_trip_floor,
+                           connection.timing.transaction(
+                               b'\xff\xff\x01\x02\x01\xfb').reply_time)
+        self.assertLess(round_trip_floor, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
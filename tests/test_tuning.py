@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding : utf-8 -*-
+
+# PyAX-12
+
+# The MIT License
+#
+# Copyright (c) 2010,2015 Jeremie DECOCK (http://www.jdhp.org)
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+This module contains unit tests for the "tuning" module.
+"""
+
+from pyax12.capture import ReplaySerial
+from pyax12.connection import Connection
+from pyax12.tuning import tune_bus, TuningError
+import pyax12.instruction_packet as ip
+import pyax12.packet as pk
+
+import unittest
+
+from records import tx, rx
+
+def sync_write(address, dynamixel_id, value):
+    """Return the capture record of a one byte SYNC_WRITE packet."""
+    return tx(pk.BROADCAST_ID, ip.SYNC_WRITE,
+              (address, 1, dynamixel_id, value))
+
+class TestTuning(unittest.TestCase):
+    """
+    Contains unit tests for the "tuning" module.
+    """
+
+    def test_tune_bus(self):
+        """Check the tuning of a bus with one Dynamixel unit."""
+
+        records = [tx(1, ip.READ_DATA, (pk.BAUD_RATE, 2)), rx(1, (34, 250)),
+                   tx(1, ip.PING), rx(1),
+                   sync_write(pk.RETURN_DELAY_TIME, 1, 0),
+                   sync_write(pk.BAUD_RATE, 1, 1),
+                   tx(1, ip.PING), rx(1),
+                   tx(1, ip.PING), rx(1)]
+        replay = ReplaySerial(records)
+        serial_connection = Connection(transport=replay)
+
+        report = tune_bus(serial_connection, baudrate=1000000,
+                          return_delay_time=0, dynamixel_ids=[1],
+                          num_pings=1, settle_time=0.)
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(serial_connection.baudrate, 1000000)
+        self.assertEqual(serial_connection.timing.return_delay_time(1), 0.)
+        self.assertEqual(report.former_baudrate, 57600)
+        self.assertEqual(report.baudrate, 1000000)
+
+
+    def test_tune_bus_rollback(self):
+        """Check that the former configuration is restored when a Dynamixel
+        unit doesn't reply at the new baud rate."""
+
+        records = [tx(1, ip.READ_DATA, (pk.BAUD_RATE, 2)), rx(1, (34, 250)),
+                   tx(1, ip.PING), rx(1),
+                   sync_write(pk.RETURN_DELAY_TIME, 1, 0),
+                   sync_write(pk.BAUD_RATE, 1, 1),
+                   tx(1, ip.PING),                        # no reply
+                   sync_write(pk.BAUD_RATE, 1, 34),
+                   sync_write(pk.RETURN_DELAY_TIME, 1, 250),
+                   tx(1, ip.PING), rx(1)]
+        replay = ReplaySerial(records)
+        serial_connection = Connection(transport=replay)
+
+        with self.assertRaises(TuningError) as context:
+            tune_bus(serial_connection, baudrate=1000000, dynamixel_ids=[1],
+                     num_pings=1, settle_time=0.)
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(serial_connection.baudrate, 57600)
+        self.assertEqual(context.exception.unreachable_ids, [])
+
+        # The unit doesn't reply after the rollback either
+        records[-1:] = []
+        replay = ReplaySerial(records)
+        serial_connection = Connection(transport=replay)
+
+        with self.assertRaises(TuningError) as context:
+            tune_bus(serial_connection, baudrate=1000000, dynamixel_ids=[1],
+                     num_pings=1, settle_time=0.)
+
+        self.assertTrue(replay.is_exhausted)
+        self.assertEqual(context.exception.unreachable_ids, [1])
+
+
+    def test_tune_bus_wrong_settings(self):
+        """Check that wrong settings are rejected before anything is
+        written."""
+
+        replay = ReplaySerial([])
+        serial_connection = Connection(transport=replay)
+
+        # 750000 bps: Dynamixel units would run at 666667 bps
+        with self.assertRaises(TuningError):
+            tune_bus(serial_connection, baudrate=750000, dynamixel_ids=[1])
+
+        with self.assertRaises(ValueError):
+            tune_bus(serial_connection, return_delay_time=600,
+                     dynamixel_ids=[1])
+
+        with self.assertRaises(ValueError):
+            tune_bus(serial_connection, return_delay_time=-2,
+                     dynamixel_ids=[1])
+
+
+if __name__ == '__main__':
+    unittest.main()